@@ -11,6 +11,11 @@ from app.database.core import Base
 from app.models import manutencao  # noqa: F401
 from app.models import material  # noqa: F401
 from app.models import manutencao_material  # noqa: F401
+from app.models import outbox  # noqa: F401
+from app.models import idempotencia  # noqa: F401
+from app.models import material_preco_historico  # noqa: F401
+from app.models import job  # noqa: F401
+from app.models import evento  # noqa: F401
 
 config = context.config
 
@@ -22,6 +27,15 @@ if config.config_file_name is not None:
 target_metadata = Base.metadata
 
 
+def include_name(name, type_, parent_names) -> bool:
+    """Ignora os objetos da busca textual em manutenções, criados fora do metadata."""
+    if type_ == "table" and name is not None and name.startswith("manutencoes_fts"):
+        return False
+    if type_ == "index" and name == "ix_manutencoes_resumo_fts":
+        return False
+    return True
+
+
 def run_migrations_offline() -> None:
     url = config.get_main_option("sqlalchemy.url")
     context.configure(
@@ -31,6 +45,8 @@ def run_migrations_offline() -> None:
         dialect_opts={"paramstyle": "named"},
         compare_type=True,
         compare_server_default=True,
+        include_name=include_name,
+        transaction_per_migration=True,
     )
 
     with context.begin_transaction():
@@ -50,6 +66,9 @@ def run_migrations_online() -> None:
             target_metadata=target_metadata,
             compare_type=True,
             compare_server_default=True,
+            include_name=include_name,
+            # os helpers de app.database.migracoes fazem commits no meio da migration
+            transaction_per_migration=True,
         )
 
         with context.begin_transaction():
@@ -0,0 +1,30 @@
+"""Create sequence for change feed event ids
+
+Revision ID: 0c2e4a6b8d1f
+Revises: f6b8d0a2c4e5
+Create Date: 2026-10-20 09:14:52.806331
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0c2e4a6b8d1f'
+down_revision: Union[str, Sequence[str], None] = 'f6b8d0a2c4e5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_context().dialect.supports_sequences:
+        op.execute(sa.schema.CreateSequence(sa.Sequence('eventos_id_seq'), if_not_exists=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_context().dialect.supports_sequences:
+        op.execute(sa.schema.DropSequence(sa.Sequence('eventos_id_seq'), if_exists=True))
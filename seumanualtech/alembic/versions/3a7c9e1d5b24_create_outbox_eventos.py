@@ -0,0 +1,44 @@
+"""Create outbox_eventos table
+
+Revision ID: 3a7c9e1d5b24
+Revises: f1b842f03222
+Create Date: 2026-10-19 09:12:41.518203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3a7c9e1d5b24'
+down_revision: Union[str, Sequence[str], None] = 'f1b842f03222'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('outbox_eventos',
+    sa.Column('tipo', sa.String(length=100), nullable=False),
+    sa.Column('payload', sa.JSON(), nullable=False),
+    sa.Column('tentativas', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('proxima_tentativa_em', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('entregue_em', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('ultimo_erro', sa.Text(), nullable=True),
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('flag_ativo', sa.Boolean(), server_default='true', nullable=False),
+    sa.Column('criado_em', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=False),
+    sa.Column('atualizado_em', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_outbox_eventos_id'), 'outbox_eventos', ['id'], unique=False)
+    op.create_index('ix_outbox_eventos_pendentes', 'outbox_eventos', ['entregue_em', 'proxima_tentativa_em'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_outbox_eventos_pendentes', table_name='outbox_eventos')
+    op.drop_index(op.f('ix_outbox_eventos_id'), table_name='outbox_eventos')
+    op.drop_table('outbox_eventos')
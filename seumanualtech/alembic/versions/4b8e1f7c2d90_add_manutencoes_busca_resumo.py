@@ -0,0 +1,60 @@
+"""Add full-text search over manutencoes.resumo
+
+FTS5 external-content table kept in sync by triggers on SQLite; GIN index
+over to_tsvector('portuguese', resumo) on Postgres.
+
+Note: on SQLite, batch migrations that recreate `manutencoes` drop the
+triggers; re-run the CREATE TRIGGER statements and 'rebuild' afterwards.
+
+Revision ID: 4b8e1f7c2d90
+Revises: e2a6f9d31c47
+Create Date: 2026-10-19 16:58:12.204117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4b8e1f7c2d90'
+down_revision: Union[str, Sequence[str], None] = 'e2a6f9d31c47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SQLITE = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS manutencoes_fts USING fts5("
+    "resumo, content='manutencoes', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER IF NOT EXISTS manutencoes_fts_ai AFTER INSERT ON manutencoes BEGIN "
+    "INSERT INTO manutencoes_fts(rowid, resumo) VALUES (new.id, new.resumo); END",
+    "CREATE TRIGGER IF NOT EXISTS manutencoes_fts_ad AFTER DELETE ON manutencoes BEGIN "
+    "INSERT INTO manutencoes_fts(manutencoes_fts, rowid, resumo) VALUES ('delete', old.id, old.resumo); END",
+    "CREATE TRIGGER IF NOT EXISTS manutencoes_fts_au AFTER UPDATE OF resumo ON manutencoes BEGIN "
+    "INSERT INTO manutencoes_fts(manutencoes_fts, rowid, resumo) VALUES ('delete', old.id, old.resumo); "
+    "INSERT INTO manutencoes_fts(rowid, resumo) VALUES (new.id, new.resumo); END",
+    "INSERT INTO manutencoes_fts(manutencoes_fts) VALUES ('rebuild')",
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    dialeto = op.get_bind().dialect.name
+    if dialeto == 'sqlite':
+        for sql in SQLITE:
+            op.execute(sql)
+    elif dialeto == 'postgresql':
+        op.execute(
+            "CREATE INDEX IF NOT EXISTS ix_manutencoes_resumo_fts ON manutencoes "
+            "USING gin (to_tsvector('portuguese', resumo))"
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    dialeto = op.get_bind().dialect.name
+    if dialeto == 'sqlite':
+        for trigger in ('manutencoes_fts_au', 'manutencoes_fts_ad', 'manutencoes_fts_ai'):
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        op.execute("DROP TABLE IF EXISTS manutencoes_fts")
+    elif dialeto == 'postgresql':
+        op.execute("DROP INDEX IF EXISTS ix_manutencoes_resumo_fts")
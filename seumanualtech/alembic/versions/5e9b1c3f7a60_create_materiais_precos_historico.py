@@ -0,0 +1,43 @@
+"""Create materiais_precos_historico table
+
+Revision ID: 5e9b1c3f7a60
+Revises: c41e7a9b2d58
+Create Date: 2026-10-19 11:31:08.672440
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e9b1c3f7a60'
+down_revision: Union[str, Sequence[str], None] = 'c41e7a9b2d58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('materiais_precos_historico',
+    sa.Column('material_id', sa.Integer(), nullable=False),
+    sa.Column('preco_anterior', sa.Numeric(precision=10, scale=2), nullable=False),
+    sa.Column('preco_novo', sa.Numeric(precision=10, scale=2), nullable=False),
+    sa.Column('origem', sa.String(length=50), nullable=False),
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('flag_ativo', sa.Boolean(), server_default='true', nullable=False),
+    sa.Column('criado_em', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=False),
+    sa.Column('atualizado_em', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['material_id'], ['materiais.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_materiais_precos_historico_id'), 'materiais_precos_historico', ['id'], unique=False)
+    op.create_index(op.f('ix_materiais_precos_historico_material_id'), 'materiais_precos_historico', ['material_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_materiais_precos_historico_material_id'), table_name='materiais_precos_historico')
+    op.drop_index(op.f('ix_materiais_precos_historico_id'), table_name='materiais_precos_historico')
+    op.drop_table('materiais_precos_historico')
@@ -0,0 +1,31 @@
+"""Add estoque to materiais
+
+Revision ID: 8d2f4b6a0c13
+Revises: 3a7c9e1d5b24
+Create Date: 2026-10-19 10:03:27.144951
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d2f4b6a0c13'
+down_revision: Union[str, Sequence[str], None] = '3a7c9e1d5b24'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('materiais', sa.Column('estoque', sa.Numeric(precision=10, scale=2), nullable=True))
+    op.create_index(op.f('ix_materiais_estoque'), 'materiais', ['estoque'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_materiais_estoque'), table_name='materiais')
+    with op.batch_alter_table('materiais') as batch_op:
+        batch_op.drop_column('estoque')
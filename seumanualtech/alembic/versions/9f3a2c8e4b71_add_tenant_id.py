@@ -0,0 +1,76 @@
+"""Add tenant_id to all tables with tenant-leading indexes
+
+Revision ID: 9f3a2c8e4b71
+Revises: 5e9b1c3f7a60
+Create Date: 2026-10-19 12:20:44.903518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9f3a2c8e4b71'
+down_revision: Union[str, Sequence[str], None] = '5e9b1c3f7a60'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABELAS = [
+    'manutencoes',
+    'materiais',
+    'manutencao_materiais',
+    'outbox_eventos',
+    'idempotencia_chaves',
+    'materiais_precos_historico',
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for tabela in TABELAS:
+        op.add_column(tabela, sa.Column('tenant_id', sa.Integer(), server_default='1', nullable=False))
+
+    op.create_index('ix_manutencoes_tenant_criado_em', 'manutencoes', ['tenant_id', 'criado_em'], unique=False)
+    op.create_index(
+        'ix_manutencoes_tenant_status_criado_em', 'manutencoes', ['tenant_id', 'status', 'criado_em'], unique=False
+    )
+
+    op.drop_index(op.f('ix_materiais_nome'), table_name='materiais')
+    op.drop_index(op.f('ix_materiais_estoque'), table_name='materiais')
+    with op.batch_alter_table('materiais') as batch_op:
+        batch_op.create_unique_constraint('uq_materiais_tenant_nome', ['tenant_id', 'nome'])
+    op.create_index('ix_materiais_tenant_estoque', 'materiais', ['tenant_id', 'estoque'], unique=False)
+
+    op.drop_index(op.f('ix_manutencao_materiais_material_id'), table_name='manutencao_materiais')
+    op.create_index(
+        'ix_manutencao_materiais_tenant_material_id', 'manutencao_materiais', ['tenant_id', 'material_id'], unique=False
+    )
+
+    op.drop_index(op.f('ix_idempotencia_chaves_chave'), table_name='idempotencia_chaves')
+    with op.batch_alter_table('idempotencia_chaves') as batch_op:
+        batch_op.create_unique_constraint('uq_idempotencia_chaves_tenant_chave', ['tenant_id', 'chave'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('idempotencia_chaves') as batch_op:
+        batch_op.drop_constraint('uq_idempotencia_chaves_tenant_chave', type_='unique')
+    op.create_index(op.f('ix_idempotencia_chaves_chave'), 'idempotencia_chaves', ['chave'], unique=True)
+
+    op.drop_index('ix_manutencao_materiais_tenant_material_id', table_name='manutencao_materiais')
+    op.create_index(op.f('ix_manutencao_materiais_material_id'), 'manutencao_materiais', ['material_id'], unique=False)
+
+    op.drop_index('ix_materiais_tenant_estoque', table_name='materiais')
+    with op.batch_alter_table('materiais') as batch_op:
+        batch_op.drop_constraint('uq_materiais_tenant_nome', type_='unique')
+    op.create_index(op.f('ix_materiais_estoque'), 'materiais', ['estoque'], unique=False)
+    op.create_index(op.f('ix_materiais_nome'), 'materiais', ['nome'], unique=True)
+
+    op.drop_index('ix_manutencoes_tenant_status_criado_em', table_name='manutencoes')
+    op.drop_index('ix_manutencoes_tenant_criado_em', table_name='manutencoes')
+
+    for tabela in reversed(TABELAS):
+        with op.batch_alter_table(tabela) as batch_op:
+            batch_op.drop_column('tenant_id')
@@ -0,0 +1,32 @@
+"""Add indexes for maintenance date, material and cost filters
+
+Revision ID: a5c3e8f1b627
+Revises: 4b8e1f7c2d90
+Create Date: 2026-10-19 17:44:51.370925
+
+"""
+from typing import Sequence, Union
+
+from app.database.migracoes import criar_indice, remover_indice
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a5c3e8f1b627'
+down_revision: Union[str, Sequence[str], None] = '4b8e1f7c2d90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    criar_indice('ix_manutencoes_tenant_atualizado_em', 'manutencoes', ['tenant_id', 'atualizado_em'])
+    criar_indice(
+        'ix_manutencao_materiais_tenant_manutencao_material', 'manutencao_materiais',
+        ['tenant_id', 'manutencao_id', 'material_id', 'quantidade'],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    remover_indice('ix_manutencao_materiais_tenant_manutencao_material', 'manutencao_materiais')
+    remover_indice('ix_manutencoes_tenant_atualizado_em', 'manutencoes')
@@ -0,0 +1,49 @@
+"""Create jobs table
+
+Revision ID: b7d04e2a9c35
+Revises: 9f3a2c8e4b71
+Create Date: 2026-10-19 13:05:12.381776
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7d04e2a9c35'
+down_revision: Union[str, Sequence[str], None] = '9f3a2c8e4b71'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('jobs',
+    sa.Column('tipo', sa.String(length=100), nullable=False),
+    sa.Column('status', sa.Enum('PENDENTE', 'EXECUTANDO', 'CONCLUIDO', 'FALHOU', name='statusjob', native_enum=False, length=20), nullable=False),
+    sa.Column('parametros', sa.JSON(), nullable=False),
+    sa.Column('progresso', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('total', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('resultado', sa.JSON(), nullable=True),
+    sa.Column('erro', sa.Text(), nullable=True),
+    sa.Column('tentativas', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('heartbeat_em', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('concluido_em', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('tenant_id', sa.Integer(), server_default='1', nullable=False),
+    sa.Column('flag_ativo', sa.Boolean(), server_default='true', nullable=False),
+    sa.Column('criado_em', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=False),
+    sa.Column('atualizado_em', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_jobs_id'), 'jobs', ['id'], unique=False)
+    op.create_index('ix_jobs_status_id', 'jobs', ['status', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_jobs_status_id', table_name='jobs')
+    op.drop_index(op.f('ix_jobs_id'), table_name='jobs')
+    op.drop_table('jobs')
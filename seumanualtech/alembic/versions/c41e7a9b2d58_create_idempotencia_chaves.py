@@ -0,0 +1,45 @@
+"""Create idempotencia_chaves table
+
+Revision ID: c41e7a9b2d58
+Revises: 8d2f4b6a0c13
+Create Date: 2026-10-19 10:47:55.302117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c41e7a9b2d58'
+down_revision: Union[str, Sequence[str], None] = '8d2f4b6a0c13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('idempotencia_chaves',
+    sa.Column('chave', sa.String(length=255), nullable=False),
+    sa.Column('fingerprint', sa.String(length=64), nullable=False),
+    sa.Column('status_code', sa.Integer(), nullable=True),
+    sa.Column('resposta', sa.JSON(), nullable=True),
+    sa.Column('expira_em', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('flag_ativo', sa.Boolean(), server_default='true', nullable=False),
+    sa.Column('criado_em', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=False),
+    sa.Column('atualizado_em', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_idempotencia_chaves_chave'), 'idempotencia_chaves', ['chave'], unique=True)
+    op.create_index(op.f('ix_idempotencia_chaves_expira_em'), 'idempotencia_chaves', ['expira_em'], unique=False)
+    op.create_index(op.f('ix_idempotencia_chaves_id'), 'idempotencia_chaves', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_idempotencia_chaves_id'), table_name='idempotencia_chaves')
+    op.drop_index(op.f('ix_idempotencia_chaves_expira_em'), table_name='idempotencia_chaves')
+    op.drop_index(op.f('ix_idempotencia_chaves_chave'), table_name='idempotencia_chaves')
+    op.drop_table('idempotencia_chaves')
@@ -0,0 +1,29 @@
+"""Add descartado_em to outbox_eventos
+
+Revision ID: d3f5a7c9e1b2
+Revises: a5c3e8f1b627
+Create Date: 2026-10-19 21:12:40.518203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd3f5a7c9e1b2'
+down_revision: Union[str, Sequence[str], None] = 'a5c3e8f1b627'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('outbox_eventos', sa.Column('descartado_em', sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('outbox_eventos') as batch_op:
+        batch_op.drop_column('descartado_em')
@@ -0,0 +1,73 @@
+"""Add normalized material name with tenant unique index
+
+Revision ID: e2a6f9d31c47
+Revises: b7d04e2a9c35
+Create Date: 2026-10-19 15:41:08.512307
+
+"""
+from typing import Sequence, Union
+
+import re
+import unicodedata
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2a6f9d31c47'
+down_revision: Union[str, Sequence[str], None] = 'b7d04e2a9c35'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+LOTE = 1000
+
+
+def normalizar_nome(nome: str) -> str:
+    """Cópia congelada de `app.models.material.normalizar_nome` na data desta migration."""
+    sem_acentos = "".join(
+        c for c in unicodedata.normalize("NFKD", nome) if not unicodedata.combining(c)
+    )
+    return re.sub(r"\s+", " ", sem_acentos).strip().casefold()
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('materiais', sa.Column('nome_normalizado', sa.String(length=200), nullable=True))
+
+    conn = op.get_bind()
+    materiais = sa.table(
+        'materiais', sa.column('id', sa.Integer), sa.column('tenant_id', sa.Integer),
+        sa.column('nome', sa.String), sa.column('nome_normalizado', sa.String),
+    )
+    vistos: dict[tuple[int, str], str] = {}
+    valores: list[dict] = []
+    for id, tenant_id, nome in conn.execute(sa.select(materiais.c.id, materiais.c.tenant_id, materiais.c.nome)):
+        normalizado = normalizar_nome(nome)
+        if (tenant_id, normalizado) in vistos:
+            raise RuntimeError(
+                f"Materiais '{vistos[(tenant_id, normalizado)]}' e '{nome}' (tenant {tenant_id}) "
+                "têm o mesmo nome normalizado; renomeie um deles antes de migrar"
+            )
+        vistos[(tenant_id, normalizado)] = nome
+        valores.append({'_id': id, 'nome_normalizado': normalizado})
+
+    atualizar = materiais.update().where(materiais.c.id == sa.bindparam('_id'))
+    for inicio in range(0, len(valores), LOTE):
+        conn.execute(atualizar, valores[inicio:inicio + LOTE])
+
+    with op.batch_alter_table('materiais') as batch_op:
+        batch_op.alter_column('nome_normalizado', existing_type=sa.String(length=200), nullable=False)
+        batch_op.drop_constraint('uq_materiais_tenant_nome', type_='unique')
+    op.create_index(
+        'ux_materiais_tenant_nome_normalizado', 'materiais', ['tenant_id', 'nome_normalizado'], unique=True
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ux_materiais_tenant_nome_normalizado', table_name='materiais')
+    with op.batch_alter_table('materiais') as batch_op:
+        batch_op.create_unique_constraint('uq_materiais_tenant_nome', ['tenant_id', 'nome'])
+        batch_op.drop_column('nome_normalizado')
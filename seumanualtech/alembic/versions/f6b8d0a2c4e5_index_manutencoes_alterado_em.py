@@ -0,0 +1,34 @@
+"""Index maintenances by coalesce(atualizado_em, criado_em)
+
+Revision ID: f6b8d0a2c4e5
+Revises: d3f5a7c9e1b2
+Create Date: 2026-10-19 22:05:13.274610
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from app.database.migracoes import criar_indice, remover_indice
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f6b8d0a2c4e5'
+down_revision: Union[str, Sequence[str], None] = 'd3f5a7c9e1b2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    criar_indice(
+        'ix_manutencoes_tenant_alterado_em', 'manutencoes',
+        ['tenant_id', sa.text('coalesce(atualizado_em, criado_em)')],
+    )
+    remover_indice('ix_manutencoes_tenant_atualizado_em', 'manutencoes')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    criar_indice('ix_manutencoes_tenant_atualizado_em', 'manutencoes', ['tenant_id', 'atualizado_em'])
+    remover_indice('ix_manutencoes_tenant_alterado_em', 'manutencoes')
@@ -1,10 +1,95 @@
+from functools import lru_cache
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
 class Settings(BaseSettings):
     DATABASE_URL: str = "sqlite:///./app.db"
+    DATABASE_REPLICA_URLS: list[str] = []
+    DATABASE_REPLICA_EJECAO_SEGUNDOS: float = 30.0
+
+    TENANT_HEADER: str = "X-Tenant-Id"
+    TENANT_PADRAO: int = 1
+    API_KEY_HEADER: str = "X-API-Key"
+    # API key -> tenant; ex.: TENANT_API_KEYS='{"chave-do-cliente": 1}'
+    TENANT_API_KEYS: dict[str, int] = {}
+
+    SERVER_HOST: str = "0.0.0.0"
+    SERVER_PORT: int = 8000
+    SERVER_WORKERS: int = 0
+    SERVER_GRACEFUL_TIMEOUT: int = 30
+
+    READINESS_MAX_DB_LATENCY_MS: float = 250.0
+    READINESS_MAX_POOL_USAGE: float = 0.9
+    READINESS_MAX_P99_MS: float = 2000.0
+    READINESS_LATENCY_WINDOW: int = 1000
+
+    MANUTENCAO_CACHE_TTL: float = 2.0
+
+    EVENTOS_BACKEND: str = "local"
+    EVENTOS_CANAL: str = "seumanualtech_eventos"
+    EVENTOS_BUFFER: int = 1000
+    EVENTOS_KEEPALIVE: float = 15.0
+
+    OUTBOX_SINK: str = "file"
+    OUTBOX_ARQUIVO: str = "./outbox.jsonl"
+    OUTBOX_HTTP_URL: str = ""
+    OUTBOX_HTTP_TIMEOUT: float = 10.0
+    OUTBOX_LOTE: int = 100
+    OUTBOX_INTERVALO: float = 1.0
+    OUTBOX_BACKOFF_BASE: float = 2.0
+    OUTBOX_BACKOFF_MAX: float = 300.0
+    OUTBOX_MAX_TENTATIVAS: int = 20
+
+    IDEMPOTENCIA_TTL_HORAS: int = 24
+    # tempo máximo de uma operação em andamento antes que uma retentativa assuma a chave
+    IDEMPOTENCIA_RESERVA_SEGUNDOS: float = 60.0
+    # intervalo da remoção de chaves expiradas, feita pelo dispatcher do outbox
+    IDEMPOTENCIA_LIMPEZA_INTERVALO: float = 300.0
+
+    JOBS_WORKERS: int = 2
+    JOBS_BLOCO: int = 500
+    JOBS_INTERVALO: float = 1.0
+    JOBS_HEARTBEAT_EXPIRA: float = 300.0
+
+    COMPRESSAO_MIN_BYTES: int = 1024
+
+    SLOW_QUERY_ENABLED: bool = False
+    SLOW_QUERY_LIMIAR_MS: float = 200.0
+    SLOW_QUERY_BUFFER: int = 100
+    SLOW_QUERY_EXPLAIN: bool = True
+    SLOW_QUERY_REDIGIR_PARAMETROS: bool = True
+
+    ADMIN_TOKEN: str = ""
+
+    INGESTAO_ENABLED: bool = False
+    INGESTAO_DIRETORIO: str = "./ingestao"
+    INGESTAO_BUFFER_MAX: int = 10000
+    INGESTAO_LOTE: int = 500
+    INGESTAO_INTERVALO_MS: int = 200
+    INGESTAO_MAX_TENTATIVAS: int = 5
+
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_BACKEND: str = "memory"
+    RATE_LIMIT_REDIS_URL: str = "redis://localhost:6379/0"
+    RATE_LIMIT_TAXA: float = 50.0
+    RATE_LIMIT_RAJADA: float = 100.0
+    RATE_LIMIT_CONCORRENCIA: int = 20
+    RATE_LIMIT_ROTAS: dict[str, dict[str, float]] = {
+        "POST /materiais/bulk": {"taxa": 1.0, "rajada": 5.0, "concorrencia": 2},
+        "POST /manutencao/bulk": {"taxa": 1.0, "rajada": 5.0, "concorrencia": 2},
+    }
 
     model_config = SettingsConfigDict(env_file=".env")
 
 
-settings = Settings()
+@lru_cache
+def get_settings() -> Settings:
+    """Carrega as configurações na primeira utilização (e não na importação do módulo)."""
+    return Settings()
+
+
+def __getattr__(name: str):
+    if name == "settings":
+        return get_settings()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
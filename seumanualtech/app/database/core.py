@@ -1,19 +1,86 @@
-from sqlalchemy import create_engine
+import os
+
+from fastapi import Request
+from sqlalchemy import Engine, create_engine
 from sqlalchemy.orm import DeclarativeBase, sessionmaker
-from app.config import settings
+from app.config import get_settings
+from app.database.replicas import ReplicaPool, RoutingSession
+from app.database.slow_queries import get_recorder
+
+_engine: Engine | None = None
+_replicas: ReplicaPool | None = None
+
+SessionLocal = sessionmaker(class_=RoutingSession, autocommit=False, autoflush=False)
+
+
+def _create_engine(database_url: str) -> Engine:
+    connect_args = {"check_same_thread": False} if database_url.startswith("sqlite") else {}
+    return create_engine(database_url, connect_args=connect_args)
+
+
+def init_engine() -> Engine:
+    """
+    Cria o engine (uma vez por processo) e associa ao `SessionLocal`.
+
+    Chamado pelo lifespan da aplicação; scripts e o `get_db` também o
+    invocam sob demanda, então a criação nunca acontece na importação.
+    """
+    global _engine, _replicas
+    if _engine is None:
+        settings = get_settings()
+        _engine = _create_engine(settings.DATABASE_URL)
+        _replicas = ReplicaPool(
+            [_create_engine(url) for url in settings.DATABASE_REPLICA_URLS],
+            settings.DATABASE_REPLICA_EJECAO_SEGUNDOS,
+        )
+        SessionLocal.configure(bind=_engine, replicas=_replicas)
+        if settings.SLOW_QUERY_ENABLED:
+            for engine in [_engine, *_replicas.engines]:
+                get_recorder().instalar(engine)
+    return _engine
+
+
+def get_replicas() -> ReplicaPool | None:
+    return _replicas
+
+
+def dispose_engine() -> None:
+    global _engine, _replicas
+    if _engine is not None:
+        _engine.dispose()
+        _engine = None
+    if _replicas is not None:
+        _replicas.dispose()
+        _replicas = None
+
+
+def __getattr__(name: str):
+    if name == "engine":
+        return init_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _dispose_engine_after_fork():
+    """Descarta os pools herdados do processo pai sem fechar as conexões dele."""
+    if _engine is not None:
+        _engine.dispose(close=False)
+    if _replicas is not None:
+        for replica in _replicas.engines:
+            replica.dispose(close=False)
 
-connect_args = {"check_same_thread": False} if settings.DATABASE_URL.startswith("sqlite") else {}
-engine = create_engine(settings.DATABASE_URL, connect_args=connect_args)
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_dispose_engine_after_fork)
 
 
 class Base(DeclarativeBase):
     pass
 
 
-def get_db():
-    db = SessionLocal()
+def get_db(request: Request):
+    """Sessão da requisição; GET/HEAD leem das réplicas, se configuradas."""
+    init_engine()
+    db = SessionLocal(usar_replica=request.method in ("GET", "HEAD"))
     try:
         yield db
     finally:
@@ -0,0 +1,241 @@
+"""
+Helpers para migrations em tabelas grandes.
+
+Use nas migrations no lugar das operações equivalentes do `op`:
+
+- `criar_indice`/`remover_indice`: no Postgres usam `CONCURRENTLY` (fora da
+  transação da migration), sem bloquear escritas; são idempotentes e
+  refazem índices deixados inválidos por uma criação interrompida.
+- `alterar_tabela`: `batch_alter_table` que, no SQLite, recria os triggers
+  da tabela (ex.: os da busca textual em `manutencoes`) e os índices de
+  expressão, perdidos quando o batch recria a tabela.
+- `backfill`: atualiza em lotes pela chave primária, com commit por lote,
+  pausa entre lotes e progresso no log `app.migracoes`. O filtro `pendente`
+  torna a operação retomável: rodar de novo continua de onde parou.
+- `exigir_not_null`: no Postgres valida um CHECK `NOT VALID` antes do
+  `SET NOT NULL`, evitando a varredura com a tabela bloqueada. Cada passo
+  tem a sua própria transação, então o `ACCESS EXCLUSIVE` do `ADD
+  CONSTRAINT` não fica retido durante a validação.
+"""
+import logging
+import re
+import time
+import warnings
+from collections.abc import Callable, Iterator, Sequence
+from contextlib import contextmanager
+from typing import Any
+
+import sqlalchemy as sa
+from alembic import op
+
+logger = logging.getLogger("app.migracoes")
+
+
+def _dialeto() -> str:
+    return op.get_context().dialect.name
+
+
+def _offline() -> bool:
+    """Migration gerando SQL (`alembic upgrade --sql`) em vez de executar."""
+    return op.get_context().as_sql
+
+
+def _indice_postgres_valido(nome: str) -> bool | None:
+    """True/False conforme `indisvalid`; None se o índice não existe."""
+    return op.get_bind().scalar(
+        sa.text(
+            "SELECT i.indisvalid FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+            "WHERE c.relname = :nome"
+        ),
+        {"nome": nome},
+    )
+
+
+def criar_indice(nome: str, tabela: str, colunas: Sequence[str], unique: bool = False, **kw: Any) -> None:
+    """
+    Cria um índice sem travar escritas na tabela.
+
+    Args:
+        nome: Nome do índice
+        tabela: Tabela indexada
+        colunas: Colunas (ou expressões) do índice
+        unique: Índice único
+        **kw: Repassados ao `op.create_index` (ex.: `postgresql_where`)
+    """
+    if _dialeto() != "postgresql" or _offline():
+        op.create_index(nome, tabela, colunas, unique=unique, if_not_exists=True, **kw)
+        return
+
+    with op.get_context().autocommit_block():
+        valido = _indice_postgres_valido(nome)
+        if valido:
+            return
+        if valido is False:
+            logger.warning("índice %s inválido (criação interrompida); recriando", nome)
+            op.drop_index(nome, table_name=tabela, postgresql_concurrently=True)
+        op.create_index(nome, tabela, colunas, unique=unique, postgresql_concurrently=True, **kw)
+
+
+def remover_indice(nome: str, tabela: str) -> None:
+    """Remove um índice sem travar escritas na tabela (no Postgres)."""
+    if _dialeto() != "postgresql" or _offline():
+        op.drop_index(nome, table_name=tabela, if_exists=True)
+        return
+    with op.get_context().autocommit_block():
+        op.drop_index(nome, table_name=tabela, postgresql_concurrently=True, if_exists=True)
+
+
+@contextmanager
+def alterar_tabela(tabela: str, **kw: Any) -> Iterator[Any]:
+    """
+    `op.batch_alter_table` que preserva os triggers e os índices de expressão
+    da tabela no SQLite (o batch não consegue refleti-los).
+
+    No Postgres as alterações continuam sendo `ALTER TABLE` diretos.
+    """
+    triggers: list[str] = []
+    indices: list[str] = []
+    if _dialeto() == "sqlite" and not _offline():
+        conn = op.get_bind()
+        triggers = list(conn.scalars(
+            sa.text("SELECT sql FROM sqlite_master WHERE type = 'trigger' AND tbl_name = :tabela"),
+            {"tabela": tabela},
+        ))
+        indices = [
+            sql for nome, sql in conn.execute(
+                sa.text("SELECT name, sql FROM sqlite_master WHERE type = 'index' AND tbl_name = :tabela"),
+                {"tabela": tabela},
+            )
+            # cid -2 marca uma coluna do índice que é expressão
+            if sql and any(coluna[1] == -2 for coluna in conn.exec_driver_sql(f'PRAGMA index_xinfo("{nome}")'))
+        ]
+
+    with warnings.catch_warnings():
+        if indices:
+            warnings.filterwarnings("ignore", "Skipped unsupported reflection of expression-based index")
+        with op.batch_alter_table(tabela, **kw) as batch_op:
+            yield batch_op
+
+    for sql in triggers:
+        op.execute(sql.replace("CREATE TRIGGER ", "CREATE TRIGGER IF NOT EXISTS ", 1))
+    for sql in indices:
+        op.execute(re.sub(r"^CREATE (UNIQUE )?INDEX ", r"CREATE \1INDEX IF NOT EXISTS ", sql, count=1))
+
+
+def _restricao_existe(tabela: str, restricao: str) -> bool:
+    """Restrição deixada por uma execução interrompida de `exigir_not_null`."""
+    return bool(op.get_bind().scalar(
+        sa.text(
+            "SELECT 1 FROM pg_constraint c JOIN pg_class t ON t.oid = c.conrelid "
+            "WHERE t.relname = :tabela AND c.conname = :restricao"
+        ),
+        {"tabela": tabela, "restricao": restricao},
+    ))
+
+
+def exigir_not_null(tabela: str, coluna: str, tipo: sa.types.TypeEngine) -> None:
+    """
+    Torna a coluna NOT NULL (depois do backfill).
+
+    Args:
+        tabela: Tabela da coluna
+        coluna: Coluna já preenchida
+        tipo: Tipo atual da coluna (exigido pelo batch do SQLite)
+    """
+    if _dialeto() != "postgresql":
+        with alterar_tabela(tabela) as batch_op:
+            batch_op.alter_column(coluna, existing_type=tipo, nullable=False)
+        return
+
+    # cada comando é uma transação: o ADD CONSTRAINT NOT VALID e o SET NOT NULL
+    # (que aproveita o CHECK validado em vez de varrer a tabela) seguram o
+    # ACCESS EXCLUSIVE só por um instante, e o VALIDATE não bloqueia escritas
+    restricao = f"ck_{tabela}_{coluna}_not_null"
+    with op.get_context().autocommit_block():
+        if _offline() or not _restricao_existe(tabela, restricao):
+            op.execute(
+                f'ALTER TABLE "{tabela}" ADD CONSTRAINT "{restricao}" CHECK ("{coluna}" IS NOT NULL) NOT VALID'
+            )
+        op.execute(f'ALTER TABLE "{tabela}" VALIDATE CONSTRAINT "{restricao}"')
+        op.alter_column(tabela, coluna, existing_type=tipo, nullable=False)
+        op.execute(f'ALTER TABLE "{tabela}" DROP CONSTRAINT "{restricao}"')
+
+
+def backfill(
+    tabela: sa.TableClause,
+    valores: dict[str, Any] | Callable[[sa.Row], dict[str, Any]],
+    pendente: sa.ColumnElement[bool],
+    lote: int = 5000,
+    pausa_ms: float = 0,
+    colunas: Sequence[sa.ColumnElement] = (),
+) -> int:
+    """
+    Preenche linhas em lotes pela chave `id`, com um commit por lote.
+
+    Args:
+        tabela: `sa.table(...)` com a coluna `id` e as colunas usadas
+        valores: Expressões SQL por coluna (ex.: `{"nome_normalizado": func.lower(t.c.nome)}`)
+            ou função que recebe a linha (`id` + `colunas`) e devolve os valores
+        pendente: Condição das linhas que ainda precisam ser preenchidas; precisa
+            deixar de valer depois do update para o backfill ser retomável
+        lote: Linhas por lote (e por transação)
+        pausa_ms: Pausa entre lotes, para limitar a carga sobre o banco
+        colunas: Colunas lidas para a função de `valores`
+
+    Returns:
+        Quantidade de linhas atualizadas
+
+    Raises:
+        RuntimeError: Se `valores` é uma função e a migration roda em modo offline
+    """
+    id_ = tabela.c.id
+    if _offline():
+        if callable(valores):
+            raise RuntimeError(f"backfill de {tabela.name} calculado em Python não funciona com --sql")
+        op.execute(tabela.update().where(pendente).values(valores))
+        return 0
+
+    inicio = time.monotonic()
+    atualizadas = 0
+    ultimo_id = None
+    with op.get_context().autocommit_block():
+        conn = op.get_bind()
+        total = conn.scalar(sa.select(sa.func.count()).select_from(tabela).where(pendente))
+        logger.info("backfill %s: %s linhas pendentes", tabela.name, total)
+
+        while True:
+            query = sa.select(id_, *colunas).where(pendente).order_by(id_).limit(lote)
+            if ultimo_id is not None:
+                query = query.where(id_ > ultimo_id)
+            linhas = conn.execute(query).all()
+            if not linhas:
+                break
+
+            # a conexão está em AUTOCOMMIT; o lote é uma transação explícita
+            conn.exec_driver_sql("BEGIN")
+            try:
+                if callable(valores):
+                    conn.execute(
+                        tabela.update().where(id_ == sa.bindparam("_id")),
+                        [{"_id": linha.id, **valores(linha)} for linha in linhas],
+                    )
+                else:
+                    conn.execute(
+                        tabela.update().where(id_.in_([linha.id for linha in linhas])).values(valores)
+                    )
+            except Exception:
+                conn.exec_driver_sql("ROLLBACK")
+                raise
+            conn.exec_driver_sql("COMMIT")
+            atualizadas += len(linhas)
+            ultimo_id = linhas[-1].id
+
+            decorrido = time.monotonic() - inicio
+            logger.info(
+                "backfill %s: %s/%s linhas (%.0f linhas/s, até id %s)",
+                tabela.name, atualizadas, total, atualizadas / decorrido if decorrido else 0, ultimo_id,
+            )
+            if pausa_ms:
+                time.sleep(pausa_ms / 1000)
+
+    return atualizadas
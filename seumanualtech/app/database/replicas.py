@@ -0,0 +1,89 @@
+"""
+Roteamento de leituras para réplicas.
+
+Sessões criadas com `usar_replica=True` (rotas GET) enviam SELECTs para uma
+réplica escolhida em round-robin, fixa durante a sessão. Qualquer escrita
+(flush ou DML) faz a sessão passar a usar o primário até o fim, garantindo
+leitura-após-escrita na mesma requisição. Réplicas com erro de conexão são
+ejetadas por `DATABASE_REPLICA_EJECAO_SEGUNDOS`; sem réplicas saudáveis, as
+leituras vão para o primário.
+"""
+import itertools
+import threading
+import time
+
+from sqlalchemy import Engine, event
+from sqlalchemy.orm import Session
+
+
+class ReplicaPool:
+    def __init__(self, engines: list[Engine], ejecao_segundos: float):
+        self.engines = engines
+        self.ejecao_segundos = ejecao_segundos
+        self._ciclo = itertools.cycle(range(len(engines))) if engines else None
+        self._ejetadas: dict[int, float] = {}
+        self._lock = threading.Lock()
+        for indice, engine in enumerate(engines):
+            event.listen(engine, "handle_error", self._on_error(indice))
+
+    def _on_error(self, indice: int):
+        def handle_error(context):
+            if context.is_disconnect or context.connection is None:
+                self.ejetar(indice)
+        return handle_error
+
+    def ejetar(self, indice: int) -> None:
+        with self._lock:
+            self._ejetadas[indice] = time.monotonic() + self.ejecao_segundos
+
+    def escolher(self) -> Engine | None:
+        """Próxima réplica saudável em round-robin, ou None se não houver."""
+        if not self.engines:
+            return None
+        agora = time.monotonic()
+        with self._lock:
+            for _ in range(len(self.engines)):
+                indice = next(self._ciclo)
+                if self._ejetadas.get(indice, 0) <= agora:
+                    self._ejetadas.pop(indice, None)
+                    return self.engines[indice]
+        return None
+
+    def status(self) -> list[dict]:
+        agora = time.monotonic()
+        with self._lock:
+            return [
+                {"url": engine.url.render_as_string(hide_password=True), "ejetada": self._ejetadas.get(i, 0) > agora}
+                for i, engine in enumerate(self.engines)
+            ]
+
+    def dispose(self) -> None:
+        for engine in self.engines:
+            engine.dispose()
+
+
+class RoutingSession(Session):
+    """Session que envia leituras à réplica enquanto não houver escrita."""
+
+    def __init__(self, *args, replicas: ReplicaPool | None = None, usar_replica: bool = False, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.replicas = replicas
+        self.usar_replica = usar_replica
+        self.escreveu = False
+        self._replica: Engine | None = None
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if self._flushing or (clause is not None and getattr(clause, "is_dml", False)):
+            self.escreveu = True
+        if (
+            self.usar_replica
+            and not self.escreveu
+            and self.replicas is not None
+            and clause is not None
+            and getattr(clause, "is_select", False)
+        ):
+            if self._replica is None:
+                self._replica = self.replicas.escolher()
+            if self._replica is not None:
+                return self._replica
+        return super().get_bind(mapper=mapper, clause=clause, **kwargs)
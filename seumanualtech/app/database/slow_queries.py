@@ -0,0 +1,148 @@
+"""
+Registro de consultas lentas.
+
+Quando `SLOW_QUERY_ENABLED` está ligado, `init_engine` instala o recorder no
+engine principal e nas réplicas. Cada statement acima de
+`SLOW_QUERY_LIMIAR_MS` é guardado em um buffer circular com os parâmetros
+(redigidos por padrão), a rota que o originou e o plano de execução
+(`EXPLAIN` no Postgres, `EXPLAIN QUERY PLAN` no SQLite), e emitido como log
+JSON no logger `app.slow_query`.
+"""
+import json
+import logging
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar, Token
+from datetime import datetime, timezone
+from typing import Any
+
+from sqlalchemy import Engine, event
+
+from app.config import get_settings
+
+logger = logging.getLogger("app.slow_query")
+
+_rota: ContextVar[str | None] = ContextVar("rota", default=None)
+
+_EXPLICAVEIS = ("select", "with", "update", "delete")
+
+
+def set_rota(rota: str) -> Token:
+    return _rota.set(rota)
+
+
+def reset_rota(token: Token) -> None:
+    _rota.reset(token)
+
+
+def _redigir(parametros: Any) -> Any:
+    """Troca cada valor pelo seu tipo, mantendo a estrutura (dict/tupla/lista)."""
+    if isinstance(parametros, dict):
+        return {chave: _redigir(valor) for chave, valor in parametros.items()}
+    if isinstance(parametros, (list, tuple)):
+        return [_redigir(valor) for valor in parametros]
+    if parametros is None:
+        return None
+    return f"<{type(parametros).__name__}>"
+
+
+def _serializavel(parametros: Any) -> Any:
+    if isinstance(parametros, dict):
+        return {chave: _serializavel(valor) for chave, valor in parametros.items()}
+    if isinstance(parametros, (list, tuple)):
+        return [_serializavel(valor) for valor in parametros]
+    if parametros is None or isinstance(parametros, (bool, int, float, str)):
+        return parametros
+    return str(parametros)
+
+
+def _explicar(conn, statement: str, parametros: Any) -> list[str] | None:
+    """Plano do statement em um cursor à parte (fora dos eventos do SQLAlchemy); nunca levanta."""
+    if not statement.lstrip().lower().startswith(_EXPLICAVEIS):
+        return None
+    sqlite = conn.dialect.name == "sqlite"
+    prefixo = "EXPLAIN QUERY PLAN " if sqlite else "EXPLAIN "
+    cursor = conn.connection.driver_connection.cursor()
+    try:
+        # no Postgres um erro aborta a transação corrente; o savepoint a preserva
+        if not sqlite:
+            cursor.execute("SAVEPOINT slow_query_explain")
+        try:
+            cursor.execute(prefixo + statement, parametros)
+            linhas = cursor.fetchall()
+        except Exception as e:
+            if not sqlite:
+                cursor.execute("ROLLBACK TO SAVEPOINT slow_query_explain")
+            return [f"EXPLAIN falhou: {e}"]
+        if not sqlite:
+            cursor.execute("RELEASE SAVEPOINT slow_query_explain")
+    except Exception as e:
+        return [f"EXPLAIN falhou: {e}"]
+    finally:
+        cursor.close()
+    if sqlite:
+        return [str(linha[-1]) for linha in linhas]
+    return [str(linha[0]) for linha in linhas]
+
+
+class SlowQueryRecorder:
+    def __init__(self, tamanho: int):
+        self._registros: deque[dict] = deque(maxlen=tamanho)
+        self._lock = threading.Lock()
+
+    def instalar(self, engine: Engine) -> None:
+        event.listen(engine, "before_cursor_execute", self._antes)
+        event.listen(engine, "after_cursor_execute", self._depois)
+
+    def remover(self, engine: Engine) -> None:
+        event.remove(engine, "before_cursor_execute", self._antes)
+        event.remove(engine, "after_cursor_execute", self._depois)
+
+    def _antes(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        if context is not None:
+            context._slow_query_inicio = time.perf_counter()
+
+    def _depois(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        inicio = getattr(context, "_slow_query_inicio", None)
+        if inicio is None:
+            return
+        duracao_ms = (time.perf_counter() - inicio) * 1000
+        settings = get_settings()
+        if duracao_ms < settings.SLOW_QUERY_LIMIAR_MS:
+            return
+
+        registro = {
+            "registrado_em": datetime.now(timezone.utc).isoformat(),
+            "duracao_ms": round(duracao_ms, 3),
+            "rota": _rota.get(),
+            "banco": conn.engine.url.render_as_string(hide_password=True),
+            "statement": statement,
+            "parametros": _redigir(parameters) if settings.SLOW_QUERY_REDIGIR_PARAMETROS
+            else _serializavel(parameters),
+            "executemany": executemany,
+            "plano": None if executemany or not settings.SLOW_QUERY_EXPLAIN
+            else _explicar(conn, statement, parameters),
+        }
+        with self._lock:
+            self._registros.append(registro)
+        logger.warning(json.dumps({"evento": "slow_query", **registro}, ensure_ascii=False, default=str))
+
+    def registros(self) -> list[dict]:
+        """Registros do buffer, do mais recente para o mais antigo."""
+        with self._lock:
+            return list(reversed(self._registros))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._registros.clear()
+
+
+_recorder: SlowQueryRecorder | None = None
+
+
+def get_recorder() -> SlowQueryRecorder:
+    global _recorder
+    if _recorder is None:
+        _recorder = SlowQueryRecorder(get_settings().SLOW_QUERY_BUFFER)
+    return _recorder
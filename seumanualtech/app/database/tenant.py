@@ -0,0 +1,87 @@
+"""
+Tenant da requisição corrente.
+
+O middleware da aplicação define o tenant a partir da API key enviada em
+`API_KEY_HEADER` (mapeada em `TENANT_API_KEYS`); fora de uma requisição
+(scripts, workers) vale o `TENANT_PADRAO`. As consultas ORM são filtradas automaticamente pelo tenant
+(ver `app.models.core`).
+"""
+import hashlib
+from contextvars import ContextVar, Token
+
+from app.config import get_settings
+
+class CredencialInvalida(Exception):
+    """API key ausente ou desconhecida."""
+
+
+_tenant_atual: ContextVar[int | None] = ContextVar("tenant_atual", default=None)
+
+
+def get_tenant() -> int:
+    tenant = _tenant_atual.get()
+    return tenant if tenant is not None else get_settings().TENANT_PADRAO
+
+
+def set_tenant(tenant_id: int) -> Token:
+    return _tenant_atual.set(tenant_id)
+
+
+def reset_tenant(token: Token) -> None:
+    _tenant_atual.reset(token)
+
+
+# índice sha256(chave) -> tenant, refeito quando TENANT_API_KEYS é substituído
+_indice: tuple[dict, dict[bytes, int]] | None = None
+
+
+def _chaves_por_digest() -> dict[bytes, int]:
+    global _indice
+    chaves = get_settings().TENANT_API_KEYS
+    if _indice is None or _indice[0] is not chaves:
+        _indice = (chaves, {hashlib.sha256(c.encode()).digest(): t for c, t in chaves.items()})
+    return _indice[1]
+
+
+def tenant_da_chave(chave: str | None) -> int | None:
+    """
+    Tenant da API key; None se ausente ou desconhecida.
+
+    A busca é pelo sha256 da chave, então custa O(1) e o tempo não depende
+    de quantos caracteres da chave coincidem com uma conhecida.
+    """
+    if not chave:
+        return None
+    return _chaves_por_digest().get(hashlib.sha256(chave.encode()).digest())
+
+
+def resolver_tenant(headers, tenant_id: int | None = None) -> int:
+    """
+    Autentica a requisição pela API key e devolve o tenant dela.
+
+    O header `TENANT_HEADER` é opcional; se enviado, precisa ser o tenant da chave.
+
+    Args:
+        headers: Headers da requisição
+        tenant_id: Tenant já resolvido da API key (ver `tenant_da_chave`), para não repetir a busca
+
+    Raises:
+        CredencialInvalida: Se a API key está ausente ou não é conhecida
+        ValueError: Se o header de tenant não contém um id válido
+        PermissionError: Se o header de tenant aponta para outro tenant
+    """
+    settings = get_settings()
+    if tenant_id is None:
+        tenant_id = tenant_da_chave(headers.get(settings.API_KEY_HEADER))
+    if tenant_id is None:
+        raise CredencialInvalida(f"Header {settings.API_KEY_HEADER} ausente ou inválido")
+
+    valor = headers.get(settings.TENANT_HEADER)
+    if valor is not None:
+        try:
+            solicitado = int(valor)
+        except ValueError:
+            raise ValueError(f"Header {settings.TENANT_HEADER} inválido")
+        if solicitado != tenant_id:
+            raise PermissionError("A API key não dá acesso a este tenant")
+    return tenant_id
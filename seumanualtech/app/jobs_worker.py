@@ -0,0 +1,52 @@
+"""
+Processo executor de jobs em background.
+
+Uso:
+    seumanualtech-jobs --workers 4
+"""
+import argparse
+import logging
+import signal
+import threading
+
+from app.config import get_settings
+from app.database.core import SessionLocal, init_engine
+from app.services import jobs
+
+logger = logging.getLogger(__name__)
+
+
+def run(parar: threading.Event) -> None:
+    """Executa jobs até `parar` ser sinalizado; dorme apenas quando a fila está vazia."""
+    intervalo = get_settings().JOBS_INTERVALO
+    while not parar.is_set():
+        with SessionLocal() as db:
+            try:
+                job = jobs.executar_proximo(db, SessionLocal)
+            except Exception:
+                logger.exception("Falha ao reservar job")
+                job = None
+        if job is None:
+            parar.wait(intervalo)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Executor de jobs do Sistema de Controle de Materiais")
+    parser.add_argument("--workers", type=int, default=get_settings().JOBS_WORKERS)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    init_engine()
+    parar = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: parar.set())
+    signal.signal(signal.SIGINT, lambda *_: parar.set())
+
+    threads = [threading.Thread(target=run, args=(parar,), name=f"jobs-{i}") for i in range(args.workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+if __name__ == "__main__":
+    main()
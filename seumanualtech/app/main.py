@@ -1,13 +1,16 @@
-from fastapi import FastAPI
-from app.routes import manutencao, material
+import math
+import time
+from contextlib import asynccontextmanager
 
-from app.models import manutencao as manutencao_model  # noqa: F401
-from app.models import material as material_model  # noqa: F401
-from app.models import manutencao_material  # noqa: F401
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
 
-app = FastAPI(
-    title="Sistema de Controle de Materiais",
-    description="""
+from app.config import get_settings
+from app.database.core import SessionLocal, dispose_engine, init_engine
+from app.database.slow_queries import reset_rota, set_rota
+from app.database.tenant import CredencialInvalida, reset_tenant, resolver_tenant, set_tenant, tenant_da_chave
+
+DESCRIPTION = """
     ## API para Gerenciamento de Manutenções e Materiais
     
     Esta API permite:
@@ -33,18 +36,169 @@ app = FastAPI(
     * Não é possível adicionar materiais a manutenções finalizadas
     * Validação de dados obrigatórios
     * Preços devem ser positivos
-    """,
-    version="1.0.0",
-    contact={
-        "name": "Seu Manual Tech",
-        "url": "https://github.com/seu-usuario/seu-manual-tech",
-    }
-)
 
-app.include_router(manutencao.router)
-app.include_router(material.router)
+    ### 🔑 Autenticação
+    * Header `X-API-Key`: identifica o cliente e o tenant dos dados
+    """
+
+# rotas que não acessam dados de tenant (o /admin tem token próprio)
+ROTAS_SEM_TENANT = ("/health", "/admin", "/docs", "/redoc", "/openapi.json")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    from app.services import eventos, ingestao
+
+    init_engine()
+    eventos.get_backend().start()
+    if get_settings().INGESTAO_ENABLED:
+        ingestao.get_ingestao().start(SessionLocal)
+    yield
+    ingestao.stop_ingestao(SessionLocal)
+    eventos.stop_backend()
+    dispose_engine()
+
+
+def _add_compression(app: FastAPI) -> None:
+    """
+    Comprime respostas acima de `COMPRESSAO_MIN_BYTES`; usa brotli se
+    `brotli-asgi` estiver instalado. O limite é lido quando a pilha de
+    middlewares é montada (primeira requisição), não na importação.
+    """
+    try:
+        from brotli_asgi import BrotliMiddleware
+
+        class CompressionMiddleware(BrotliMiddleware):
+            def __init__(self, app):
+                super().__init__(app, minimum_size=get_settings().COMPRESSAO_MIN_BYTES, gzip_fallback=True)
+    except ImportError:
+        from starlette.middleware.gzip import GZipMiddleware
+
+        class CompressionMiddleware(GZipMiddleware):
+            def __init__(self, app):
+                super().__init__(app, minimum_size=get_settings().COMPRESSAO_MIN_BYTES)
+
+    app.add_middleware(CompressionMiddleware)
+
+
+def tenant_da_requisicao(request: Request) -> int | None:
+    """Tenant da API key da requisição, buscado uma vez e guardado em `request.state`."""
+    if not hasattr(request.state, "tenant_da_chave"):
+        request.state.tenant_da_chave = tenant_da_chave(request.headers.get(get_settings().API_KEY_HEADER))
+    return request.state.tenant_da_chave
+
+
+def create_app() -> FastAPI:
+    """
+    Monta a aplicação.
+
+    Routers (e, por consequência, models e services) são importados aqui e o
+    engine só é criado no lifespan, então importar `app.main` não abre pool
+    nem lê configurações.
+    """
+    from app.routes import admin, eventos, jobs, manutencao, material
+    from app.routes import health as health_routes
+    from app.services import rate_limit
+    from app.services.health import request_latency
+
+    app = FastAPI(
+        title="Sistema de Controle de Materiais",
+        description=DESCRIPTION,
+        version="1.0.0",
+        contact={
+            "name": "Seu Manual Tech",
+            "url": "https://github.com/seu-usuario/seu-manual-tech",
+        },
+        lifespan=lifespan,
+    )
+
+    _add_compression(app)
+
+    app.include_router(manutencao.router)
+    app.include_router(material.router)
+    app.include_router(eventos.router)
+    app.include_router(jobs.router)
+    app.include_router(health_routes.router)
+    app.include_router(admin.router)
+
+    @app.middleware("http")
+    async def record_latency(request: Request, call_next):
+        inicio = time.perf_counter()
+        response = await call_next(request)
+        request_latency.record((time.perf_counter() - inicio) * 1000)
+        return response
+
+    @app.middleware("http")
+    async def route_context(request: Request, call_next):
+        token = set_rota(f"{request.method} {rate_limit.normalizar_caminho(request.url.path)}")
+        try:
+            return await call_next(request)
+        finally:
+            reset_rota(token)
+
+    @app.middleware("http")
+    async def tenant_context(request: Request, call_next):
+        caminho = request.url.path
+        if caminho == "/" or caminho.startswith(ROTAS_SEM_TENANT):
+            return await call_next(request)
+        try:
+            tenant_id = resolver_tenant(request.headers, tenant_da_requisicao(request))
+        except CredencialInvalida as e:
+            return JSONResponse(status_code=401, content={"detail": str(e)})
+        except PermissionError as e:
+            return JSONResponse(status_code=403, content={"detail": str(e)})
+        except ValueError as e:
+            return JSONResponse(status_code=400, content={"detail": str(e)})
+        token = set_tenant(tenant_id)
+        try:
+            return await call_next(request)
+        finally:
+            reset_tenant(token)
+
+    @app.middleware("http")
+    async def admission_control(request: Request, call_next):
+        if not get_settings().RATE_LIMIT_ENABLED:
+            return await call_next(request)
+
+        caminho = rate_limit.normalizar_caminho(request.url.path)
+        if caminho == "/" or caminho.startswith("/health"):
+            return await call_next(request)
+
+        rota = f"{request.method} {caminho}"
+        limite = rate_limit.limite_da_rota(rota)
+        host = request.client.host if request.client else None
+        chave = f"{rate_limit.chave_cliente(request.headers, tenant_da_requisicao(request), host)}|{rota}"
+        backend = rate_limit.get_backend()
+
+        espera = backend.consumir(chave, limite)
+        if espera > 0:
+            return JSONResponse(
+                status_code=429,
+                content={"detail": "Limite de requisições excedido"},
+                headers={"Retry-After": str(max(1, math.ceil(espera)) if math.isfinite(espera) else 60)},
+            )
+        if not backend.entrar(chave, limite):
+            return JSONResponse(
+                status_code=429,
+                content={"detail": "Limite de requisições simultâneas excedido"},
+                headers={"Retry-After": "1"},
+            )
+        try:
+            return await call_next(request)
+        finally:
+            backend.sair(chave)
+
+    @app.get("/")
+    def health():
+        return {"status": "ok"}
+
+    return app
 
 
-@app.get("/")
-def health():
-    return {"status": "ok"}
+def __getattr__(nome: str):
+    # `app.main:app` (testes, uvicorn sem --factory) é montado no primeiro acesso;
+    # importar o módulo sozinho não carrega routers, models nem services
+    if nome == "app":
+        globals()["app"] = create_app()
+        return globals()["app"]
+    raise AttributeError(f"module {__name__!r} has no attribute {nome!r}")
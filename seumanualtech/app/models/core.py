@@ -1,8 +1,9 @@
 from datetime import datetime
-from sqlalchemy import DateTime, Boolean
-from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import DateTime, Boolean, Integer, event
+from sqlalchemy.orm import Mapped, Session, mapped_column, with_loader_criteria
 from sqlalchemy.sql import func
 from app.database.core import Base
+from app.database.tenant import get_tenant
 
 
 class BaseColumns(Base):
@@ -10,7 +11,31 @@ class BaseColumns(Base):
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
 
+    tenant_id: Mapped[int] = mapped_column(Integer, default=get_tenant, server_default="1")
+
     flag_ativo: Mapped[bool] = mapped_column(Boolean, default=True, server_default="true")
 
     criado_em: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
     atualizado_em: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), onupdate=func.now())
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _filtrar_por_tenant(execute_state):
+    """
+    Restringe SELECT/UPDATE/DELETE do ORM ao tenant corrente.
+
+    Use `execution_options(todos_tenants=True)` para rotinas internas que
+    processam todos os tenants (ex.: dispatcher do outbox).
+    """
+    if execute_state.execution_options.get("todos_tenants"):
+        return
+    if execute_state.is_select:
+        if execute_state.is_column_load or execute_state.is_relationship_load:
+            return
+    elif not (execute_state.is_update or execute_state.is_delete):
+        return
+
+    tenant_id = get_tenant()
+    execute_state.statement = execute_state.statement.options(
+        with_loader_criteria(BaseColumns, lambda cls: cls.tenant_id == tenant_id, include_aliases=True)
+    )
@@ -0,0 +1,22 @@
+"""
+Valores monetários em `Decimal`.
+
+Cada linha de consumo é arredondada para centavos (ROUND_HALF_UP).
+Valores são convertidos pela representação em texto, nunca via float.
+Fica junto dos models porque as propriedades calculadas deles usam as
+mesmas regras dos services.
+"""
+from decimal import Decimal, ROUND_HALF_UP
+
+CENTAVO = Decimal("0.01")
+ZERO = Decimal("0.00")
+
+
+def decimal(valor) -> Decimal:
+    if isinstance(valor, Decimal):
+        return valor
+    return Decimal(str(valor))
+
+
+def custo_linha(quantidade, preco_unitario) -> Decimal:
+    return (decimal(quantidade) * decimal(preco_unitario)).quantize(CENTAVO, rounding=ROUND_HALF_UP)
@@ -21,3 +21,11 @@ class StatusManutencao(str, Enum):
         if isinstance(status, cls):
             return status == cls.FINALIZADO
         return status.lower() in ["finalizado", "finalizada", "fechada", "concluida", "concluída"]
+
+
+class StatusJob(str, Enum):
+
+    PENDENTE = "pendente"
+    EXECUTANDO = "executando"
+    CONCLUIDO = "concluido"
+    FALHOU = "falhou"
@@ -0,0 +1,7 @@
+from sqlalchemy import Sequence
+from app.database.core import Base
+
+# Ids do feed de eventos com o backend `postgres`: únicos entre workers e
+# abaixo de 2**53, então chegam exatos a clientes JavaScript. Bancos sem
+# sequências (SQLite) a ignoram; o backend local numera em memória.
+eventos_id_seq = Sequence("eventos_id_seq", metadata=Base.metadata)
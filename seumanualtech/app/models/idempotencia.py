@@ -0,0 +1,20 @@
+from __future__ import annotations
+from datetime import datetime
+from typing import Any
+from sqlalchemy import String, Integer, DateTime, JSON, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+from app.models.core import BaseColumns
+
+
+class IdempotenciaChave(BaseColumns):
+    """Respostas armazenadas por `Idempotency-Key` para reenvio sem reexecutar a operação"""
+    __tablename__ = "idempotencia_chaves"
+    __table_args__ = (
+        UniqueConstraint("tenant_id", "chave", name="uq_idempotencia_chaves_tenant_chave"),
+    )
+
+    chave: Mapped[str] = mapped_column(String(255))
+    fingerprint: Mapped[str] = mapped_column(String(64))
+    status_code: Mapped[int | None] = mapped_column(Integer)
+    resposta: Mapped[Any | None] = mapped_column(JSON)
+    expira_em: Mapped[datetime] = mapped_column(DateTime(timezone=True), index=True)
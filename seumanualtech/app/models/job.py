@@ -0,0 +1,30 @@
+from __future__ import annotations
+from datetime import datetime
+from typing import Any
+from sqlalchemy import String, Integer, DateTime, JSON, Text, Enum as SQLEnum, Index
+from sqlalchemy.orm import Mapped, mapped_column
+from app.models.core import BaseColumns
+from app.models.enums import StatusJob
+
+
+class Job(BaseColumns):
+    """Fila de tarefas pesadas executadas fora da requisição, com progresso persistido"""
+    __tablename__ = "jobs"
+    __table_args__ = (
+        Index("ix_jobs_status_id", "status", "id"),
+    )
+
+    tipo: Mapped[str] = mapped_column(String(100))
+    status: Mapped[StatusJob] = mapped_column(
+        SQLEnum(StatusJob, native_enum=False, length=20),
+        default=StatusJob.PENDENTE,
+        nullable=False
+    )
+    parametros: Mapped[Any] = mapped_column(JSON)
+    progresso: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+    total: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+    resultado: Mapped[dict[str, Any] | None] = mapped_column(JSON)
+    erro: Mapped[str | None] = mapped_column(Text)
+    tentativas: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+    heartbeat_em: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+    concluido_em: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
@@ -1,9 +1,11 @@
 from __future__ import annotations
+from decimal import Decimal
 from typing import TYPE_CHECKING
-from sqlalchemy import String, Enum as SQLEnum
+from sqlalchemy import DDL, String, Enum as SQLEnum, Index, event, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.models.core import BaseColumns
 from app.models.enums import StatusManutencao
+from app.models.dinheiro import ZERO
 
 if TYPE_CHECKING:
     from app.models.manutencao_material import ManutencaoMaterial
@@ -11,6 +13,10 @@ if TYPE_CHECKING:
 
 class Manutencao(BaseColumns):
     __tablename__ = "manutencoes"
+    __table_args__ = (
+        Index("ix_manutencoes_tenant_criado_em", "tenant_id", "criado_em"),
+        Index("ix_manutencoes_tenant_status_criado_em", "tenant_id", "status", "criado_em"),
+    )
 
     resumo: Mapped[str] = mapped_column(String(500))
     status: Mapped[StatusManutencao] = mapped_column(
@@ -25,11 +31,43 @@ class Manutencao(BaseColumns):
     )
     
     @property
-    def custo_total_materiais(self) -> float:
+    def custo_total_materiais(self) -> Decimal:
         """
         Calcula o custo total de todos os materiais consumidos nesta manutenção.
         
         Returns:
             Soma dos custos de todos os materiais consumidos
         """
-        return sum(consumo.custo_calculado for consumo in self.materiais_consumidos)
\ No newline at end of file
+        return sum((consumo.custo_calculado for consumo in self.materiais_consumidos), ZERO)
+
+# `atualizado_em` só é preenchido na primeira alteração; o filtro
+# `atualizado_desde` usa a criação para as manutenções nunca alteradas
+alterado_em = func.coalesce(Manutencao.atualizado_em, Manutencao.criado_em)
+Index("ix_manutencoes_tenant_alterado_em", Manutencao.tenant_id, alterado_em)
+
+# Busca textual em `resumo`. Fica fora do metadata (virtual table / índice de
+# expressão), então é criada aqui para o `create_all` e pela migration
+# correspondente para os bancos versionados.
+BUSCA_DDL_SQLITE = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS manutencoes_fts USING fts5("
+    "resumo, content='manutencoes', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER IF NOT EXISTS manutencoes_fts_ai AFTER INSERT ON manutencoes BEGIN "
+    "INSERT INTO manutencoes_fts(rowid, resumo) VALUES (new.id, new.resumo); END",
+    "CREATE TRIGGER IF NOT EXISTS manutencoes_fts_ad AFTER DELETE ON manutencoes BEGIN "
+    "INSERT INTO manutencoes_fts(manutencoes_fts, rowid, resumo) VALUES ('delete', old.id, old.resumo); END",
+    "CREATE TRIGGER IF NOT EXISTS manutencoes_fts_au AFTER UPDATE OF resumo ON manutencoes BEGIN "
+    "INSERT INTO manutencoes_fts(manutencoes_fts, rowid, resumo) VALUES ('delete', old.id, old.resumo); "
+    "INSERT INTO manutencoes_fts(rowid, resumo) VALUES (new.id, new.resumo); END",
+]
+BUSCA_DDL_POSTGRES = [
+    "CREATE INDEX IF NOT EXISTS ix_manutencoes_resumo_fts ON manutencoes "
+    "USING gin (to_tsvector('portuguese', resumo))",
+]
+
+for _ddl in BUSCA_DDL_SQLITE:
+    event.listen(Manutencao.__table__, "after_create", DDL(_ddl).execute_if(dialect="sqlite"))
+for _ddl in BUSCA_DDL_POSTGRES:
+    event.listen(Manutencao.__table__, "after_create", DDL(_ddl).execute_if(dialect="postgresql"))
+event.listen(
+    Manutencao.__table__, "before_drop", DDL("DROP TABLE IF EXISTS manutencoes_fts").execute_if(dialect="sqlite")
+)
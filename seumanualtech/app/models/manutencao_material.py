@@ -1,19 +1,29 @@
 from __future__ import annotations
-from sqlalchemy import Numeric, ForeignKey
+from decimal import Decimal
+from sqlalchemy import Numeric, ForeignKey, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.models.core import BaseColumns
+from app.models.dinheiro import custo_linha
 
 
 class ManutencaoMaterial(BaseColumns):
     """Tabela de associação para rastrear consumo de materiais em manutenções"""
     __tablename__ = "manutencao_materiais"
+    __table_args__ = (
+        Index("ix_manutencao_materiais_tenant_material_id", "tenant_id", "material_id"),
+        # cobre o EXISTS por material e a soma de custo por manutenção sem ler a tabela
+        Index(
+            "ix_manutencao_materiais_tenant_manutencao_material",
+            "tenant_id", "manutencao_id", "material_id", "quantidade",
+        ),
+    )
 
     manutencao_id: Mapped[int] = mapped_column(ForeignKey("manutencoes.id"), index=True)
-    material_id: Mapped[int] = mapped_column(ForeignKey("materiais.id"), index=True)
+    material_id: Mapped[int] = mapped_column(ForeignKey("materiais.id"))
     quantidade: Mapped[float] = mapped_column(Numeric(10, 2))
     manutencao: Mapped["Manutencao"] = relationship("Manutencao", back_populates="materiais_consumidos")  
     material: Mapped["Material"] = relationship("Material", back_populates="consumos")
     
     @property
-    def custo_calculado(self) -> float:
-        return float(self.quantidade) * float(self.material.preco_unitario)
\ No newline at end of file
+    def custo_calculado(self) -> Decimal:
+        return custo_linha(self.quantidade, self.material.preco_unitario)
\ No newline at end of file
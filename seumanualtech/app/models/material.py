@@ -1,21 +1,46 @@
 from __future__ import annotations
+import re
+import unicodedata
 from typing import TYPE_CHECKING
-from sqlalchemy import String, Numeric
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy import String, Numeric, Index
+from sqlalchemy.orm import Mapped, mapped_column, relationship, validates
 from app.models.core import BaseColumns
 
 if TYPE_CHECKING:
     from app.models.manutencao_material import ManutencaoMaterial
 
 
+def normalizar_nome(nome: str) -> str:
+    """Forma canônica do nome para unicidade: sem acentos, minúsculo e com espaços colapsados."""
+    sem_acentos = "".join(
+        c for c in unicodedata.normalize("NFKD", nome) if not unicodedata.combining(c)
+    )
+    return re.sub(r"\s+", " ", sem_acentos).strip().casefold()
+
+
+def _nome_normalizado_padrao(context) -> str:
+    return normalizar_nome(context.get_current_parameters()["nome"])
+
+
 class Material(BaseColumns):
     """Catálogo de materiais disponíveis para uso em manutenções"""
     __tablename__ = "materiais"
+    __table_args__ = (
+        Index("ux_materiais_tenant_nome_normalizado", "tenant_id", "nome_normalizado", unique=True),
+        Index("ix_materiais_tenant_estoque", "tenant_id", "estoque"),
+    )
 
-    nome: Mapped[str] = mapped_column(String(200), unique=True, index=True)
+    nome: Mapped[str] = mapped_column(String(200))
+    nome_normalizado: Mapped[str] = mapped_column(String(200), default=_nome_normalizado_padrao)
     preco_unitario: Mapped[float] = mapped_column(Numeric(10, 2))
+    estoque: Mapped[float | None] = mapped_column(Numeric(10, 2))
     
     
     consumos: Mapped[list["ManutencaoMaterial"]] = relationship(
         "ManutencaoMaterial", back_populates="material"
     )
+
+    @validates("nome")
+    def _sincronizar_nome_normalizado(self, key: str, nome: str) -> str:
+        self.nome_normalizado = normalizar_nome(nome)
+        return nome
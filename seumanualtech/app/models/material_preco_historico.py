@@ -0,0 +1,14 @@
+from __future__ import annotations
+from sqlalchemy import Numeric, ForeignKey, String
+from sqlalchemy.orm import Mapped, mapped_column
+from app.models.core import BaseColumns
+
+
+class MaterialPrecoHistorico(BaseColumns):
+    """Histórico de alterações do preço unitário dos materiais"""
+    __tablename__ = "materiais_precos_historico"
+
+    material_id: Mapped[int] = mapped_column(ForeignKey("materiais.id", ondelete="CASCADE"), index=True)
+    preco_anterior: Mapped[float] = mapped_column(Numeric(10, 2))
+    preco_novo: Mapped[float] = mapped_column(Numeric(10, 2))
+    origem: Mapped[str] = mapped_column(String(50))
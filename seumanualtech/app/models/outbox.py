@@ -0,0 +1,23 @@
+from __future__ import annotations
+from datetime import datetime
+from typing import Any
+from sqlalchemy import String, Integer, DateTime, JSON, Text, Index
+from sqlalchemy.orm import Mapped, mapped_column
+from app.models.core import BaseColumns
+
+
+class OutboxEvento(BaseColumns):
+    """Eventos para sistemas externos, gravados na mesma transação da alteração que os originou"""
+    __tablename__ = "outbox_eventos"
+    __table_args__ = (
+        Index("ix_outbox_eventos_pendentes", "entregue_em", "proxima_tentativa_em"),
+    )
+
+    tipo: Mapped[str] = mapped_column(String(100))
+    payload: Mapped[dict[str, Any]] = mapped_column(JSON)
+    tentativas: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+    proxima_tentativa_em: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+    entregue_em: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+    ultimo_erro: Mapped[str | None] = mapped_column(Text)
+    # preenchido quando o evento esgota OUTBOX_MAX_TENTATIVAS; não é mais reenviado
+    descartado_em: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
@@ -0,0 +1,66 @@
+"""
+Processo dispatcher do outbox.
+
+Uso:
+    seumanualtech-outbox
+"""
+import logging
+import signal
+import threading
+import time
+
+from app.config import get_settings
+from app.database.core import SessionLocal, init_engine
+from app.services import idempotencia, outbox
+
+logger = logging.getLogger(__name__)
+
+
+def _limpar_idempotencia() -> None:
+    with SessionLocal() as db:
+        try:
+            removidas = idempotencia.limpar_expiradas(db)
+        except Exception:
+            logger.exception("Falha ao remover chaves de idempotência expiradas")
+            return
+    if removidas:
+        logger.info("Idempotência: %s chaves expiradas removidas", removidas)
+
+
+def run(parar: threading.Event, sink: outbox.Sink | None = None) -> None:
+    """
+    Entrega lotes até `parar` ser sinalizado; dorme apenas quando não há pendentes.
+
+    A cada `IDEMPOTENCIA_LIMPEZA_INTERVALO` segundos também remove as chaves
+    de idempotência expiradas.
+    """
+    settings = get_settings()
+    sink = sink or outbox.get_sink()
+    init_engine()
+    proxima_limpeza = 0.0
+    while not parar.is_set():
+        if time.monotonic() >= proxima_limpeza:
+            _limpar_idempotencia()
+            proxima_limpeza = time.monotonic() + settings.IDEMPOTENCIA_LIMPEZA_INTERVALO
+        with SessionLocal() as db:
+            try:
+                entregues = outbox.dispatch_lote(db, sink)
+            except Exception:
+                logger.exception("Falha ao processar lote do outbox")
+                entregues = 0
+        if entregues:
+            logger.info("Outbox: %s eventos entregues", entregues)
+        else:
+            parar.wait(settings.OUTBOX_INTERVALO)
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO)
+    parar = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: parar.set())
+    signal.signal(signal.SIGINT, lambda *_: parar.set())
+    run(parar)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+import hmac
+
+from fastapi import APIRouter, Depends, Header, HTTPException
+
+from app.config import get_settings
+from app.database.slow_queries import get_recorder
+
+router = APIRouter(prefix="/admin", tags=["Admin"])
+
+
+def exigir_admin(x_admin_token: str | None = Header(default=None)) -> None:
+    """Exige o header `X-Admin-Token` igual a `ADMIN_TOKEN`; sem token configurado, os endpoints ficam fechados."""
+    token = get_settings().ADMIN_TOKEN
+    if not token or not x_admin_token or not hmac.compare_digest(token, x_admin_token):
+        raise HTTPException(status_code=403, detail="Acesso restrito")
+
+
+@router.get("/slow-queries", dependencies=[Depends(exigir_admin)])
+def listar_slow_queries(limit: int = 50):
+    """
+    Consultas lentas registradas neste worker, da mais recente para a mais antiga
+
+    - Requer `SLOW_QUERY_ENABLED` e o header **X-Admin-Token**
+    - Cada registro traz statement, parâmetros (redigidos por padrão), rota e plano de execução
+    """
+    return {"habilitado": get_settings().SLOW_QUERY_ENABLED, "registros": get_recorder().registros()[:limit]}
+
+
+@router.delete("/slow-queries", status_code=204, dependencies=[Depends(exigir_admin)])
+def limpar_slow_queries():
+    """Esvazia o buffer de consultas lentas deste worker"""
+    get_recorder().clear()
+    return None
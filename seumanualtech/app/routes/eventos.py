@@ -0,0 +1,84 @@
+import asyncio
+import json
+
+from fastapi import APIRouter, Header, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+from app.config import get_settings
+from app.database.tenant import CredencialInvalida, get_tenant, resolver_tenant
+from app.services import eventos as service
+
+router = APIRouter(prefix="/eventos", tags=["Eventos"])
+
+
+def _formatar_sse(evento: dict) -> str:
+    return f"id: {evento['id']}\nevent: {evento['tipo']}\ndata: {json.dumps(evento)}\n\n"
+
+
+async def stream_eventos(request: Request, desde: int | None, tenant_id: int):
+    """Gera o stream SSE do tenant: eventos pendentes desde `desde` e depois os novos"""
+    fila = service.broadcaster.assinar()
+    vistos = service.Vistos(get_settings().EVENTOS_BUFFER)
+    try:
+        if desde is not None:
+            for evento in service.broadcaster.desde(desde, tenant_id):
+                vistos.novo(evento["id"])
+                yield _formatar_sse(evento)
+
+        keepalive = get_settings().EVENTOS_KEEPALIVE
+        while not await request.is_disconnected():
+            try:
+                evento = await asyncio.wait_for(fila.get(), timeout=keepalive)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            if evento["tenant_id"] != tenant_id or not vistos.novo(evento["id"]):
+                continue
+            yield _formatar_sse(evento)
+    finally:
+        service.broadcaster.cancelar(fila)
+
+
+@router.get("/stream")
+async def eventos_stream(
+    request: Request,
+    desde: int | None = None,
+    last_event_id: int | None = Header(default=None),
+):
+    """
+    Stream (Server-Sent Events) de alterações em manutenções e materiais
+
+    - **desde**: Retoma a partir do id de evento informado
+    - **Last-Event-ID**: Header enviado automaticamente pelo EventSource na reconexão
+    """
+    return StreamingResponse(
+        stream_eventos(request, last_event_id if last_event_id is not None else desde, get_tenant()),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.websocket("/ws")
+async def eventos_websocket(websocket: WebSocket, desde: int | None = None):
+    """Mesmo feed via WebSocket, com retomada por `desde`"""
+    try:
+        tenant_id = resolver_tenant(websocket.headers)
+    except (CredencialInvalida, PermissionError, ValueError):
+        await websocket.close(code=1008)
+        return
+    await websocket.accept()
+    fila = service.broadcaster.assinar()
+    vistos = service.Vistos(get_settings().EVENTOS_BUFFER)
+    try:
+        if desde is not None:
+            for evento in service.broadcaster.desde(desde, tenant_id):
+                vistos.novo(evento["id"])
+                await websocket.send_json(evento)
+        while True:
+            evento = await fila.get()
+            if evento["tenant_id"] != tenant_id or not vistos.novo(evento["id"]):
+                continue
+            await websocket.send_json(evento)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        service.broadcaster.cancelar(fila)
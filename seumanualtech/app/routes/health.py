@@ -0,0 +1,32 @@
+from fastapi import APIRouter, Depends
+from fastapi.responses import JSONResponse
+from sqlalchemy.orm import Session
+from app.database.core import get_db
+from app.services import health as service
+
+router = APIRouter(prefix="/health", tags=["Health"])
+
+
+@router.get("/live")
+def liveness():
+    """Indica apenas que o processo está respondendo (não acessa o banco)"""
+    return {"status": "ok"}
+
+
+@router.get("/ready")
+def readiness(db: Session = Depends(get_db)):
+    """
+    Verifica se o worker pode receber tráfego
+
+    - Mede um round trip ao banco
+    - Verifica ocupação do pool de conexões e p99 recente
+    - Retorna 503 quando algum limite de `Settings` é excedido
+    """
+    pronto, detalhes = service.readiness(db)
+    return JSONResponse(status_code=200 if pronto else 503, content=detalhes)
+
+
+@router.get("/worker")
+def health_worker():
+    """Estado do processo worker que atendeu a requisição"""
+    return service.worker_status()
@@ -0,0 +1,21 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from app.database.core import get_db
+from app.schemas.job import JobSchema
+from app.services import jobs as service
+
+router = APIRouter(prefix="/jobs", tags=["Jobs"])
+
+
+@router.get("/{id}", response_model=JobSchema)
+def get_job(id: int, db: Session = Depends(get_db)):
+    """
+    Consulta o andamento de um job
+
+    - **progresso** / **total**: Itens processados até o momento
+    - **resultado**: Contadores acumulados (ex: criados, ignorados)
+    """
+    job = service.get_by_id(db, id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job não encontrado")
+    return job
@@ -1,34 +1,88 @@
-from fastapi import APIRouter, Depends, HTTPException
+import json
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
+from app.config import get_settings
 from app.database.core import get_db
-from app.schemas.manutencao import ManutencaoSchema, ManutencaoCreate
-from app.schemas.material import MaterialConsumoCreate
+from app.schemas.manutencao import ManutencaoSchema, ManutencaoCreate, ManutencaoBuscaItem, ManutencaoBuscaResultado
+from app.schemas.material import ConsumoAceito, MaterialConsumoCreate
 from app.services import manutencao as service
 from app.services import material as material_service
+from app.services import busca
+from app.services import idempotencia
+from app.services import ingestao
+from app.services import jobs as jobs_service
+from app.schemas.job import JobSchema
 
 router = APIRouter(prefix="/manutencao", tags=["Manutencao"])
 
 
+def _resolver_campos(fields: str | None) -> set[str] | None:
+    try:
+        return service.resolver_campos(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def _podar(schema: ManutencaoSchema, campos: set[str]) -> dict:
+    return schema.model_dump(mode="json", by_alias=True, include=campos)
+
+
 @router.post("/", response_model=ManutencaoSchema, status_code=201)
-def create_manutencao(data: ManutencaoCreate, db: Session = Depends(get_db)):
-    """Cria uma nova manutenção"""
-    manutencao = service.create(db, data)
-    return service.get_by_id_with_materials(db, manutencao.id)
+def create_manutencao(
+    data: ManutencaoCreate,
+    db: Session = Depends(get_db),
+    idempotency_key: str | None = Header(default=None),
+):
+    """
+    Cria uma nova manutenção
+
+    - **Idempotency-Key**: Retentativas com a mesma chave recebem a resposta original
+    """
+    def criar():
+        manutencao = service.create(db, data)
+        return service.get_by_id_with_materials(db, manutencao.id)
+
+    return idempotencia.executar(
+        db, idempotency_key, "POST /manutencao/", data.model_dump_json(),
+        criar, ManutencaoSchema, status_code=201,
+    )
 
 
 @router.post("/bulk", response_model=list[ManutencaoSchema], status_code=201)
-def create_manutencoes_bulk(data: list[ManutencaoCreate], db: Session = Depends(get_db)):
+def create_manutencoes_bulk(
+    data: list[ManutencaoCreate],
+    db: Session = Depends(get_db),
+    idempotency_key: str | None = Header(default=None),
+):
     """
     Cria múltiplas manutenções de uma vez
     
     - Todas as manutenções serão criadas em uma única transação
     - Retorna a lista de manutenções criadas com seus materiais (vazio inicialmente)
+    - **Idempotency-Key**: Retentativas com a mesma chave recebem a resposta original
     """
     if not data:
         raise HTTPException(status_code=400, detail="Lista de manutenções não pode ser vazia")
     
-    created = service.create_bulk(db, data)
-    return created
+    return idempotencia.executar(
+        db, idempotency_key, "POST /manutencao/bulk", json.dumps([item.model_dump(mode="json") for item in data]),
+        lambda: service.create_bulk(db, data), list[ManutencaoSchema], status_code=201,
+    )
+
+
+@router.post("/bulk/async", response_model=JobSchema, status_code=202)
+def create_manutencoes_bulk_async(data: list[ManutencaoCreate], db: Session = Depends(get_db)):
+    """
+    Enfileira a criação de muitas manutenções e retorna o job imediatamente
+
+    - Acompanhe o andamento em **GET /jobs/{id}**
+    """
+    if not data:
+        raise HTTPException(status_code=400, detail="Lista de manutenções não pode ser vazia")
+    return jobs_service.enfileirar(db, "manutencoes.create_bulk", [item.model_dump(mode="json") for item in data])
 
 
 @router.get("/", response_model=list[ManutencaoSchema])
@@ -36,6 +90,13 @@ def list_manutencoes(
     skip: int = 0, 
     limit: int = 100,
     status: str | None = None,
+    fields: str | None = None,
+    criado_desde: datetime | None = None,
+    criado_ate: datetime | None = None,
+    atualizado_desde: datetime | None = None,
+    material_ids: str | None = None,
+    custo_min: float | None = Query(None, ge=0),
+    custo_max: float | None = Query(None, ge=0),
     db: Session = Depends(get_db)
 ):
     """
@@ -44,16 +105,84 @@ def list_manutencoes(
     - **skip**: Número de registros a pular (paginação)
     - **limit**: Número máximo de registros a retornar (máx: 100)
     - **status**: Filtro por status da manutenção (ex: 'aberta', 'FINALIZADA')
+    - **fields**: Campos a retornar (ex: 'id,resumo,custoTotalMateriais'); sem 'materiais' os consumos não são consultados
+    - **criado_desde** / **criado_ate**: Intervalo de criação (`criado_ate` exclusivo)
+    - **atualizado_desde**: Apenas manutenções criadas ou alteradas a partir desta data
+    - **material_ids**: Ids de materiais separados por vírgula; retorna as manutenções que usaram algum deles
+    - **custo_min** / **custo_max**: Faixa do custo total de materiais
     """
-    return service.list_all(db, skip=skip, limit=limit, status=status)
+    campos = _resolver_campos(fields)
+    lista_materiais = None
+    if material_ids is not None:
+        try:
+            lista_materiais = [int(parte) for parte in material_ids.split(",") if parte.strip()]
+        except ValueError:
+            raise HTTPException(
+                status_code=400, detail="Parâmetro 'material_ids' deve conter inteiros separados por vírgula"
+            )
+    manutencoes = service.list_all(
+        db,
+        skip=skip,
+        limit=limit,
+        status=status,
+        campos=campos,
+        criado_desde=criado_desde,
+        criado_ate=criado_ate,
+        atualizado_desde=atualizado_desde,
+        material_ids=lista_materiais,
+        custo_min=custo_min,
+        custo_max=custo_max,
+    )
+    if campos:
+        return JSONResponse(content=[_podar(manutencao, campos) for manutencao in manutencoes])
+    return manutencoes
+
+
+@router.get("/busca", response_model=ManutencaoBuscaResultado)
+def buscar_manutencoes(
+    q: str = Query(..., min_length=1, max_length=200),
+    status: str | None = None,
+    desde: datetime | None = None,
+    ate: datetime | None = None,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: str | None = None,
+    db: Session = Depends(get_db),
+):
+    """
+    Busca textual no resumo das manutenções, das mais relevantes para as menos
+
+    - **q**: Termos da busca (ex: 'parede norte'); acentos e plurais são ignorados
+    - **status**, **desde**, **ate**: Filtros por status e data de criação (`ate` exclusivo)
+    - **cursor**: Valor de `proximoCursor` da página anterior
+    """
+    try:
+        linhas, proximo = busca.buscar(db, q, status=status, desde=desde, ate=ate, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return ManutencaoBuscaResultado(
+        itens=[
+            ManutencaoBuscaItem(
+                id=linha.id, resumo=linha.resumo, status=linha.status, created_at=linha.criado_em, rank=linha.rank
+            )
+            for linha in linhas
+        ],
+        proximo_cursor=proximo,
+    )
 
 
 @router.get("/{id}", response_model=ManutencaoSchema)
-def get_manutencao(id: int, db: Session = Depends(get_db)):
-    """Busca uma manutenção por ID com materiais e custo total"""
-    obj = service.get_by_id_with_materials(db, id)
+def get_manutencao(id: int, fields: str | None = None, db: Session = Depends(get_db)):
+    """
+    Busca uma manutenção por ID com materiais e custo total
+
+    - **fields**: Campos a retornar (ex: 'id,resumo,custoTotalMateriais')
+    """
+    campos = _resolver_campos(fields)
+    obj = service.get_by_id_campos(db, id, campos)
     if not obj:
         raise HTTPException(status_code=404, detail="Manutenção não encontrada")
+    if campos:
+        return JSONResponse(content=_podar(obj, campos))
     return obj
 
 
@@ -79,14 +208,48 @@ def delete_manutencao(id: int, db: Session = Depends(get_db)):
 def adicionar_material_manutencao(
     id: int, 
     data: MaterialConsumoCreate, 
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    idempotency_key: str | None = Header(default=None),
 ):
-    """Adiciona um material a uma manutenção"""
-    try:
+    """
+    Adiciona um material a uma manutenção
+
+    - **Idempotency-Key**: Retentativas com a mesma chave não duplicam o consumo
+    """
+    def adicionar():
         material_service.adicionar_material_manutencao(db, id, data)
         manutencao = service.get_by_id_with_materials(db, id)
         if not manutencao:
             raise HTTPException(status_code=404, detail="Manutencao not found")
         return manutencao
+
+    try:
+        return idempotencia.executar(
+            db, idempotency_key, f"POST /manutencao/{id}/materiais", data.model_dump_json(),
+            adicionar, ManutencaoSchema,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/{id}/materiais/ingestao", response_model=ConsumoAceito, status_code=202)
+def ingerir_material_manutencao(id: int, data: MaterialConsumoCreate, db: Session = Depends(get_db)):
+    """
+    Registra um consumo para gravação em lote (dispensers e outras fontes de alta frequência)
+
+    - O ack (202) é enviado após o consumo ser gravado no WAL em disco
+    - O consumo aparece na manutenção após o próximo lote (até `INGESTAO_INTERVALO_MS`)
+    - Consumos sem estoque suficiente no momento da gravação são descartados e registrados em log
+    """
+    if not get_settings().INGESTAO_ENABLED:
+        raise HTTPException(status_code=404, detail="Ingestão em lote desabilitada")
+    fila = ingestao.get_ingestao()
+    try:
+        sequencia = fila.aceitar(db, id, data)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
+    except ingestao.BufferCheio:
+        raise HTTPException(
+            status_code=503, detail="Buffer de ingestão cheio", headers={"Retry-After": "1"}
+        )
+    return ConsumoAceito(sequencia=sequencia, pendentes=fila.pendentes)
@@ -1,53 +1,84 @@
-from fastapi import APIRouter, Depends, HTTPException
+import json
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Response
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from app.database.core import get_db
-from app.schemas.material import MaterialSchema, MaterialCreate
+from app.schemas.material import (
+    MaterialSchema,
+    MaterialCreate,
+    MaterialIdsQuery,
+    MaterialIdsResultado,
+    AtualizacaoPrecos,
+    AtualizacaoPrecosResultado,
+)
 from app.services import material as service
+from app.services import idempotencia
+from app.services import jobs as jobs_service
+from app.schemas.job import JobSchema
 
 router = APIRouter(prefix="/materiais", tags=["Materiais"])
 
 
 @router.post("/", response_model=MaterialSchema, status_code=201)
 def create_material(data: MaterialCreate, db: Session = Depends(get_db)):
-    """Cria um novo material no catálogo"""
-    existing = service.get_by_nome(db, data.nome)
-    if existing:
+    """
+    Cria um novo material no catálogo
+
+    - Nomes são únicos ignorando acentos, maiúsculas e espaços extras
+    """
+    try:
+        return service.create(db, data)
+    except IntegrityError as e:
+        db.rollback()
+        if not service.nome_duplicado(e):
+            raise
         raise HTTPException(
             status_code=400, 
             detail=f"Já existe um material com o nome '{data.nome}'"
         )
-    return service.create(db, data)
 
 
 @router.post("/bulk", response_model=list[MaterialSchema], status_code=201)
-def create_materials_bulk(data: list[MaterialCreate], db: Session = Depends(get_db)):
+def create_materials_bulk(
+    data: list[MaterialCreate],
+    db: Session = Depends(get_db),
+    idempotency_key: str | None = Header(default=None),
+):
     """
     Cria múltiplos materiais de uma vez
     
     - Materiais com nomes duplicados (já existentes) serão ignorados
     - Retorna apenas os materiais criados com sucesso
+    - **Idempotency-Key**: Retentativas com a mesma chave recebem a resposta original
     """
     if not data:
         raise HTTPException(status_code=400, detail="Lista de materiais não pode ser vazia")
     
-    created = service.create_bulk(db, data)
-    
-    if not created:
-        raise HTTPException(
-            status_code=400, 
-            detail="Nenhum material foi criado. Todos os nomes já existem no catálogo."
-        )
-    
-    return created
+    def criar():
+        created = service.create_bulk(db, data)
+        if not created:
+            raise HTTPException(
+                status_code=400, 
+                detail="Nenhum material foi criado. Todos os nomes já existem no catálogo."
+            )
+        return created
+
+    return idempotencia.executar(
+        db, idempotency_key, "POST /materiais/bulk", json.dumps([item.model_dump(mode="json") for item in data]),
+        criar, list[MaterialSchema], status_code=201,
+    )
 
 
 @router.get("/", response_model=list[MaterialSchema])
 def list_materiais(
+    response: Response,
     skip: int = 0, 
     limit: int = 100, 
     nome: str | None = None,
     ordenar_por: str = "nome",
     ordem: str = "asc",
+    ids: str | None = None,
     db: Session = Depends(get_db)
 ):
     """
@@ -58,7 +89,20 @@ def list_materiais(
     - **nome**: Filtro parcial por nome (busca case-insensitive)
     - **ordenar_por**: Campo para ordenação ('nome' ou 'preco_unitario')
     - **ordem**: Direção da ordenação ('asc' ou 'desc')
+    - **ids**: Lista de ids separados por vírgula (ex: '3,1,2'); retorna na ordem
+      informada, ignora os demais filtros e lista os ids inexistentes no header
+      `X-Ids-Nao-Encontrados`
     """
+    if ids is not None:
+        try:
+            lista_ids = [int(parte) for parte in ids.split(",") if parte.strip()]
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Parâmetro 'ids' deve conter inteiros separados por vírgula")
+        materiais, faltantes = service.get_by_ids(db, lista_ids)
+        if faltantes:
+            response.headers["X-Ids-Nao-Encontrados"] = ",".join(str(id) for id in faltantes)
+        return materiais
+
     return service.list_all(
         db, 
         skip=skip, 
@@ -69,6 +113,67 @@ def list_materiais(
     )
 
 
+@router.post("/bulk/async", response_model=JobSchema, status_code=202)
+def create_materials_bulk_async(data: list[MaterialCreate], db: Session = Depends(get_db)):
+    """
+    Enfileira a criação de muitos materiais e retorna o job imediatamente
+
+    - Acompanhe o andamento em **GET /jobs/{id}**
+    - Materiais com nomes já existentes são ignorados, como no `/bulk`
+    """
+    if not data:
+        raise HTTPException(status_code=400, detail="Lista de materiais não pode ser vazia")
+    return jobs_service.enfileirar(db, "materiais.create_bulk", [item.model_dump(mode="json") for item in data])
+
+
+@router.post("/busca", response_model=MaterialIdsResultado)
+def buscar_materiais_por_ids(data: MaterialIdsQuery, db: Session = Depends(get_db)):
+    """
+    Busca materiais por uma lista de ids (variante para listas longas)
+
+    - Uma única consulta `IN` (em blocos), resultado na ordem dos ids
+    - **naoEncontrados**: ids informados que não existem
+    """
+    materiais, faltantes = service.get_by_ids(db, data.ids)
+    return MaterialIdsResultado(materiais=materiais, nao_encontrados=faltantes)
+
+
+@router.post("/precos", response_model=AtualizacaoPrecosResultado)
+def atualizar_precos(data: AtualizacaoPrecos, db: Session = Depends(get_db)):
+    """
+    Atualiza preços em lote
+
+    - **itens**: Tabela de preços por id ou nome (sem diferenciar acentos e maiúsculas), com um UPDATE por bloco
+    - **percentual** / **filtroNome**: Reajuste percentual sobre os materiais filtrados; recusado se
+      algum preço ficaria zero ou negativo
+    - Toda alteração é registrada no histórico de preços
+    """
+    if data.itens is not None:
+        atualizados, nao_encontrados = service.atualizar_precos(db, data.itens)
+        return AtualizacaoPrecosResultado(atualizados=atualizados, nao_encontrados=nao_encontrados)
+    try:
+        atualizados = service.reajustar_precos(db, data.percentual, data.filtro_nome)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return AtualizacaoPrecosResultado(atualizados=atualizados)
+
+
+@router.get("/estoque-baixo", response_model=list[MaterialSchema])
+def list_estoque_baixo(
+    limite: float = 0,
+    skip: int = 0,
+    limit: int = 100,
+    db: Session = Depends(get_db)
+):
+    """
+    Lista materiais com estoque controlado abaixo de um limite
+
+    - **limite**: Estoque máximo para o material ser listado
+    - Materiais sem controle de estoque não aparecem
+    """
+    return service.list_estoque_baixo(db, limite=limite, skip=skip, limit=limit)
+
+
 @router.get("/{id}", response_model=MaterialSchema)
 def get_material(id: int, db: Session = Depends(get_db)):
     """Busca um material por ID"""
@@ -80,15 +185,21 @@ def get_material(id: int, db: Session = Depends(get_db)):
 
 @router.put("/{id}", response_model=MaterialSchema)
 def update_material(id: int, data: MaterialCreate, db: Session = Depends(get_db)):
-    """Atualiza um material existente"""
-    existing = service.get_by_nome(db, data.nome)
-    if existing and existing.id != id:
+    """
+    Atualiza um material existente
+
+    - **estoque**: se omitido, o estoque atual é mantido
+    """
+    try:
+        material = service.update(db, id, data)
+    except IntegrityError as e:
+        db.rollback()
+        if not service.nome_duplicado(e):
+            raise
         raise HTTPException(
             status_code=400, 
             detail=f"Já existe outro material com o nome '{data.nome}'"
         )
-    
-    material = service.update(db, id, data)
     if not material:
         raise HTTPException(status_code=404, detail="Material não encontrado")
     return material
@@ -1,6 +1,13 @@
-from pydantic import BaseModel, ConfigDict
+from decimal import Decimal
+from typing import Annotated
+
+from pydantic import BaseModel, ConfigDict, PlainSerializer
 from pydantic.alias_generators import to_camel
 
 
 class CamelSchema(BaseModel):
     model_config = ConfigDict(alias_generator=to_camel, populate_by_name=True, from_attributes=True)
+
+
+# Valores monetários/quantidades: Decimal internamente, número no JSON
+Dinheiro = Annotated[Decimal, PlainSerializer(float, return_type=float, when_used="json")]
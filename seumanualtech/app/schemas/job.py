@@ -0,0 +1,16 @@
+from app.schemas.core import CamelSchema
+from app.models.enums import StatusJob
+from datetime import datetime
+from typing import Any
+
+
+class JobSchema(CamelSchema):
+    id: int
+    tipo: str
+    status: StatusJob
+    progresso: int
+    total: int
+    resultado: dict[str, Any] | None = None
+    erro: str | None = None
+    criado_em: datetime | None = None
+    concluido_em: datetime | None = None
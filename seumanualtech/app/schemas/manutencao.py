@@ -1,7 +1,8 @@
-from app.schemas.core import CamelSchema
+from app.schemas.core import CamelSchema, Dinheiro
 from app.schemas.material import MaterialConsumoSchema
 from app.models.enums import StatusManutencao
 from datetime import datetime
+from decimal import Decimal
 
 
 class ManutencaoBase(CamelSchema):
@@ -17,4 +18,15 @@ class ManutencaoSchema(ManutencaoBase):
     id: int
     created_at: datetime | None = None
     materiais: list[MaterialConsumoSchema] = []
-    custo_total_materiais: float = 0.0
+    custo_total_materiais: Dinheiro = Decimal("0.00")
+
+
+class ManutencaoBuscaItem(ManutencaoBase):
+    id: int
+    created_at: datetime | None = None
+    rank: float
+
+
+class ManutencaoBuscaResultado(CamelSchema):
+    itens: list[ManutencaoBuscaItem]
+    proximo_cursor: str | None = None
@@ -1,11 +1,12 @@
-from app.schemas.core import CamelSchema
+from app.schemas.core import CamelSchema, Dinheiro
 from datetime import datetime
-from pydantic import Field
+from pydantic import Field, model_validator
 
 
 class MaterialBase(CamelSchema):
     nome: str = Field(..., min_length=1, max_length=200)
     preco_unitario: float = Field(..., gt=0, description="Preço unitário do material")
+    estoque: float | None = Field(None, ge=0, description="Quantidade em estoque (vazio = não controlado)")
 
 
 class MaterialCreate(MaterialBase):
@@ -17,6 +18,50 @@ class MaterialSchema(MaterialBase):
     created_at: datetime | None = None
 
 
+class MaterialIdsQuery(CamelSchema):
+    """Schema para busca de materiais por lista de ids"""
+    ids: list[int] = Field(..., min_length=1, max_length=10000)
+
+
+class MaterialIdsResultado(CamelSchema):
+    materiais: list[MaterialSchema]
+    nao_encontrados: list[int] = []
+
+
+class PrecoItem(CamelSchema):
+    """Novo preço para um material identificado por id ou por nome"""
+    id: int | None = None
+    nome: str | None = None
+    preco_unitario: float = Field(..., gt=0)
+
+    @model_validator(mode="after")
+    def validar_chave(self):
+        if (self.id is None) == (self.nome is None):
+            raise ValueError("Informe 'id' ou 'nome' (apenas um) para cada item")
+        return self
+
+
+class AtualizacaoPrecos(CamelSchema):
+    """
+    Atualização de preços em lote: uma tabela de preços (`itens`) ou um
+    reajuste percentual sobre os materiais filtrados por nome.
+    """
+    itens: list[PrecoItem] | None = None
+    percentual: float | None = Field(None, gt=-100, description="Reajuste em %, ex: 7 para +7%")
+    filtro_nome: str | None = Field(None, description="Filtro parcial por nome para o reajuste percentual")
+
+    @model_validator(mode="after")
+    def validar_modo(self):
+        if (self.itens is None) == (self.percentual is None):
+            raise ValueError("Informe 'itens' ou 'percentual'")
+        return self
+
+
+class AtualizacaoPrecosResultado(CamelSchema):
+    atualizados: int
+    nao_encontrados: list[int | str] = []
+
+
 class MaterialConsumoBase(CamelSchema):
     """Schema para adicionar material a uma manutenção"""
     material_id: int
@@ -27,9 +72,15 @@ class MaterialConsumoCreate(MaterialConsumoBase):
     pass
 
 
+class ConsumoAceito(CamelSchema):
+    """Ack da ingestão: o consumo está no WAL e será gravado no próximo lote"""
+    sequencia: int
+    pendentes: int
+
+
 class MaterialConsumoSchema(CamelSchema):
     id: int
     nome: str
-    quantidade: float
-    preco_unitario: float
-    custo: float = Field(..., description="Custo total = quantidade * preco_unitario")
+    quantidade: Dinheiro
+    preco_unitario: Dinheiro
+    custo: Dinheiro = Field(..., description="Custo total = quantidade * preco_unitario")
@@ -0,0 +1,311 @@
+"""
+Gerador de dados sintéticos em volume de produção.
+
+Carrega materiais, manutenções e consumos reprodutíveis (mesma `--seed`,
+mesmos dados) direto nas tabelas, em lotes:
+
+- materiais com nomes em português e preços log-normais por categoria;
+- manutenções concentradas nos meses recentes, com as antigas quase sempre
+  finalizadas;
+- consumos com popularidade de materiais em lei de potência (Zipf).
+
+No Postgres usa `COPY` quando o driver é psycopg (3); nos demais casos,
+`executemany` em lotes de `--lote` linhas. Os ids são gerados aqui (a partir
+do maior id existente), então consumos referenciam manutenções sem
+`RETURNING`.
+
+Uso:
+    seumanualtech-seed --manutencoes 1000000 --materiais 5000 --seed 42
+"""
+import argparse
+import bisect
+import io
+import itertools
+import math
+import random
+import time
+from collections.abc import Iterator
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+from sqlalchemy import Connection, Engine, Table, func, insert, select, text
+
+from app.config import get_settings
+from app.database.core import Base, init_engine
+from app.models.enums import StatusManutencao
+from app.models.manutencao import Manutencao
+from app.models.manutencao_material import ManutencaoMaterial
+from app.models.material import Material, normalizar_nome
+
+# categoria -> (nomes, especificações, mediana do preço, dispersão log-normal)
+CATEGORIAS = {
+    "basico": (
+        ["Cimento", "Areia", "Brita", "Cal", "Argamassa", "Rejunte", "Gesso"],
+        ["CP-II 50kg", "fina", "média", "grossa", "20kg", "AC-III", "branco", "cinza"],
+        30.0, 0.6,
+    ),
+    "hidraulica": (
+        ["Tubo PVC", "Joelho PVC", "Registro de gaveta", "Torneira", "Sifão", "Válvula de descarga", "Luva soldável"],
+        ["20mm", "25mm", "32mm", "50mm", "3/4\"", "1/2\"", "cromado", "esgoto"],
+        25.0, 0.9,
+    ),
+    "eletrica": (
+        ["Cabo flexível", "Disjuntor", "Tomada", "Interruptor", "Lâmpada LED", "Quadro de distribuição", "Eletroduto"],
+        ["1,5mm²", "2,5mm²", "6mm²", "10A", "20A", "bipolar", "9W", "12 disjuntores"],
+        40.0, 1.0,
+    ),
+    "pintura": (
+        ["Tinta acrílica", "Massa corrida", "Selador", "Rolo de lã", "Pincel", "Lixa", "Fita crepe"],
+        ["18L", "3,6L", "branco neve", "fosco", "acetinado", "nº 120", "23cm", "48mm"],
+        60.0, 1.1,
+    ),
+    "ferragens": (
+        ["Parafuso", "Bucha", "Dobradiça", "Fechadura", "Cadeado", "Prego", "Chumbador"],
+        ["6mm", "8mm", "inox", "zincado", "caixa c/ 100", "3\"", "externa", "tetra"],
+        15.0, 1.2,
+    ),
+}
+MARCAS = ["Votoran", "Tigre", "Amanco", "Suvinil", "Coral", "Pial", "Tramontina", "Gerdau", "Quartzolit", "Genérico"]
+
+SERVICOS = ["Reparo", "Troca", "Instalação", "Pintura", "Revisão", "Limpeza", "Vedação", "Manutenção preventiva"]
+OBJETOS = [
+    "da parede", "do piso", "da torneira", "do telhado", "da calha", "do quadro elétrico", "da porta",
+    "da janela", "do forro", "da tubulação", "das tomadas", "do portão", "do reboco", "da iluminação",
+]
+LOCAIS = [
+    "norte", "sul", "leste", "oeste", "do bloco A", "do bloco B", "da cozinha", "do banheiro social",
+    "da garagem", "da recepção", "do corredor central", "da área externa", "do depósito",
+]
+
+
+def _proximo_id(conn: Connection, tabela: Table) -> int:
+    return (conn.scalar(select(func.max(tabela.c.id))) or 0) + 1
+
+
+def gerar_materiais(
+    rng: random.Random, quantidade: int, tenant_id: int, inicio: int, existentes: set[str] = frozenset()
+) -> list[dict]:
+    materiais = []
+    vistos = set(existentes)
+    categorias = list(CATEGORIAS.values())
+    for i in range(quantidade):
+        nomes, specs, mediana, dispersao = rng.choice(categorias)
+        nome = f"{rng.choice(nomes)} {rng.choice(specs)} - {rng.choice(MARCAS)}"
+        if normalizar_nome(nome) in vistos:
+            nome = f"{nome} ({inicio + i})"
+        vistos.add(normalizar_nome(nome))
+        preco = max(0.5, rng.lognormvariate(0, dispersao) * mediana)
+        materiais.append({
+            "id": inicio + i,
+            "tenant_id": tenant_id,
+            "nome": nome,
+            "nome_normalizado": normalizar_nome(nome),
+            "preco_unitario": Decimal(f"{preco:.2f}"),
+            "estoque": None if rng.random() < 0.3 else Decimal(rng.randint(0, 2000)),
+        })
+    return materiais
+
+
+def gerar_manutencoes(
+    rng: random.Random, quantidade: int, tenant_id: int, inicio: int, dias: int, agora: datetime
+) -> Iterator[dict]:
+    for i in range(quantidade):
+        # idade concentrada nos dias recentes (densidade crescente ao longo do período)
+        idade = dias * rng.random() ** 2
+        finalizada = rng.random() < min(0.97, 0.15 + idade / 45)
+        resumo = f"{rng.choice(SERVICOS)} {rng.choice(OBJETOS)} {rng.choice(LOCAIS)}"
+        criado_em = agora - timedelta(days=idade)
+        yield {
+            "id": inicio + i,
+            "tenant_id": tenant_id,
+            "resumo": resumo,
+            "status": (StatusManutencao.FINALIZADO if finalizada else StatusManutencao.ABERTO).name,
+            "criado_em": criado_em,
+            "atualizado_em": criado_em + timedelta(hours=rng.uniform(1, 72)) if finalizada else None,
+        }
+
+
+def pesos_zipf(quantidade: int, expoente: float) -> list[float]:
+    """Pesos acumulados (para busca binária): o material de posição k tem peso 1/k^expoente."""
+    return list(itertools.accumulate(1 / (k ** expoente) for k in range(1, quantidade + 1)))
+
+
+def gerar_consumos(
+    rng: random.Random,
+    manutencoes: list[dict],
+    material_ids: list[int],
+    pesos: list[float],
+    media: float,
+    tenant_id: int,
+    inicio: int,
+) -> list[dict]:
+    consumos = []
+    total = pesos[-1]
+    proximo = inicio
+    for manutencao in manutencoes:
+        # geométrica com a média pedida: muitas com 1-2 itens, algumas bem longas
+        quantidade = int(rng.expovariate(math.log1p(1 / media))) if media > 0 else 0
+        for _ in range(quantidade):
+            material_id = material_ids[bisect.bisect_left(pesos, rng.random() * total)]
+            consumos.append({
+                "id": proximo,
+                "tenant_id": tenant_id,
+                "manutencao_id": manutencao["id"],
+                "material_id": material_id,
+                "quantidade": Decimal(rng.choice((1, 1, 1, 2, 2, 3, 5, 10))) if rng.random() < 0.8
+                else Decimal(f"{rng.uniform(0.1, 20):.2f}"),
+                "criado_em": manutencao["criado_em"],
+            })
+            proximo += 1
+    return consumos
+
+
+def _copy_postgres(conn: Connection, tabela: Table, linhas: list[dict]) -> None:
+    colunas = list(linhas[0])
+    buffer = io.StringIO()
+    for linha in linhas:
+        buffer.write("\t".join(r"\N" if linha[c] is None else str(linha[c]) for c in colunas) + "\n")
+    cursor = conn.connection.driver_connection.cursor()
+    with cursor.copy(f"COPY {tabela.name} ({', '.join(colunas)}) FROM STDIN") as copy:
+        copy.write(buffer.getvalue())
+
+
+def _inserir(conn: Connection, tabela: Table, linhas: list[dict]) -> None:
+    if not linhas:
+        return
+    if conn.dialect.name == "postgresql" and conn.dialect.driver == "psycopg":
+        _copy_postgres(conn, tabela, linhas)
+    else:
+        conn.execute(insert(tabela), linhas)
+
+
+def _preparar(conn: Connection) -> None:
+    if conn.dialect.name == "sqlite":
+        conn.exec_driver_sql("PRAGMA synchronous = OFF")
+        conn.exec_driver_sql("PRAGMA journal_mode = WAL")
+
+
+def _finalizar(conn: Connection) -> None:
+    if conn.dialect.name == "postgresql":
+        for tabela in (Material.__table__, Manutencao.__table__, ManutencaoMaterial.__table__):
+            conn.execute(text(
+                f"SELECT setval(pg_get_serial_sequence('{tabela.name}', 'id'), (SELECT max(id) FROM {tabela.name}))"
+            ))
+    conn.exec_driver_sql("ANALYZE")
+
+
+def popular(
+    engine: Engine,
+    materiais: int = 5000,
+    manutencoes: int = 100_000,
+    consumos_por_manutencao: float = 3.0,
+    seed: int = 42,
+    tenant_id: int = 1,
+    dias: int = 365,
+    zipf: float = 1.1,
+    lote: int = 50_000,
+    agora: datetime | None = None,
+    progresso=None,
+) -> dict[str, int]:
+    """
+    Gera e grava o conjunto de dados.
+
+    Args:
+        consumos_por_manutencao: Média de consumos por manutenção
+        dias: Período coberto pelas datas de criação
+        zipf: Expoente da popularidade dos materiais (maior = mais concentrado)
+        lote: Manutenções por lote (e por transação)
+        agora: Data de referência; fixe para reprodutibilidade total
+        progresso: Callback opcional chamado com as contagens após cada lote
+
+    Returns:
+        Quantidade de linhas inseridas por tabela
+    """
+    rng = random.Random(seed)
+    agora = agora or datetime.now(timezone.utc)
+    contagem = {"materiais": 0, "manutencoes": 0, "consumos": 0}
+
+    with engine.begin() as conn:
+        _preparar(conn)
+        inicio_material = _proximo_id(conn, Material.__table__)
+        existentes = set(conn.scalars(
+            select(Material.__table__.c.nome_normalizado).where(Material.__table__.c.tenant_id == tenant_id)
+        ))
+        linhas_materiais = gerar_materiais(rng, materiais, tenant_id, inicio_material, existentes)
+        for i in range(0, len(linhas_materiais), lote):
+            _inserir(conn, Material.__table__, linhas_materiais[i:i + lote])
+        contagem["materiais"] = len(linhas_materiais)
+        inicio_manutencao = _proximo_id(conn, Manutencao.__table__)
+        inicio_consumo = _proximo_id(conn, ManutencaoMaterial.__table__)
+
+    # materiais embaralhados para que a popularidade não siga a ordem de criação
+    material_ids = [linha["id"] for linha in linhas_materiais]
+    rng.shuffle(material_ids)
+    pesos = pesos_zipf(len(material_ids), zipf)
+
+    geradas = gerar_manutencoes(rng, manutencoes, tenant_id, inicio_manutencao, dias, agora)
+    while bloco := list(itertools.islice(geradas, lote)):
+        consumos = gerar_consumos(
+            rng, bloco, material_ids, pesos, consumos_por_manutencao, tenant_id, inicio_consumo
+        ) if material_ids else []
+        inicio_consumo += len(consumos)
+        with engine.begin() as conn:
+            _preparar(conn)
+            _inserir(conn, Manutencao.__table__, bloco)
+            _inserir(conn, ManutencaoMaterial.__table__, consumos)
+        contagem["manutencoes"] += len(bloco)
+        contagem["consumos"] += len(consumos)
+        if progresso:
+            progresso(contagem)
+
+    with engine.begin() as conn:
+        _finalizar(conn)
+    return contagem
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Gera dados sintéticos no banco configurado em DATABASE_URL")
+    parser.add_argument("--materiais", type=int, default=5000)
+    parser.add_argument("--manutencoes", type=int, default=100_000)
+    parser.add_argument("--consumos-por-manutencao", type=float, default=3.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--tenant", type=int, default=get_settings().TENANT_PADRAO)
+    parser.add_argument("--dias", type=int, default=365)
+    parser.add_argument("--zipf", type=float, default=1.1)
+    parser.add_argument("--lote", type=int, default=50_000)
+    parser.add_argument("--criar-tabelas", action="store_true", help="Cria as tabelas (sem alembic) antes de carregar")
+    args = parser.parse_args(argv)
+
+    engine = init_engine()
+    if args.criar_tabelas:
+        Base.metadata.create_all(engine)
+
+    inicio = time.perf_counter()
+
+    def progresso(contagem: dict[str, int]) -> None:
+        linhas = sum(contagem.values())
+        decorrido = time.perf_counter() - inicio
+        print(
+            f"{contagem['manutencoes']:>10} manutenções {contagem['consumos']:>10} consumos "
+            f"({linhas / decorrido * 60:,.0f} linhas/min)",
+            flush=True,
+        )
+
+    contagem = popular(
+        engine,
+        materiais=args.materiais,
+        manutencoes=args.manutencoes,
+        consumos_por_manutencao=args.consumos_por_manutencao,
+        seed=args.seed,
+        tenant_id=args.tenant,
+        dias=args.dias,
+        zipf=args.zipf,
+        lote=args.lote,
+        progresso=progresso,
+    )
+    decorrido = time.perf_counter() - inicio
+    print(f"concluído em {decorrido:.1f}s: {contagem}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Ponto de entrada de produção.
+
+Executa a aplicação com múltiplos processos workers do uvicorn. Cada worker
+cria seu próprio engine (e pool de conexões); em servidores baseados em fork
+o pool herdado é descartado por `app.database.core`.
+
+Uso:
+    seumanualtech-server --workers 4 --port 8000
+"""
+import argparse
+import os
+
+import uvicorn
+
+from app.config import get_settings
+
+
+def default_workers() -> int:
+    """
+    Calcula o número de workers a partir da quantidade de CPUs.
+
+    Returns:
+        `SERVER_WORKERS` se configurado, senão o número de CPUs disponíveis
+    """
+    workers = get_settings().SERVER_WORKERS
+    if workers > 0:
+        return workers
+    if hasattr(os, "sched_getaffinity"):
+        return max(len(os.sched_getaffinity(0)), 1)
+    return os.cpu_count() or 1
+
+
+def main(argv: list[str] | None = None) -> None:
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description="Servidor do Sistema de Controle de Materiais")
+    parser.add_argument("--host", default=settings.SERVER_HOST)
+    parser.add_argument("--port", type=int, default=settings.SERVER_PORT)
+    parser.add_argument("--workers", type=int, default=default_workers())
+    parser.add_argument(
+        "--graceful-timeout",
+        type=int,
+        default=settings.SERVER_GRACEFUL_TIMEOUT,
+        help="Segundos para concluir requisições em andamento após SIGTERM",
+    )
+    args = parser.parse_args(argv)
+
+    uvicorn.run(
+        "app.main:create_app",
+        factory=True,
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        timeout_graceful_shutdown=args.graceful_timeout,
+        proxy_headers=True,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Busca textual em `Manutencao.resumo`.
+
+No Postgres usa `to_tsvector('portuguese', resumo)` (índice GIN, stemming do
+dicionário portuguese) com `websearch_to_tsquery` e `ts_rank_cd`. No SQLite
+usa a tabela FTS5 `manutencoes_fts` com `bm25`; como o FTS5 não traz
+stemmer para português, cada termo é reduzido a um radical simples e
+buscado por prefixo ("paredes" -> "pared*").
+
+Os resultados vêm do mais relevante para o menos relevante, com paginação
+por cursor sobre (rank, id).
+"""
+import base64
+import json
+import re
+import unicodedata
+from datetime import datetime
+
+from sqlalchemy import Double, and_, cast, column, func, literal_column, or_, select, table
+from sqlalchemy.orm import Session
+
+from app.models.manutencao import Manutencao
+
+_SUFIXOS = ("coes", "cao", "oes", "aes", "ais", "eis", "ao", "es", "as", "os", "a", "o", "e", "s")
+
+_fts = table("manutencoes_fts", column("rowid"))
+
+
+def _radical(termo: str) -> str:
+    for sufixo in _SUFIXOS:
+        if termo.endswith(sufixo) and len(termo) - len(sufixo) >= 3:
+            return termo[: -len(sufixo)]
+    return termo
+
+
+def consulta_fts5(texto: str) -> str:
+    """
+    Converte o texto digitado em uma consulta FTS5 segura: termos sem acento,
+    reduzidos ao radical e buscados por prefixo, todos obrigatórios.
+    """
+    sem_acentos = "".join(
+        c for c in unicodedata.normalize("NFKD", texto.casefold()) if not unicodedata.combining(c)
+    )
+    return " ".join(f'"{_radical(termo)}"*' for termo in re.findall(r"\w+", sem_acentos))
+
+
+def codificar_cursor(rank: float, id: int) -> str:
+    return base64.urlsafe_b64encode(json.dumps([rank, id]).encode()).decode()
+
+
+def decodificar_cursor(cursor: str) -> tuple[float, int]:
+    """
+    Raises:
+        ValueError: Se o cursor não foi gerado por `codificar_cursor`
+    """
+    try:
+        rank, id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return float(rank), int(id)
+    except (ValueError, TypeError):
+        raise ValueError("Cursor inválido")
+
+
+def buscar(
+    db: Session,
+    texto: str,
+    status: str | None = None,
+    desde: datetime | None = None,
+    ate: datetime | None = None,
+    limit: int = 20,
+    cursor: str | None = None,
+) -> tuple[list, str | None]:
+    """
+    Busca manutenções pelo texto do resumo.
+
+    Args:
+        texto: Termos da busca, ex.: 'parede norte'
+        status: Filtro por status
+        desde: Criadas a partir desta data (inclusive)
+        ate: Criadas antes desta data (exclusive)
+        limit: Tamanho da página
+        cursor: `proximo_cursor` da página anterior
+
+    Returns:
+        Linhas (id, resumo, status, criado_em, rank) e o cursor da próxima
+        página (None na última)
+
+    Raises:
+        ValueError: Se o texto não tem termos pesquisáveis ou o cursor é inválido
+    """
+    termos = consulta_fts5(texto)
+    if not termos:
+        raise ValueError("Informe ao menos um termo para a busca")
+
+    if db.get_bind().dialect.name == "postgresql":
+        vetor = func.to_tsvector(literal_column("'portuguese'"), Manutencao.resumo)
+        consulta = func.websearch_to_tsquery(literal_column("'portuguese'"), texto)
+        # só stopwords ("de a") viram uma tsquery vazia
+        if not db.scalar(select(func.numnode(consulta))):
+            raise ValueError("Informe ao menos um termo para a busca")
+        # ts_rank_cd devolve real; em double precision o valor volta igual no
+        # cursor e a comparação com o rank da página anterior não pula empates
+        rank = cast(func.ts_rank_cd(vetor, consulta), Double)
+        query = select(Manutencao.id).where(vetor.op("@@")(consulta))
+    else:
+        rank = -func.bm25(literal_column("manutencoes_fts"))
+        query = (
+            select(Manutencao.id)
+            .join(_fts, _fts.c.rowid == Manutencao.id)
+            .where(literal_column("manutencoes_fts").op("MATCH")(termos))
+        )
+
+    query = query.add_columns(
+        Manutencao.resumo, Manutencao.status, Manutencao.criado_em, rank.label("rank")
+    )
+    if status:
+        query = query.where(Manutencao.status == status)
+    if desde:
+        query = query.where(Manutencao.criado_em >= desde)
+    if ate:
+        query = query.where(Manutencao.criado_em < ate)
+
+    # o rank é calculado na subconsulta para poder ser filtrado pelo cursor
+    ranqueadas = query.subquery("ranqueadas")
+    pagina = select(ranqueadas)
+    if cursor:
+        rank_cursor, id_cursor = decodificar_cursor(cursor)
+        pagina = pagina.where(or_(
+            ranqueadas.c.rank < rank_cursor,
+            and_(ranqueadas.c.rank == rank_cursor, ranqueadas.c.id < id_cursor),
+        ))
+    pagina = pagina.order_by(ranqueadas.c.rank.desc(), ranqueadas.c.id.desc()).limit(limit + 1)
+
+    linhas = db.execute(pagina).all()
+    proximo = None
+    if len(linhas) > limit:
+        linhas = linhas[:limit]
+        proximo = codificar_cursor(linhas[-1].rank, linhas[-1].id)
+    return linhas, proximo
@@ -0,0 +1,88 @@
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from typing import Any
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.value: Any = None
+        self.error: BaseException | None = None
+        self.invalidated = False
+
+
+class SingleFlightCache:
+    """
+    Cache em memória (por worker) com TTL curto e coalescência de leituras.
+
+    Chamadas simultâneas para a mesma chave aguardam uma única execução do
+    loader. Valores `None` não são armazenados. `invalidate` marca o load em
+    andamento da chave como invalidado, então ele não grava um valor antigo
+    no cache, e as leituras seguintes disparam um load novo. Guarda no
+    máximo `max_chaves` valores, descartando os mais antigos.
+    """
+
+    def __init__(self, ttl: Callable[[], float] | float, max_chaves: int = 10_000):
+        self._ttl = ttl
+        self._lock = threading.Lock()
+        self._values: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._flights: dict[Hashable, _Flight] = {}
+        self._max_chaves = max_chaves
+
+    def _ttl_seconds(self) -> float:
+        return self._ttl() if callable(self._ttl) else self._ttl
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        with self._lock:
+            cached = self._values.get(key)
+            if cached:
+                if cached[0] > time.monotonic():
+                    return cached[1]
+                del self._values[key]
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+
+        if not leader:
+            flight.done.wait()
+            if flight.error:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = loader()
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                ttl = self._ttl_seconds()
+                if flight.error is None and flight.value is not None and ttl > 0 and not flight.invalidated:
+                    self._values[key] = (time.monotonic() + ttl, flight.value)
+                    self._values.move_to_end(key)
+                    while len(self._values) > self._max_chaves:
+                        self._values.popitem(last=False)
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+            flight.done.set()
+        return flight.value
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            self._values.pop(key, None)
+            flight = self._flights.pop(key, None)
+            if flight:
+                flight.invalidated = True
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+            for flight in self._flights.values():
+                flight.invalidated = True
+            self._flights.clear()
+
+    def __len__(self) -> int:
+        return len(self._values)
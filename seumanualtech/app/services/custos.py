@@ -0,0 +1,26 @@
+"""
+Cálculo de custos em `Decimal`.
+
+Cada linha de consumo é arredondada para centavos (ROUND_HALF_UP) e os
+totais são a soma das linhas, então o total exibido sempre bate com a soma
+dos custos listados. As regras por linha ficam em `app.models.dinheiro`,
+usado também pelas propriedades dos models.
+"""
+from collections import defaultdict
+from collections.abc import Iterable
+from decimal import Decimal
+
+from app.models.dinheiro import ZERO, custo_linha
+
+
+def totais_por_manutencao(linhas: Iterable[tuple[int, object, object]]) -> dict[int, Decimal]:
+    """
+    Soma em uma passada os custos de linhas (manutencao_id, quantidade, preco_unitario).
+
+    Returns:
+        Custo total por manutenção (manutenções sem linhas não aparecem)
+    """
+    totais: dict[int, Decimal] = defaultdict(lambda: ZERO)
+    for manutencao_id, quantidade, preco_unitario in linhas:
+        totais[manutencao_id] += custo_linha(quantidade, preco_unitario)
+    return dict(totais)
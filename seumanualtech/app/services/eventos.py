@@ -0,0 +1,273 @@
+"""
+Feed de alterações de manutenções e materiais.
+
+Os services publicam um evento após cada commit. O `Broadcaster` de cada
+worker mantém um buffer circular (para retomada via `Last-Event-ID`) e
+entrega os eventos aos assinantes conectados (SSE/WebSocket). O backend
+define como os eventos chegam aos outros workers:
+
+- `local`: apenas o próprio processo (desenvolvimento e testes)
+- `postgres`: `pg_notify` na publicação e um listener `LISTEN` por worker
+
+O backend numera os eventos com ids inteiros abaixo de 2**53, que clientes
+JavaScript devolvem sem arredondar em `desde`/`Last-Event-ID`.
+"""
+import asyncio
+import json
+import logging
+import select
+import threading
+import time
+from collections import deque
+from typing import Any
+
+from sqlalchemy import text
+
+from app.config import get_settings
+from app.database.tenant import get_tenant
+from app.models.evento import eventos_id_seq
+
+logger = logging.getLogger(__name__)
+
+_id_lock = threading.Lock()
+_ultimo_id = 0
+
+
+def _novo_id() -> int:
+    # Milissegundos << 11 mais um contador: crescente no processo (inclusive
+    # entre reinícios) e abaixo de 2**53 até o ano 2109
+    global _ultimo_id
+    with _id_lock:
+        _ultimo_id = max(time.time_ns() // 1_000_000 << 11, _ultimo_id + 1)
+        return _ultimo_id
+
+
+class Vistos:
+    """
+    Ids já entregues a um assinante, limitado aos `tamanho` mais recentes.
+
+    Evita reenviar um evento recebido pelo replay e pela fila sem descartar
+    eventos de outro worker com id menor que chegam depois.
+    """
+
+    def __init__(self, tamanho: int):
+        self._ordem: deque[int] = deque()
+        self._ids: set[int] = set()
+        self._tamanho = tamanho
+
+    def novo(self, id: int) -> bool:
+        """Registra o id; False se ele já foi visto."""
+        if id in self._ids:
+            return False
+        self._ordem.append(id)
+        self._ids.add(id)
+        if len(self._ordem) > self._tamanho:
+            self._ids.discard(self._ordem.popleft())
+        return True
+
+
+class Broadcaster:
+    def __init__(self, buffer_size: int | None = None):
+        self._buffer_size = buffer_size
+        self._buffer: deque[dict] | None = None
+        self._lock = threading.Lock()
+        self._assinantes: set[tuple[asyncio.AbstractEventLoop, asyncio.Queue]] = set()
+
+    def _eventos(self) -> deque[dict]:
+        if self._buffer is None:
+            self._buffer = deque(maxlen=self._buffer_size or get_settings().EVENTOS_BUFFER)
+        return self._buffer
+
+    def dispatch(self, evento: dict) -> None:
+        """Registra o evento no buffer e entrega aos assinantes (thread-safe)."""
+        with self._lock:
+            self._eventos().append(evento)
+            assinantes = list(self._assinantes)
+        for loop, fila in assinantes:
+            try:
+                loop.call_soon_threadsafe(fila.put_nowait, evento)
+            except RuntimeError:
+                # Loop já encerrado; a assinatura é removida pelo próprio consumidor
+                pass
+
+    def desde(self, ultimo_id: int, tenant_id: int | None = None) -> list[dict]:
+        """
+        Eventos recebidos depois de `ultimo_id`.
+
+        Os ids de workers diferentes não chegam em ordem, então se o evento
+        `ultimo_id` ainda está no buffer vale a ordem de chegada; senão, os de
+        id maior.
+        """
+        with self._lock:
+            eventos = list(self._eventos())
+        posicao = next((i for i, evento in enumerate(eventos) if evento["id"] == ultimo_id), None)
+        if posicao is not None:
+            eventos = eventos[posicao + 1:]
+        else:
+            eventos = [evento for evento in eventos if evento["id"] > ultimo_id]
+        return [evento for evento in eventos if tenant_id is None or evento["tenant_id"] == tenant_id]
+
+    def assinar(self) -> asyncio.Queue:
+        fila: asyncio.Queue = asyncio.Queue()
+        with self._lock:
+            self._assinantes.add((asyncio.get_running_loop(), fila))
+        return fila
+
+    def cancelar(self, fila: asyncio.Queue) -> None:
+        with self._lock:
+            self._assinantes = {item for item in self._assinantes if item[1] is not fila}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._eventos().clear()
+
+
+class LocalBackend:
+    """Entrega os eventos apenas aos assinantes deste processo."""
+
+    def __init__(self, broadcaster: Broadcaster):
+        self.broadcaster = broadcaster
+
+    def start(self) -> None:
+        pass
+
+    def stop(self) -> None:
+        pass
+
+    def publish(self, evento: dict) -> None:
+        evento["id"] = _novo_id()
+        self.broadcaster.dispatch(evento)
+
+
+class PostgresNotifyBackend:
+    """
+    Distribui os eventos entre workers via `NOTIFY`/`LISTEN` do Postgres.
+
+    A publicação numera o evento pela sequência `eventos_id_seq` e chama
+    `pg_notify` em uma conexão do engine; cada worker mantém uma conexão
+    dedicada em LISTEN (psycopg2 ou psycopg 3) numa thread daemon que repassa
+    as notificações ao broadcaster local. Se a conexão cai, a thread registra
+    o erro e reconecta com backoff.
+    """
+
+    ESPERA_INICIAL = 1.0
+    ESPERA_MAX = 30.0
+
+    def __init__(self, broadcaster: Broadcaster, canal: str):
+        self.broadcaster = broadcaster
+        self.canal = canal
+        self._thread: threading.Thread | None = None
+        self._parar = threading.Event()
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._parar.clear()
+        self._thread = threading.Thread(target=self._escutar, name="eventos-listen", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._parar.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def publish(self, evento: dict) -> None:
+        from app.database.core import init_engine
+
+        self.start()
+        with init_engine().begin() as conn:
+            evento["id"] = conn.scalar(eventos_id_seq.next_value().select())
+            conn.execute(text("SELECT pg_notify(:canal, :payload)"), {"canal": self.canal, "payload": json.dumps(evento)})
+
+    def _escutar(self) -> None:
+        from app.database.core import init_engine
+
+        espera = self.ESPERA_INICIAL
+        while not self._parar.is_set():
+            try:
+                raw = init_engine().raw_connection()
+            except Exception:
+                logger.exception("Falha ao conectar o listener de eventos; nova tentativa em %.0fs", espera)
+            else:
+                try:
+                    espera = self.ESPERA_INICIAL
+                    self._receber(raw.driver_connection)
+                except Exception:
+                    logger.exception("Listener de eventos caiu; reconectando em %.0fs", espera)
+                finally:
+                    try:
+                        raw.close()
+                    except Exception:
+                        pass
+            self._parar.wait(espera)
+            espera = min(espera * 2, self.ESPERA_MAX)
+
+    def _receber(self, dbapi_conn) -> None:
+        """Escuta o canal até `stop()`; levanta exceção se a conexão falhar."""
+        dbapi_conn.autocommit = True
+        cursor = dbapi_conn.cursor()
+        try:
+            cursor.execute(f'LISTEN "{self.canal}"')
+        finally:
+            cursor.close()
+        while not self._parar.is_set():
+            if hasattr(dbapi_conn, "poll"):
+                # psycopg2
+                if select.select([dbapi_conn], [], [], 1.0) == ([], [], []):
+                    continue
+                dbapi_conn.poll()
+                notificacoes = []
+                while dbapi_conn.notifies:
+                    notificacoes.append(dbapi_conn.notifies.pop(0))
+            else:
+                # psycopg 3 (>= 3.2): o gerador encerra depois do timeout
+                notificacoes = dbapi_conn.notifies(timeout=1.0)
+            for notificacao in notificacoes:
+                self.broadcaster.dispatch(json.loads(notificacao.payload))
+
+
+broadcaster = Broadcaster()
+_backend: LocalBackend | PostgresNotifyBackend | None = None
+
+
+def get_backend() -> LocalBackend | PostgresNotifyBackend:
+    global _backend
+    if _backend is None:
+        settings = get_settings()
+        if settings.EVENTOS_BACKEND == "postgres":
+            _backend = PostgresNotifyBackend(broadcaster, settings.EVENTOS_CANAL)
+        else:
+            _backend = LocalBackend(broadcaster)
+    return _backend
+
+
+def stop_backend() -> None:
+    global _backend
+    if _backend is not None:
+        _backend.stop()
+        _backend = None
+
+
+def publicar(tipo: str, entidade_id: int, dados: dict[str, Any] | None = None) -> dict:
+    """
+    Publica um evento de alteração. Deve ser chamado após o commit.
+
+    Args:
+        tipo: Tipo do evento, ex.: 'manutencao.criada', 'manutencao.material_adicionado'
+        entidade_id: Id da entidade afetada
+        dados: Campos adicionais (serializáveis em JSON)
+
+    Returns:
+        O evento publicado, com o `id` atribuído pelo backend
+    """
+    evento = {
+        "id": None,
+        "tenant_id": get_tenant(),
+        "tipo": tipo,
+        "entidade_id": entidade_id,
+        "dados": dados or {},
+        "emitido_em": time.time(),
+    }
+    get_backend().publish(evento)
+    return evento
@@ -0,0 +1,116 @@
+import os
+import threading
+import time
+from collections import deque
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.database.core import get_replicas
+
+WORKER_STARTED_AT = time.time()
+
+
+class LatencyTracker:
+    """Janela deslizante com as latências das requisições mais recentes do worker"""
+
+    def __init__(self, maxlen: int | None = None):
+        self._maxlen = maxlen
+        self._samples: deque[float] | None = None
+        self._lock = threading.Lock()
+
+    def _window(self) -> deque[float]:
+        if self._samples is None:
+            self._samples = deque(maxlen=self._maxlen or get_settings().READINESS_LATENCY_WINDOW)
+        return self._samples
+
+    def record(self, duration_ms: float) -> None:
+        with self._lock:
+            self._window().append(duration_ms)
+
+    def percentile(self, p: float) -> float | None:
+        with self._lock:
+            samples = sorted(self._window())
+        if not samples:
+            return None
+        index = min(int(len(samples) * p / 100), len(samples) - 1)
+        return samples[index]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._window().clear()
+
+
+request_latency = LatencyTracker()
+
+
+def worker_status() -> dict:
+    return {
+        "status": "ok",
+        "pid": os.getpid(),
+        "uptime_segundos": round(time.time() - WORKER_STARTED_AT, 3),
+    }
+
+
+def pool_status(db: Session) -> dict:
+    """
+    Coleta a ocupação do pool de conexões do engine da sessão.
+
+    Pools sem limite (ex.: StaticPool/NullPool) retornam uso `None`.
+    """
+    pool = db.get_bind().engine.pool
+    status = {"tipo": type(pool).__name__, "checked_out": None, "overflow": None, "capacidade": None, "uso": None}
+    if hasattr(pool, "checkedout") and hasattr(pool, "size"):
+        checked_out = pool.checkedout()
+        capacidade = pool.size() + max(getattr(pool, "_max_overflow", 0), 0)
+        status.update(
+            checked_out=checked_out,
+            overflow=max(pool.overflow(), 0),
+            capacidade=capacidade,
+            uso=round(checked_out / capacidade, 3) if capacidade else None,
+        )
+    return status
+
+
+def readiness(db: Session) -> tuple[bool, dict]:
+    """
+    Avalia se o worker deve continuar recebendo tráfego.
+
+    Mede um round trip ao banco, a ocupação do pool e o p99 recente e compara
+    com os limites definidos em `Settings`.
+
+    Returns:
+        Tupla (pronto, detalhes)
+    """
+    settings = get_settings()
+    falhas = []
+
+    inicio = time.perf_counter()
+    try:
+        db.execute(text("SELECT 1"))
+        db_latency_ms = round((time.perf_counter() - inicio) * 1000, 3)
+    except Exception as e:
+        db_latency_ms = None
+        falhas.append(f"banco indisponível: {e.__class__.__name__}")
+
+    if db_latency_ms is not None and db_latency_ms > settings.READINESS_MAX_DB_LATENCY_MS:
+        falhas.append("latência do banco acima do limite")
+
+    pool = pool_status(db)
+    if pool["uso"] is not None and pool["uso"] >= settings.READINESS_MAX_POOL_USAGE:
+        falhas.append("pool de conexões saturado")
+
+    p99 = request_latency.percentile(99)
+    if p99 is not None and p99 > settings.READINESS_MAX_P99_MS:
+        falhas.append("p99 de latência acima do limite")
+
+    detalhes = {
+        "status": "ok" if not falhas else "indisponivel",
+        "db_latencia_ms": db_latency_ms,
+        "pool": pool,
+        "p99_ms": round(p99, 3) if p99 is not None else None,
+        "replicas": get_replicas().status() if get_replicas() else [],
+        "falhas": falhas,
+    }
+    return not falhas, detalhes
@@ -0,0 +1,149 @@
+"""
+Suporte ao header `Idempotency-Key` nos POSTs.
+
+A chave é reservada (com commit) antes de executar a operação; retentativas
+com a mesma chave recebem a resposta armazenada sem reexecutar o service.
+Uma retentativa enquanto a original ainda executa recebe 409, e reutilizar a
+chave com outro corpo ou rota recebe 422.
+
+A reserva vale por `IDEMPOTENCIA_RESERVA_SEGUNDOS`; só ao gravar a resposta
+a chave passa a valer por `IDEMPOTENCIA_TTL_HORAS`. Se o processo morrer
+entre a operação e a gravação da resposta, a reserva expira e uma
+retentativa assume a chave em vez de receber 409 até o fim do TTL.
+"""
+import hashlib
+from collections.abc import Callable
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+from sqlalchemy import delete, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.models.idempotencia import IdempotenciaChave
+
+
+def _fingerprint(escopo: str, corpo: str) -> str:
+    return hashlib.sha256(f"{escopo}\n{corpo}".encode()).hexdigest()
+
+
+def _agora() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _reservar(db: Session, chave: str, fingerprint: str) -> IdempotenciaChave | None:
+    """
+    Reserva a chave. Retorna o registro existente se ela já foi usada.
+
+    Raises:
+        HTTPException: 409 se a chave continua em disputa depois de uma nova tentativa
+    """
+    for _ in range(2):
+        db.execute(
+            delete(IdempotenciaChave)
+            .where(IdempotenciaChave.chave == chave, IdempotenciaChave.expira_em < _agora())
+            .execution_options(synchronize_session=False)
+        )
+        db.add(IdempotenciaChave(
+            chave=chave,
+            fingerprint=fingerprint,
+            expira_em=_agora() + timedelta(seconds=get_settings().IDEMPOTENCIA_RESERVA_SEGUNDOS),
+        ))
+        try:
+            db.commit()
+            return None
+        except IntegrityError:
+            db.rollback()
+        existente = db.scalar(select(IdempotenciaChave).where(IdempotenciaChave.chave == chave))
+        if existente is not None:
+            return existente
+        # a linha em conflito expirou ou foi removida entre o INSERT e o SELECT
+    raise HTTPException(status_code=409, detail="Requisição com esta Idempotency-Key ainda em processamento")
+
+
+def executar(
+    db: Session,
+    chave: str | None,
+    escopo: str,
+    corpo: str,
+    operacao: Callable[[], Any],
+    response_type: Any,
+    status_code: int = 200,
+):
+    """
+    Executa `operacao` no máximo uma vez por `Idempotency-Key`.
+
+    Args:
+        chave: Valor do header (sem chave, apenas executa a operação)
+        escopo: Identifica a rota, ex.: 'POST /manutencao/1/materiais'
+        corpo: Corpo da requisição serializado, para detectar reuso da chave
+        operacao: Chamada ao service; só respostas de sucesso são armazenadas
+        response_type: Tipo do `response_model` da rota, usado para serializar
+    """
+    if not chave:
+        return operacao()
+
+    fingerprint = _fingerprint(escopo, corpo)
+    existente = _reservar(db, chave, fingerprint)
+    if existente is not None:
+        if existente.fingerprint != fingerprint:
+            raise HTTPException(status_code=422, detail="Idempotency-Key já utilizada com outra requisição")
+        if existente.status_code is None:
+            raise HTTPException(status_code=409, detail="Requisição com esta Idempotency-Key ainda em processamento")
+        return JSONResponse(
+            status_code=existente.status_code,
+            content=existente.resposta,
+            headers={"Idempotent-Replayed": "true"},
+        )
+
+    try:
+        resultado = operacao()
+    except BaseException:
+        db.rollback()
+        db.execute(delete(IdempotenciaChave).where(IdempotenciaChave.chave == chave))
+        db.commit()
+        raise
+
+    adapter = TypeAdapter(response_type)
+    conteudo = adapter.dump_python(
+        adapter.validate_python(resultado, from_attributes=True), mode="json", by_alias=True
+    )
+    expira_em = _agora() + timedelta(hours=get_settings().IDEMPOTENCIA_TTL_HORAS)
+    registro = db.scalar(
+        select(IdempotenciaChave).where(IdempotenciaChave.chave == chave, IdempotenciaChave.fingerprint == fingerprint)
+    )
+    if registro is None:
+        # a reserva expirou durante a operação e foi removida pela limpeza
+        registro = IdempotenciaChave(chave=chave, fingerprint=fingerprint)
+        db.add(registro)
+    registro.status_code = status_code
+    registro.resposta = conteudo
+    registro.expira_em = expira_em
+    try:
+        db.commit()
+    except IntegrityError:
+        # outra requisição assumiu a chave expirada; a operação já foi aplicada
+        db.rollback()
+    return JSONResponse(status_code=status_code, content=conteudo)
+
+
+def limpar_expiradas(db: Session) -> int:
+    """
+    Remove chaves expiradas de todos os tenants (usa o índice em `expira_em`).
+
+    Chamada periodicamente pelo dispatcher do outbox (`IDEMPOTENCIA_LIMPEZA_INTERVALO`).
+
+    Returns:
+        Quantidade de chaves removidas
+    """
+    result = db.execute(
+        delete(IdempotenciaChave)
+        .where(IdempotenciaChave.expira_em < _agora())
+        .execution_options(todos_tenants=True, synchronize_session=False)
+    )
+    db.commit()
+    return result.rowcount
@@ -0,0 +1,422 @@
+"""
+Ingestão em lote de consumos de materiais enviados por dispensers automáticos.
+
+`Ingestao.aceitar` valida a regra de manutenção finalizada, grava o consumo
+no WAL do processo (JSON Lines com fsync) e o coloca no buffer em memória; o
+ack só é devolvido depois do fsync. Uma thread drena o buffer a cada
+`INGESTAO_INTERVALO_MS` ou quando há `INGESTAO_LOTE` itens e grava tudo em
+uma única transação, com INSERT multi-linha e um UPDATE de estoque por
+material.
+
+Antes de gravar, o WAL corrente é rotacionado para um segmento
+`lote-<id>.jsonl`. O lote é marcado em `idempotencia_chaves` na mesma
+transação dos inserts e o segmento é apagado após o commit. Na inicialização,
+segmentos e WALs de processos que morreram são reaplicados, pulando lotes já
+marcados, então um crash entre o commit e a remoção não duplica consumos.
+
+Um lote que falha por erro que não é de conexão (ex.: valor recusado pelo
+banco) é retentado até `INGESTAO_MAX_TENTATIVAS` vezes e depois movido para
+`morto-<id>.jsonl`, para não bloquear os lotes seguintes.
+
+O WAL usa `fcntl.flock`; em plataformas sem `fcntl` a aplicação importa
+normalmente, mas a ingestão não pode ser habilitada.
+"""
+import json
+import logging
+import os
+import threading
+import uuid
+from collections import defaultdict
+from collections.abc import Callable
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from pathlib import Path
+
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError, OperationalError
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.database.tenant import get_tenant, reset_tenant, set_tenant
+from app.models.enums import StatusManutencao
+from app.models.idempotencia import IdempotenciaChave
+from app.models.manutencao import Manutencao
+from app.models.manutencao_material import ManutencaoMaterial
+from app.schemas.material import MaterialConsumoCreate
+from app.services import eventos, outbox
+from app.services import material as material_service
+from app.services.manutencao import detalhe_cache
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+class BufferCheio(Exception):
+    """O buffer atingiu `INGESTAO_BUFFER_MAX` itens pendentes"""
+
+
+def _travar(arquivo) -> bool:
+    """Lock exclusivo e não bloqueante no arquivo; False se outro processo o detém."""
+    try:
+        fcntl.flock(arquivo, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        return False
+    return True
+
+
+def _ler_jsonl(caminho: Path) -> list[dict]:
+    itens = []
+    with caminho.open("rb") as arquivo:
+        for linha in arquivo:
+            try:
+                itens.append(json.loads(linha))
+            except ValueError:
+                # última linha truncada por um crash durante a escrita: nunca recebeu ack
+                break
+    return itens
+
+
+class Ingestao:
+    def __init__(self, diretorio: str, buffer_max: int, lote: int, intervalo_ms: int, max_tentativas: int = 5):
+        if fcntl is None:
+            raise RuntimeError("A ingestão em lote exige fcntl (Linux/macOS)")
+        self.max_tentativas = max_tentativas
+        self._tentativas: dict[str, int] = defaultdict(int)
+        self.diretorio = Path(diretorio)
+        self.buffer_max = buffer_max
+        self.lote = lote
+        self.intervalo = intervalo_ms / 1000
+        self.rejeitados = 0
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._cheio = threading.Event()
+        self._parar = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._buffer: list[dict] = []
+        self._pendentes: list[tuple[str, list[dict]]] = []
+        self._sequencia = 0
+        self.diretorio.mkdir(parents=True, exist_ok=True)
+        self._wal_caminho = self.diretorio / f"wal-{os.getpid()}.jsonl"
+        if self._wal_caminho.exists():
+            # pid reaproveitado de um processo que morreu: vira segmento para `recuperar`
+            os.replace(self._wal_caminho, self.diretorio / f"lote-{uuid.uuid4().hex}.jsonl")
+        self._wal = self._abrir_wal()
+
+    def _abrir_wal(self):
+        arquivo = self._wal_caminho.open("ab")
+        if not _travar(arquivo):
+            arquivo.close()
+            raise RuntimeError(f"WAL {self._wal_caminho} em uso por outro processo")
+        return arquivo
+
+    @property
+    def pendentes(self) -> int:
+        return len(self._buffer) + sum(len(itens) for _, itens in self._pendentes)
+
+    def aceitar(self, db: Session, manutencao_id: int, schema: MaterialConsumoCreate) -> int:
+        """
+        Registra um consumo de forma durável, sem gravá-lo no banco ainda.
+
+        Returns:
+            Número de sequência do consumo neste processo
+
+        Raises:
+            ValueError: Se a manutenção não existe ou está finalizada
+            BufferCheio: Se há `INGESTAO_BUFFER_MAX` consumos aguardando gravação
+        """
+        status = db.scalar(select(Manutencao.status).where(Manutencao.id == manutencao_id))
+        if status is None:
+            raise ValueError("Manutenção não encontrada")
+        if status == StatusManutencao.FINALIZADO:
+            raise ValueError("Não é possível adicionar materiais a uma manutenção finalizada.")
+
+        item = {
+            "tenant_id": get_tenant(),
+            "manutencao_id": manutencao_id,
+            "material_id": schema.material_id,
+            "quantidade": str(schema.quantidade),
+        }
+        with self._lock:
+            if self.pendentes >= self.buffer_max:
+                raise BufferCheio()
+            self._wal.write(json.dumps(item).encode() + b"\n")
+            self._wal.flush()
+            os.fsync(self._wal.fileno())
+            self._buffer.append(item)
+            self._sequencia += 1
+            if len(self._buffer) >= self.lote:
+                self._cheio.set()
+            return self._sequencia
+
+    def _rotacionar(self) -> None:
+        """Move o buffer para um segmento de lote e abre um WAL vazio."""
+        with self._lock:
+            if not self._buffer:
+                return
+            lote_id = uuid.uuid4().hex
+            self._wal.close()
+            os.replace(self._wal_caminho, self.diretorio / f"lote-{lote_id}.jsonl")
+            self._wal = self._abrir_wal()
+            self._pendentes.append((lote_id, self._buffer))
+            self._buffer = []
+            self._cheio.clear()
+
+    def flush(self, db: Session) -> int:
+        """
+        Grava no banco tudo que está no buffer.
+
+        Se a transação falhar o lote continua pendente e é retentado no
+        próximo flush; depois de `max_tentativas` falhas que não são de
+        conexão ele vai para o arquivo morto e os lotes seguintes prosseguem.
+
+        Returns:
+            Quantidade de consumos gravados
+        """
+        with self._flush_lock:
+            self._rotacionar()
+            gravados = 0
+            while self._pendentes:
+                lote_id, itens = self._pendentes[0]
+                try:
+                    gravados += self._aplicar_lote(db, lote_id, itens)
+                except Exception as e:
+                    if not self._registrar_falha(lote_id, e):
+                        raise
+                with self._lock:
+                    self._pendentes.pop(0)
+                self._tentativas.pop(lote_id, None)
+            return gravados
+
+    def _registrar_falha(self, lote_id: str, erro: Exception) -> bool:
+        """
+        Conta a falha do lote e o move para `morto-<id>.jsonl` ao atingir o limite.
+
+        Falhas de conexão não contam: o banco fora do ar não torna o lote inválido.
+
+        Returns:
+            True se o lote foi para o arquivo morto
+        """
+        if isinstance(erro, OperationalError):
+            return False
+        self._tentativas[lote_id] += 1
+        if self._tentativas[lote_id] < self.max_tentativas:
+            return False
+        segmento = self.diretorio / f"lote-{lote_id}.jsonl"
+        morto = self.diretorio / f"morto-{lote_id}.jsonl"
+        if segmento.exists():
+            os.replace(segmento, morto)
+        logger.error(
+            "ingestão: lote %s falhou %d vezes e foi movido para %s: %s",
+            lote_id, self._tentativas[lote_id], morto, erro,
+        )
+        self._tentativas.pop(lote_id, None)
+        return True
+
+    def recuperar(self, db: Session) -> int:
+        """
+        Reaplica segmentos e WALs órfãos deixados por processos encerrados.
+
+        Returns:
+            Quantidade de consumos gravados
+        """
+        gravados = 0
+        for wal in self.diretorio.glob("wal-*.jsonl"):
+            if wal == self._wal_caminho:
+                continue
+            with wal.open("ab") as arquivo:
+                if not _travar(arquivo):
+                    continue  # WAL de um processo vivo
+                os.replace(wal, self.diretorio / f"lote-{uuid.uuid4().hex}.jsonl")
+        for segmento in sorted(self.diretorio.glob("lote-*.jsonl")):
+            lote_id = segmento.stem.removeprefix("lote-")
+            if any(lote_id == pendente for pendente, _ in self._pendentes):
+                continue
+            itens = _ler_jsonl(segmento)
+            try:
+                gravados += self._aplicar_lote(db, lote_id, itens)
+            except Exception as e:
+                logger.exception("ingestão: falha ao reaplicar o lote %s", lote_id)
+                if not self._registrar_falha(lote_id, e):
+                    # segue pendente para as próximas tentativas do flush
+                    with self._lock:
+                        self._pendentes.append((lote_id, itens))
+        return gravados
+
+    def _aplicar_lote(self, db: Session, lote_id: str, itens: list[dict]) -> int:
+        chave = f"ingestao:{lote_id}"
+        segmento = self.diretorio / f"lote-{lote_id}.jsonl"
+        ja_aplicado = db.scalar(
+            select(IdempotenciaChave.id)
+            .where(IdempotenciaChave.chave == chave)
+            .execution_options(todos_tenants=True)
+        )
+        if ja_aplicado:
+            segmento.unlink(missing_ok=True)
+            return 0
+
+        por_tenant: dict[int, list[dict]] = defaultdict(list)
+        for item in itens:
+            por_tenant[item["tenant_id"]].append(item)
+
+        gravados: list[tuple[int, dict]] = []
+        try:
+            for tenant_id, itens_tenant in por_tenant.items():
+                token = set_tenant(tenant_id)
+                try:
+                    gravados += self._gravar_itens(db, itens_tenant)
+                    db.add(IdempotenciaChave(
+                        chave=chave,
+                        fingerprint=lote_id,
+                        expira_em=datetime.now(timezone.utc) + timedelta(hours=get_settings().IDEMPOTENCIA_TTL_HORAS),
+                    ))
+                    db.flush()
+                finally:
+                    reset_tenant(token)
+            db.commit()
+        except IntegrityError:
+            db.rollback()
+            # só é seguro descartar o segmento se outro processo de fato gravou o lote
+            if db.scalar(
+                select(IdempotenciaChave.id)
+                .where(IdempotenciaChave.chave == chave)
+                .execution_options(todos_tenants=True)
+            ):
+                segmento.unlink(missing_ok=True)
+                return 0
+            logger.error("ingestão: lote %s violou uma restrição e não foi gravado", lote_id)
+            raise
+        except Exception:
+            db.rollback()
+            raise
+
+        segmento.unlink(missing_ok=True)
+        for consumo_id, item in gravados:
+            token = set_tenant(item["tenant_id"])
+            try:
+                detalhe_cache.invalidate((item["tenant_id"], item["manutencao_id"]))
+                eventos.publicar(
+                    "manutencao.material_adicionado",
+                    item["manutencao_id"],
+                    {"consumo_id": consumo_id, "material_id": item["material_id"], "quantidade": float(item["quantidade"])},
+                )
+            finally:
+                reset_tenant(token)
+        return len(gravados)
+
+    def _gravar_itens(self, db: Session, itens: list[dict]) -> list[tuple[int, dict]]:
+        """Valida e insere os consumos de um tenant; não faz commit."""
+        abertas = set(db.scalars(
+            select(Manutencao.id)
+            .where(Manutencao.id.in_({item["manutencao_id"] for item in itens}))
+            .where(Manutencao.status != StatusManutencao.FINALIZADO)
+        ))
+        validos = [item for item in itens if item["manutencao_id"] in abertas]
+
+        totais: dict[int, Decimal] = defaultdict(Decimal)
+        for item in validos:
+            totais[item["material_id"]] += Decimal(item["quantidade"])
+        materiais = {}
+        aceitos = []
+        for material_id, total in totais.items():
+            material = material_service.baixar_estoque(db, material_id, total)
+            if material:
+                materiais[material_id] = material
+                aceitos += [item for item in validos if item["material_id"] == material_id]
+                continue
+            # o estoque não cobre o lote inteiro: baixa item a item, na ordem de chegada
+            for item in (item for item in validos if item["material_id"] == material_id):
+                material = material_service.baixar_estoque(db, material_id, Decimal(item["quantidade"]))
+                if material:
+                    materiais[material_id] = material
+                    aceitos.append(item)
+
+        rejeitados = len(itens) - len(aceitos)
+        if rejeitados:
+            self.rejeitados += rejeitados
+            logger.warning("ingestão: %d consumo(s) rejeitado(s) na gravação do lote", rejeitados)
+        if not aceitos:
+            return []
+
+        ids = db.scalars(
+            insert(ManutencaoMaterial).returning(ManutencaoMaterial.id, sort_by_parameter_order=True),
+            [
+                {
+                    "manutencao_id": item["manutencao_id"],
+                    "material_id": item["material_id"],
+                    "quantidade": Decimal(item["quantidade"]),
+                }
+                for item in aceitos
+            ],
+        ).all()
+        for consumo_id, item in zip(ids, aceitos):
+            material = materiais[item["material_id"]]
+            outbox.registrar(db, "manutencao.material_adicionado", {
+                "consumo_id": consumo_id,
+                "manutencao_id": item["manutencao_id"],
+                "material_id": item["material_id"],
+                "material_nome": material.nome,
+                "quantidade": item["quantidade"],
+                "preco_unitario": str(material.preco_unitario),
+            })
+        return list(zip(ids, aceitos))
+
+    def start(self, session_factory: Callable[[], Session]) -> None:
+        """Reaplica lotes órfãos e inicia a thread de gravação periódica."""
+        with session_factory() as db:
+            self.recuperar(db)
+
+        def loop():
+            while not self._parar.is_set():
+                self._cheio.wait(self.intervalo)
+                try:
+                    with session_factory() as db:
+                        self.flush(db)
+                except Exception:
+                    logger.exception("ingestão: falha ao gravar lote, nova tentativa no próximo ciclo")
+                    self._parar.wait(self.intervalo)
+
+        self._thread = threading.Thread(target=loop, name="ingestao-flush", daemon=True)
+        self._thread.start()
+
+    def stop(self, session_factory: Callable[[], Session] | None = None) -> None:
+        """Para a thread e, se possível, grava o que ainda está no buffer."""
+        self._parar.set()
+        self._cheio.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if session_factory is not None:
+            try:
+                with session_factory() as db:
+                    self.flush(db)
+            except Exception:
+                logger.exception("ingestão: falha no flush final; os consumos continuam no WAL")
+        self._wal.close()
+
+
+_ingestao: Ingestao | None = None
+
+
+def get_ingestao() -> Ingestao:
+    global _ingestao
+    if _ingestao is None:
+        settings = get_settings()
+        _ingestao = Ingestao(
+            settings.INGESTAO_DIRETORIO,
+            settings.INGESTAO_BUFFER_MAX,
+            settings.INGESTAO_LOTE,
+            settings.INGESTAO_INTERVALO_MS,
+            settings.INGESTAO_MAX_TENTATIVAS,
+        )
+    return _ingestao
+
+
+def stop_ingestao(session_factory: Callable[[], Session] | None = None) -> None:
+    global _ingestao
+    if _ingestao is not None:
+        _ingestao.stop(session_factory)
+        _ingestao = None
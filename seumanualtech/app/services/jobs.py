@@ -0,0 +1,227 @@
+"""
+Execução de operações pesadas em background.
+
+`enfileirar` grava o job e retorna imediatamente. Os workers
+(`app.jobs_worker`) reservam jobs pendentes com um UPDATE condicional e
+executam o handler do tipo em blocos de `JOBS_BLOCO` itens; cada bloco é
+gravado na mesma transação que atualiza `progresso`, então um job
+interrompido retoma do último bloco concluído. Jobs `executando` sem
+heartbeat há mais de `JOBS_HEARTBEAT_EXPIRA` segundos são devolvidos à fila;
+o worker original detecta a perda da reserva (`tentativas` mudou) e
+descarta o bloco em andamento.
+"""
+import logging
+import threading
+from collections.abc import Callable
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from sqlalchemy import or_, select, update
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.database.tenant import reset_tenant, set_tenant
+from app.models.enums import StatusJob
+from app.models.job import Job
+from app.schemas.manutencao import ManutencaoCreate
+from app.schemas.material import MaterialCreate
+from app.services import manutencao as manutencao_service
+from app.services import material as material_service
+
+logger = logging.getLogger(__name__)
+
+# o handler grava o bloco sem commit e devolve o resultado parcial e o que
+# fazer depois do commit (eventos, invalidação de cache)
+Handler = Callable[[Session, Job, list[Any]], tuple[dict[str, Any], Callable[[], None]]]
+_handlers: dict[str, Handler] = {}
+
+
+def handler(tipo: str):
+    def registrar(funcao: Handler) -> Handler:
+        _handlers[tipo] = funcao
+        return funcao
+    return registrar
+
+
+def _agora() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def enfileirar(db: Session, tipo: str, itens: list[Any]) -> Job:
+    if tipo not in _handlers:
+        raise ValueError(f"Tipo de job desconhecido: '{tipo}'")
+    job = Job(tipo=tipo, parametros=itens, total=len(itens), resultado={})
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+def get_by_id(db: Session, id: int) -> Job | None:
+    return db.scalar(select(Job).where(Job.id == id))
+
+
+class ReservaPerdida(Exception):
+    """O job foi reservado por outro worker (heartbeat expirado) durante a execução."""
+
+
+def _candidato(db: Session):
+    expirado = _agora() - timedelta(seconds=get_settings().JOBS_HEARTBEAT_EXPIRA)
+    return db.execute(
+        select(Job.id, Job.status, Job.tentativas)
+        .where(or_(
+            Job.status == StatusJob.PENDENTE,
+            (Job.status == StatusJob.EXECUTANDO) & (Job.heartbeat_em < expirado),
+        ))
+        .order_by(Job.id)
+        .limit(1)
+        .with_for_update(skip_locked=True)
+        .execution_options(todos_tenants=True)
+    ).first()
+
+
+def reservar(db: Session) -> Job | None:
+    """
+    Reserva o próximo job pendente (ou abandonado) de qualquer tenant.
+
+    A reserva é um UPDATE condicional ao status e às tentativas lidos, então
+    dois workers nunca ficam com o mesmo job, mesmo no SQLite, onde o
+    `FOR UPDATE SKIP LOCKED` não tem efeito.
+    """
+    while True:
+        candidato = _candidato(db)
+        if candidato is None:
+            db.rollback()
+            return None
+        result = db.execute(
+            update(Job)
+            .where(Job.id == candidato.id, Job.status == candidato.status, Job.tentativas == candidato.tentativas)
+            .values(status=StatusJob.EXECUTANDO, tentativas=Job.tentativas + 1, heartbeat_em=_agora())
+            .execution_options(todos_tenants=True, synchronize_session=False)
+        )
+        db.commit()
+        if result.rowcount == 1:
+            return db.scalar(select(Job).where(Job.id == candidato.id).execution_options(todos_tenants=True))
+        # outro worker reservou primeiro; tenta o próximo
+
+
+def _renovar(db: Session, job_id: int, reserva: int, **valores: Any) -> None:
+    """
+    Atualiza o job somente se a reserva ainda é deste worker.
+
+    Args:
+        reserva: Valor de `tentativas` no momento da reserva (token da reserva)
+
+    Raises:
+        ReservaPerdida: Se outro worker reservou o job
+    """
+    result = db.execute(
+        update(Job)
+        .where(Job.id == job_id, Job.tentativas == reserva, Job.status == StatusJob.EXECUTANDO)
+        .values(heartbeat_em=_agora(), **valores)
+        .execution_options(todos_tenants=True, synchronize_session=False)
+    )
+    if result.rowcount != 1:
+        raise ReservaPerdida(f"Job {job_id} foi reservado por outro worker")
+
+
+class _Heartbeat(threading.Thread):
+    """Renova o heartbeat em uma sessão própria enquanto um bloco longo executa."""
+
+    def __init__(self, sessoes: Callable[[], Session], job: Job):
+        super().__init__(name=f"job-{job.id}-heartbeat", daemon=True)
+        self._sessoes = sessoes
+        self._job_id = job.id
+        self._tentativas = job.tentativas
+        self._tenant_id = job.tenant_id
+        self._parar = threading.Event()
+
+    def run(self) -> None:
+        intervalo = get_settings().JOBS_HEARTBEAT_EXPIRA / 3
+        while not self._parar.wait(intervalo):
+            try:
+                with self._sessoes() as db:
+                    db.execute(
+                        update(Job)
+                        .where(Job.id == self._job_id, Job.tentativas == self._tentativas)
+                        .values(heartbeat_em=_agora())
+                        .execution_options(todos_tenants=True, synchronize_session=False)
+                    )
+                    db.commit()
+            except Exception:
+                logger.exception("Falha ao renovar heartbeat do job %s", self._job_id)
+
+    def parar(self) -> None:
+        self._parar.set()
+        self.join()
+
+
+def executar(db: Session, job: Job, sessoes: Callable[[], Session] | None = None) -> None:
+    """
+    Executa o job no tenant que o criou, bloco a bloco, a partir de `progresso`.
+
+    Args:
+        sessoes: Fábrica de sessões para o heartbeat em background; sem ela o
+            heartbeat só é renovado ao fim de cada bloco
+    """
+    # lidos antes do primeiro commit, que expira o objeto: reler `parametros`
+    # a cada bloco decodificaria o JSON inteiro de novo
+    job_id, reserva, tipo, total, parametros = job.id, job.tentativas, job.tipo, job.total, job.parametros
+    token = set_tenant(job.tenant_id)
+    heartbeat = _Heartbeat(sessoes, job) if sessoes is not None else None
+    if heartbeat is not None:
+        heartbeat.start()
+    try:
+        tamanho = get_settings().JOBS_BLOCO
+        progresso, resultado = job.progresso, dict(job.resultado or {})
+        while progresso < total:
+            bloco = parametros[progresso:progresso + tamanho]
+            parcial, apos_commit = _handlers[tipo](db, job, bloco)
+            for chave, valor in parcial.items():
+                resultado[chave] = resultado.get(chave, 0) + valor
+            progresso += len(bloco)
+            _renovar(db, job_id, reserva, progresso=progresso, resultado=resultado)
+            db.commit()
+            apos_commit()
+        _renovar(db, job_id, reserva, status=StatusJob.CONCLUIDO, concluido_em=_agora())
+        db.commit()
+    except ReservaPerdida:
+        db.rollback()
+        logger.warning("Job %s assumido por outro worker; bloco descartado", job_id)
+    except Exception as e:
+        db.rollback()
+        logger.exception("Job %s falhou", job_id)
+        try:
+            _renovar(
+                db, job_id, reserva, status=StatusJob.FALHOU, erro=f"{e.__class__.__name__}: {e}"[:1000], concluido_em=_agora()
+            )
+            db.commit()
+        except ReservaPerdida:
+            db.rollback()
+    finally:
+        if heartbeat is not None:
+            heartbeat.parar()
+        reset_tenant(token)
+        db.expire(job)
+
+
+def executar_proximo(db: Session, sessoes: Callable[[], Session] | None = None) -> Job | None:
+    job = reservar(db)
+    if job is not None:
+        executar(db, job, sessoes)
+    return job
+
+
+@handler("materiais.create_bulk")
+def _criar_materiais(db: Session, job: Job, bloco: list[Any]) -> tuple[dict[str, int], Callable[[], None]]:
+    criados = material_service.adicionar_bulk(db, [MaterialCreate.model_validate(item) for item in bloco])
+    return (
+        {"criados": len(criados), "ignorados": len(bloco) - len(criados)},
+        lambda: material_service.publicar_criados(criados),
+    )
+
+
+@handler("manutencoes.create_bulk")
+def _criar_manutencoes(db: Session, job: Job, bloco: list[Any]) -> tuple[dict[str, int], Callable[[], None]]:
+    criadas = manutencao_service.adicionar_bulk(db, [ManutencaoCreate.model_validate(item) for item in bloco])
+    return {"criados": len(criadas)}, lambda: manutencao_service.publicar_criadas(criadas)
@@ -1,9 +1,50 @@
-from sqlalchemy.orm import Session, selectinload
-from sqlalchemy import select
-from app.models.manutencao import Manutencao
+from datetime import datetime
+from decimal import Decimal
+from typing import NamedTuple
+
+from sqlalchemy.orm import Session, lazyload
+from sqlalchemy import func, select
+from app.config import get_settings
+from app.database.tenant import get_tenant
+from app.models.dinheiro import ZERO, custo_linha, decimal
+from app.models.manutencao import Manutencao, alterado_em
 from app.models.manutencao_material import ManutencaoMaterial
+from app.models.material import Material
 from app.schemas.manutencao import ManutencaoCreate, ManutencaoSchema
 from app.schemas.material import MaterialConsumoSchema
+from app.services import custos, eventos
+from app.services.cache import SingleFlightCache
+
+detalhe_cache = SingleFlightCache(ttl=lambda: get_settings().MANUTENCAO_CACHE_TTL)
+
+CAMPOS_MANUTENCAO = {field.alias or name: name for name, field in ManutencaoSchema.model_fields.items()}
+
+
+def resolver_campos(fields: str | None) -> set[str] | None:
+    """
+    Converte o parâmetro `fields` (ex.: 'id,resumo,custoTotalMateriais') nos
+    nomes de atributos do `ManutencaoSchema`.
+
+    Raises:
+        ValueError: Se algum campo não existe no schema
+    """
+    if not fields:
+        return None
+    campos = set()
+    for campo in (parte.strip() for parte in fields.split(",")):
+        if not campo:
+            continue
+        if campo in CAMPOS_MANUTENCAO:
+            campos.add(CAMPOS_MANUTENCAO[campo])
+        elif campo in ManutencaoSchema.model_fields:
+            campos.add(campo)
+        else:
+            raise ValueError(f"Campo inválido: '{campo}'")
+    return campos or None
+
+
+def _precisa_materiais(campos: set[str] | None) -> bool:
+    return campos is None or "materiais" in campos
 
 
 def get_by_id(db: Session, id: int) -> Manutencao | None:
@@ -12,14 +53,17 @@ def get_by_id(db: Session, id: int) -> Manutencao | None:
 
 def _manutencao_to_schema(manutencao: Manutencao) -> ManutencaoSchema:
     materiais_schema = []
+    total = ZERO
     
     for consumo in manutencao.materiais_consumidos:
+        custo = custo_linha(consumo.quantidade, consumo.material.preco_unitario)
+        total += custo
         material_consumo = MaterialConsumoSchema(
             id=consumo.material.id,
             nome=consumo.material.nome,
-            quantidade=float(consumo.quantidade),
-            preco_unitario=float(consumo.material.preco_unitario),
-            custo=consumo.custo_calculado
+            quantidade=decimal(consumo.quantidade),
+            preco_unitario=decimal(consumo.material.preco_unitario),
+            custo=custo
         )
         materiais_schema.append(material_consumo)
     
@@ -29,7 +73,7 @@ def _manutencao_to_schema(manutencao: Manutencao) -> ManutencaoSchema:
         status=manutencao.status,
         created_at=manutencao.criado_em,
         materiais=materiais_schema,
-        custo_total_materiais=manutencao.custo_total_materiais
+        custo_total_materiais=total
     )
 
 
@@ -41,29 +85,203 @@ def get_by_id_with_materials(db: Session, id: int) -> ManutencaoSchema | None:
     return _manutencao_to_schema(manutencao)
 
 
+def get_by_id_cached(db: Session, id: int) -> ManutencaoSchema | None:
+    """
+    Versão de `get_by_id_with_materials` para leituras concorrentes.
+
+    Leituras simultâneas do mesmo id compartilham uma única consulta e o
+    resultado fica em cache por `MANUTENCAO_CACHE_TTL` segundos.
+    """
+    return detalhe_cache.get_or_load((get_tenant(), id), lambda: get_by_id_with_materials(db, id))
+
+
+def custos_totais(db: Session, ids: list[int]) -> dict[int, Decimal]:
+    """
+    Custo total de uma página de manutenções em uma única consulta.
+
+    Busca apenas as colunas (manutencao_id, quantidade, preco_unitario), sem
+    objetos ORM, e soma em `Decimal` com o mesmo arredondamento por linha do
+    detalhe.
+    """
+    if not ids:
+        return {}
+    query = (
+        select(ManutencaoMaterial.manutencao_id, ManutencaoMaterial.quantidade, Material.preco_unitario)
+        .join(Material, Material.id == ManutencaoMaterial.material_id)
+        .where(ManutencaoMaterial.manutencao_id.in_(ids))
+    )
+    return custos.totais_por_manutencao(db.execute(query))
+
+
+def _resumos_sem_materiais(
+    db: Session, manutencoes: list[Manutencao], campos: set[str]
+) -> list[ManutencaoSchema]:
+    totais = {}
+    if "custo_total_materiais" in campos:
+        totais = custos_totais(db, [manutencao.id for manutencao in manutencoes])
+    return [
+        ManutencaoSchema(
+            id=manutencao.id,
+            resumo=manutencao.resumo,
+            status=manutencao.status,
+            created_at=manutencao.criado_em,
+            custo_total_materiais=totais.get(manutencao.id, ZERO),
+        )
+        for manutencao in manutencoes
+    ]
+
+
+def get_by_id_campos(db: Session, id: int, campos: set[str] | None) -> ManutencaoSchema | None:
+    """Detalhe com seleção de campos; sem 'materiais' os consumos não são carregados."""
+    if _precisa_materiais(campos):
+        return get_by_id_cached(db, id)
+    manutencao = db.scalar(
+        select(Manutencao).options(lazyload(Manutencao.materiais_consumidos)).where(Manutencao.id == id)
+    )
+    if not manutencao:
+        return None
+    return _resumos_sem_materiais(db, [manutencao], campos)[0]
+
+
+class _MaterialLinha(NamedTuple):
+    nome: str
+    preco_unitario: Decimal
+
+
+class _ConsumoLinha(NamedTuple):
+    manutencao_id: int
+    material_id: int
+    quantidade: Decimal
+
+
+def _materiais_da_pagina(db: Session, ids: list[int]) -> dict[int, list[MaterialConsumoSchema]]:
+    """
+    Consumos de uma página de manutenções lidos como tuplas, sem objetos ORM.
+
+    Cada material aparece uma única vez no dicionário compartilhado da página,
+    mesmo que seja consumido por várias manutenções.
+    """
+    if not ids:
+        return {}
+    consumos = [
+        _ConsumoLinha(*row)
+        for row in db.execute(
+            select(ManutencaoMaterial.manutencao_id, ManutencaoMaterial.material_id, ManutencaoMaterial.quantidade)
+            .where(ManutencaoMaterial.manutencao_id.in_(ids))
+            .order_by(ManutencaoMaterial.id)
+        )
+    ]
+    material_ids = {consumo.material_id for consumo in consumos}
+    materiais = {
+        material_id: _MaterialLinha(nome, decimal(preco))
+        for material_id, nome, preco in db.execute(
+            select(Material.id, Material.nome, Material.preco_unitario).where(Material.id.in_(material_ids))
+        )
+    } if material_ids else {}
+
+    por_manutencao: dict[int, list[MaterialConsumoSchema]] = {}
+    for consumo in consumos:
+        material = materiais[consumo.material_id]
+        por_manutencao.setdefault(consumo.manutencao_id, []).append(MaterialConsumoSchema(
+            id=consumo.material_id,
+            nome=material.nome,
+            quantidade=decimal(consumo.quantidade),
+            preco_unitario=material.preco_unitario,
+            custo=custo_linha(consumo.quantidade, material.preco_unitario),
+        ))
+    return por_manutencao
+
+
+def _custo_total_sql():
+    """Custo total da manutenção corrente como subconsulta correlacionada (linhas arredondadas a centavos)."""
+    return (
+        select(func.coalesce(func.sum(func.round(ManutencaoMaterial.quantidade * Material.preco_unitario, 2)), 0))
+        .join(Material, Material.id == ManutencaoMaterial.material_id)
+        .where(ManutencaoMaterial.manutencao_id == Manutencao.id)
+        .correlate(Manutencao)
+        .scalar_subquery()
+    )
+
+
 def list_all(
     db: Session, 
     skip: int = 0, 
     limit: int = 100,
-    status: str | None = None
+    status: str | None = None,
+    campos: set[str] | None = None,
+    criado_desde: datetime | None = None,
+    criado_ate: datetime | None = None,
+    atualizado_desde: datetime | None = None,
+    material_ids: list[int] | None = None,
+    custo_min: float | None = None,
+    custo_max: float | None = None,
 ) -> list[ManutencaoSchema]:
-    query = (
-        select(Manutencao)
-        .options(
-            selectinload(Manutencao.materiais_consumidos)
-            .selectinload(ManutencaoMaterial.material)
-        )
-    )
+    """
+    Lista manutenções pelo caminho somente leitura: as colunas são lidas como
+    tuplas e convertidas direto no schema, sem identity map nem objetos ORM.
+
+    Args:
+        criado_desde: Criadas a partir desta data (inclusive)
+        criado_ate: Criadas antes desta data (exclusive)
+        atualizado_desde: Criadas ou alteradas a partir desta data (inclusive)
+        material_ids: Apenas manutenções que consumiram algum destes materiais
+        custo_min: Custo total mínimo (inclusive)
+        custo_max: Custo total máximo (inclusive)
+    """
+    query = select(Manutencao.id, Manutencao.resumo, Manutencao.status, Manutencao.criado_em)
     
     if status:
         query = query.where(Manutencao.status == status)
+    if criado_desde:
+        query = query.where(Manutencao.criado_em >= criado_desde)
+    if criado_ate:
+        query = query.where(Manutencao.criado_em < criado_ate)
+    if atualizado_desde:
+        query = query.where(alterado_em >= atualizado_desde)
+    if material_ids:
+        query = query.where(
+            select(ManutencaoMaterial.id)
+            .where(ManutencaoMaterial.manutencao_id == Manutencao.id)
+            .where(ManutencaoMaterial.material_id.in_(material_ids))
+            .exists()
+        )
+    if custo_min is not None or custo_max is not None:
+        custo_total = _custo_total_sql()
+        if custo_min is not None:
+            query = query.where(custo_total >= custo_min)
+        if custo_max is not None:
+            query = query.where(custo_total <= custo_max)
     
-    query = query.order_by(Manutencao.criado_em.desc())
+    query = query.order_by(Manutencao.criado_em.desc(), Manutencao.id.desc())
     query = query.offset(skip).limit(limit)
     
-    manutencoes = list(db.scalars(query).all())
+    linhas = db.execute(query).all()
+    ids = [linha.id for linha in linhas]
     
-    return [_manutencao_to_schema(manutencao) for manutencao in manutencoes]
+    # os totais saem da mesma consulta em lote dos consumos da página; sem
+    # 'materiais', só as colunas do custo são lidas (custos_totais)
+    materiais = _materiais_da_pagina(db, ids) if _precisa_materiais(campos) else {}
+    if _precisa_materiais(campos):
+        totais = {
+            manutencao_id: sum((consumo.custo for consumo in consumos), ZERO)
+            for manutencao_id, consumos in materiais.items()
+        }
+    elif "custo_total_materiais" in campos:
+        totais = custos_totais(db, ids)
+    else:
+        totais = {}
+    
+    return [
+        ManutencaoSchema(
+            id=linha.id,
+            resumo=linha.resumo,
+            status=linha.status,
+            created_at=linha.criado_em,
+            materiais=materiais.get(linha.id, []),
+            custo_total_materiais=totais.get(linha.id, ZERO),
+        )
+        for linha in linhas
+    ]
 
 
 def create(db: Session, schema: ManutencaoCreate) -> Manutencao:
@@ -71,22 +289,30 @@ def create(db: Session, schema: ManutencaoCreate) -> Manutencao:
     db.add(db_obj)
     db.commit()
     db.refresh(db_obj)
+    eventos.publicar("manutencao.criada", db_obj.id, {"status": db_obj.status.value})
     return db_obj
 
 
+def adicionar_bulk(db: Session, schemas: list[ManutencaoCreate]) -> list[Manutencao]:
+    """Adiciona as manutenções à sessão, sem commit."""
+    created_manutencoes = [Manutencao(**schema.model_dump()) for schema in schemas]
+    db.add_all(created_manutencoes)
+    db.flush()
+    return created_manutencoes
+
+
+def publicar_criadas(manutencoes: list[Manutencao]) -> None:
+    for manutencao in manutencoes:
+        eventos.publicar("manutencao.criada", manutencao.id, {"status": manutencao.status.value})
+
+
 def create_bulk(db: Session, schemas: list[ManutencaoCreate]) -> list[ManutencaoSchema]:
-    created_manutencoes = []
-    
-    for schema in schemas:
-        db_obj = Manutencao(**schema.model_dump())
-        db.add(db_obj)
-        created_manutencoes.append(db_obj)
-    
+    created_manutencoes = adicionar_bulk(db, schemas)
     db.commit()
     
     for manutencao in created_manutencoes:
         db.refresh(manutencao)
-    
+    publicar_criadas(created_manutencoes)
     return [_manutencao_to_schema(manutencao) for manutencao in created_manutencoes]
 
 
@@ -99,7 +325,9 @@ def update(db: Session, id: int, schema: ManutencaoCreate) -> Manutencao | None:
         setattr(manutencao, key, value)
     
     db.commit()
+    detalhe_cache.invalidate((get_tenant(), id))
     db.refresh(manutencao)
+    eventos.publicar("manutencao.atualizada", id, {"status": manutencao.status.value})
     return manutencao
 
 
@@ -110,4 +338,6 @@ def delete(db: Session, id: int) -> bool:
     
     db.delete(manutencao)
     db.commit()
+    detalhe_cache.invalidate((get_tenant(), id))
+    eventos.publicar("manutencao.removida", id)
     return True
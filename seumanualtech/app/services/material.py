@@ -1,18 +1,60 @@
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from sqlalchemy import select
-from app.models.material import Material
+from sqlalchemy import select, update as sql_update, insert, or_, text, column, literal, func, cast, Integer, String, Numeric
+from app.models.material import Material, normalizar_nome
 from app.models.manutencao_material import ManutencaoMaterial
 from app.models.manutencao import Manutencao
+from app.models.material_preco_historico import MaterialPrecoHistorico
 from app.models.enums import StatusManutencao
-from app.schemas.material import MaterialCreate, MaterialConsumoCreate
+from app.database.tenant import get_tenant
+from app.schemas.material import MaterialCreate, MaterialConsumoCreate, PrecoItem
+from app.services import eventos, outbox
+from app.services.manutencao import detalhe_cache
+
+
+INDICE_NOME_UNICO = "ux_materiais_tenant_nome_normalizado"
+
+
+def nome_duplicado(erro: IntegrityError) -> bool:
+    """Se a violação é do índice único de nome (e não de outra restrição)."""
+    restricao = getattr(getattr(erro.orig, "diag", None), "constraint_name", None)
+    if restricao:
+        return restricao == INDICE_NOME_UNICO
+    # o SQLite não informa o nome do índice, só as colunas
+    return "UNIQUE constraint failed: materiais.tenant_id, materiais.nome_normalizado" in str(erro.orig)
 
 
 def get_by_id(db: Session, id: int) -> Material | None:
     return db.scalar(select(Material).where(Material.id == id))
 
 
+def get_by_ids(db: Session, ids: list[int], chunk_size: int = 500) -> tuple[list[Material], list[int]]:
+    """
+    Busca vários materiais por id com consultas `IN` (em blocos de `chunk_size`).
+
+    Returns:
+        Tupla (materiais na ordem dos ids informados, ids não encontrados)
+    """
+    ids = list(dict.fromkeys(ids))
+    encontrados: dict[int, Material] = {}
+    for inicio in range(0, len(ids), chunk_size):
+        bloco = ids[inicio:inicio + chunk_size]
+        for material in db.scalars(select(Material).where(Material.id.in_(bloco))):
+            encontrados[material.id] = material
+    materiais = [encontrados[id] for id in ids if id in encontrados]
+    faltantes = [id for id in ids if id not in encontrados]
+    return materiais, faltantes
+
+
 def get_by_nome(db: Session, nome: str) -> Material | None:
-    return db.scalar(select(Material).where(Material.nome == nome))
+    """Busca pelo nome normalizado (ignora acentos, maiúsculas e espaços extras)."""
+    return db.scalar(select(Material).where(Material.nome_normalizado == normalizar_nome(nome)))
+
+
+def nomes_existentes(db: Session, nomes: list[str]) -> set[str]:
+    """Nomes normalizados, dentre `nomes`, que já existem no catálogo (uma consulta)."""
+    normalizados = {normalizar_nome(nome) for nome in nomes}
+    return set(db.scalars(select(Material.nome_normalizado).where(Material.nome_normalizado.in_(normalizados))))
 
 
 def list_all(
@@ -43,29 +85,76 @@ def list_all(
     return list(db.scalars(query).all())
 
 
+def list_estoque_baixo(db: Session, limite: float, skip: int = 0, limit: int = 100) -> list[Material]:
+    """Materiais com estoque controlado e menor ou igual a `limite` (usa o índice de estoque)."""
+    query = (
+        select(Material)
+        .where(Material.estoque.is_not(None), Material.estoque <= limite)
+        .order_by(Material.estoque.asc(), Material.id.asc())
+        .offset(skip)
+        .limit(limit)
+    )
+    return list(db.scalars(query).all())
+
+
+def baixar_estoque(db: Session, material_id: int, quantidade: float):
+    """
+    Decrementa o estoque com um único UPDATE condicional, sem ler antes.
+
+    Materiais com estoque vazio (não controlado) não são limitados. Não faz
+    commit: deve rodar na mesma transação do consumo.
+
+    Returns:
+        Linha (nome, preco_unitario) do material, ou None se não existe ou
+        não há estoque suficiente
+    """
+    return db.execute(
+        sql_update(Material)
+        .where(Material.id == material_id)
+        .where(or_(Material.estoque.is_(None), Material.estoque >= quantidade))
+        .values(estoque=Material.estoque - quantidade)
+        .returning(Material.nome, Material.preco_unitario)
+        .execution_options(synchronize_session=False)
+    ).first()
+
+
 def create(db: Session, schema: MaterialCreate) -> Material:
     db_obj = Material(**schema.model_dump())
     db.add(db_obj)
     db.commit()
     db.refresh(db_obj)
+    eventos.publicar("material.criado", db_obj.id, {"nome": db_obj.nome})
     return db_obj
 
 
-def create_bulk(db: Session, schemas: list[MaterialCreate]) -> list[Material]:
+def adicionar_bulk(db: Session, schemas: list[MaterialCreate]) -> list[Material]:
+    """Adiciona à sessão (sem commit) os materiais cujo nome ainda não existe."""
     created_materials = []
+    existentes = nomes_existentes(db, [schema.nome for schema in schemas])
     
     for schema in schemas:
-        existing = get_by_nome(db, schema.nome)
-        if not existing:
+        normalizado = normalizar_nome(schema.nome)
+        if normalizado not in existentes:
             db_obj = Material(**schema.model_dump())
             db.add(db_obj)
             created_materials.append(db_obj)
-    
+            existentes.add(normalizado)
+    db.flush()
+    return created_materials
+
+
+def publicar_criados(materiais: list[Material]) -> None:
+    for material in materiais:
+        eventos.publicar("material.criado", material.id, {"nome": material.nome})
+
+
+def create_bulk(db: Session, schemas: list[MaterialCreate]) -> list[Material]:
+    created_materials = adicionar_bulk(db, schemas)
     db.commit()
     
     for material in created_materials:
         db.refresh(material)
-    
+    publicar_criados(created_materials)
     return created_materials
 
 
@@ -74,14 +163,164 @@ def update(db: Session, id: int, schema: MaterialCreate) -> Material | None:
     if not material:
         return None
     
-    for key, value in schema.model_dump().items():
+    preco_anterior = material.preco_unitario
+    # campos omitidos (ex.: `estoque`) mantêm o valor atual; o estoque só é
+    # sobrescrito quando enviado explicitamente
+    for key, value in schema.model_dump(exclude_unset=True).items():
         setattr(material, key, value)
     
+    if float(preco_anterior) != float(material.preco_unitario):
+        db.add(MaterialPrecoHistorico(
+            material_id=material.id,
+            preco_anterior=preco_anterior,
+            preco_novo=material.preco_unitario,
+            origem="manual",
+        ))
     db.commit()
+    detalhe_cache.clear()
     db.refresh(material)
+    eventos.publicar("material.atualizado", id, {"nome": material.nome})
     return material
 
 
+def _tabela_precos(linhas: list[tuple], tipo_chave):
+    """
+    Monta `(VALUES ...)` com colunas (chave, preco) para usar em UPDATE ... FROM.
+
+    Usa as colunas implícitas column1/column2, aceitas por SQLite e Postgres.
+    """
+    params = {}
+    tuplas = []
+    for i, (chave, preco) in enumerate(linhas):
+        params[f"k{i}"] = chave
+        params[f"p{i}"] = preco
+        tuplas.append(f"(CAST(:k{i} AS {tipo_chave}), CAST(:p{i} AS NUMERIC(10, 2)))")
+    tipo = Integer() if tipo_chave == "INTEGER" else String()
+    valores = (
+        text("VALUES " + ", ".join(tuplas))
+        .bindparams(**params)
+        .columns(column("column1", tipo), column("column2", Numeric(10, 2)))
+        .subquery("v")
+    )
+    return select(valores.c.column1.label("chave"), valores.c.column2.label("preco")).subquery("novos")
+
+
+def _publicar_precos(alterados: list) -> None:
+    """Um evento por material com preço alterado (linhas id, preco_unitario)."""
+    for material_id, preco in alterados:
+        eventos.publicar("material.preco_atualizado", material_id, {"preco_unitario": str(preco)})
+
+
+def _aplicar_tabela(db: Session, linhas: list[tuple], coluna_chave, tipo_chave: str) -> list:
+    novos = _tabela_precos(linhas, tipo_chave)
+    alterados = Material.preco_unitario != novos.c.preco
+    tenant_id = get_tenant()
+    db.execute(
+        insert(MaterialPrecoHistorico).from_select(
+            ["tenant_id", "material_id", "preco_anterior", "preco_novo", "origem"],
+            select(literal(tenant_id), Material.id, Material.preco_unitario, novos.c.preco, literal("tabela"))
+            .join(novos, coluna_chave == novos.c.chave)
+            .where(alterados, Material.tenant_id == tenant_id),
+        )
+    )
+    return db.execute(
+        sql_update(Material)
+        .where(coluna_chave == novos.c.chave)
+        .where(alterados)
+        .values(preco_unitario=novos.c.preco)
+        .returning(Material.id, Material.preco_unitario)
+        .execution_options(synchronize_session=False)
+    ).all()
+
+
+def atualizar_precos(db: Session, itens: list[PrecoItem], chunk_size: int = 5000) -> tuple[int, list[int | str]]:
+    """
+    Aplica uma tabela de preços com um UPDATE ... FROM (VALUES ...) por bloco,
+    registrando o histórico com INSERT ... SELECT, sem carregar objetos ORM.
+
+    Nomes são comparados pelo nome normalizado, como na unicidade do
+    catálogo ('cimento  cp-ii' encontra 'Cimento CP-II').
+
+    Returns:
+        Tupla (materiais com preço alterado, chaves não encontradas)
+    """
+    por_id = {item.id: item.preco_unitario for item in itens if item.id is not None}
+    por_nome = {normalizar_nome(item.nome): item.preco_unitario for item in itens if item.nome is not None}
+    nome_informado = {normalizar_nome(item.nome): item.nome for item in itens if item.nome is not None}
+
+    existentes_id: set[int] = set()
+    existentes_nome: set[str] = set()
+    ids, nomes = list(por_id), list(por_nome)
+    for inicio in range(0, max(len(ids), len(nomes)), chunk_size):
+        if ids[inicio:inicio + chunk_size]:
+            existentes_id.update(db.scalars(select(Material.id).where(Material.id.in_(ids[inicio:inicio + chunk_size]))))
+        if nomes[inicio:inicio + chunk_size]:
+            existentes_nome.update(db.scalars(
+                select(Material.nome_normalizado).where(Material.nome_normalizado.in_(nomes[inicio:inicio + chunk_size]))
+            ))
+
+    alterados = []
+    for linhas, coluna, tipo in (
+        ([(id, preco) for id, preco in por_id.items() if id in existentes_id], Material.id, "INTEGER"),
+        (
+            [(nome, preco) for nome, preco in por_nome.items() if nome in existentes_nome],
+            Material.nome_normalizado, "VARCHAR(200)",
+        ),
+    ):
+        for inicio in range(0, len(linhas), chunk_size):
+            alterados += _aplicar_tabela(db, linhas[inicio:inicio + chunk_size], coluna, tipo)
+    db.commit()
+
+    nao_encontrados = [id for id in por_id if id not in existentes_id]
+    nao_encontrados += [nome_informado[nome] for nome in por_nome if nome not in existentes_nome]
+    if alterados:
+        detalhe_cache.clear()
+        _publicar_precos(alterados)
+    return len(alterados), nao_encontrados
+
+
+def reajustar_precos(db: Session, percentual: float, nome: str | None = None) -> int:
+    """
+    Reajusta em `percentual`% o preço dos materiais (opcionalmente filtrados
+    por nome) com um único UPDATE, arredondando para 2 casas.
+
+    Returns:
+        Quantidade de materiais com preço alterado
+
+    Raises:
+        ValueError: Se o reajuste deixaria algum preço zerado ou negativo
+    """
+    novo_preco = func.round(Material.preco_unitario * cast(1 + percentual / 100, Numeric(12, 6)), 2)
+    tenant_id = get_tenant()
+    filtros = [Material.tenant_id == tenant_id, Material.preco_unitario != novo_preco]
+    if nome:
+        filtros.append(Material.nome.ilike(f"%{nome}%"))
+
+    zerados = db.scalar(select(func.count()).select_from(Material).where(*filtros, novo_preco <= 0))
+    if zerados:
+        raise ValueError(f"O reajuste deixaria {zerados} material(is) com preço zero ou negativo")
+
+    db.execute(
+        insert(MaterialPrecoHistorico).from_select(
+            ["tenant_id", "material_id", "preco_anterior", "preco_novo", "origem"],
+            select(literal(tenant_id), Material.id, Material.preco_unitario, novo_preco, literal("percentual"))
+            .where(*filtros),
+        )
+    )
+    alterados = db.execute(
+        sql_update(Material)
+        .where(*filtros)
+        .values(preco_unitario=novo_preco)
+        .returning(Material.id, Material.preco_unitario)
+        .execution_options(synchronize_session=False)
+    ).all()
+    db.commit()
+    if alterados:
+        detalhe_cache.clear()
+        _publicar_precos(alterados)
+    return len(alterados)
+
+
 def delete(db: Session, id: int) -> bool:
     material = get_by_id(db, id)
     if not material:
@@ -89,6 +328,8 @@ def delete(db: Session, id: int) -> bool:
     
     db.delete(material)
     db.commit()
+    detalhe_cache.clear()
+    eventos.publicar("material.removido", id)
     return True
 
 
@@ -104,9 +345,12 @@ def adicionar_material_manutencao(
     if manutencao.status == StatusManutencao.FINALIZADO:
         raise ValueError("Não é possível adicionar materiais a uma manutenção finalizada.")
     
-    material = db.scalar(select(Material).where(Material.id == schema.material_id))
+    material = baixar_estoque(db, schema.material_id, schema.quantidade)
     if not material:
-        raise ValueError("Material não encontrado")
+        db.rollback()
+        if not get_by_id(db, schema.material_id):
+            raise ValueError("Material não encontrado")
+        raise ValueError("Estoque insuficiente para o material informado")
     
     db_obj = ManutencaoMaterial(
         manutencao_id=manutencao_id,
@@ -114,6 +358,21 @@ def adicionar_material_manutencao(
         quantidade=schema.quantidade
     )
     db.add(db_obj)
+    db.flush()
+    outbox.registrar(db, "manutencao.material_adicionado", {
+        "consumo_id": db_obj.id,
+        "manutencao_id": manutencao_id,
+        "material_id": schema.material_id,
+        "material_nome": material.nome,
+        "quantidade": str(db_obj.quantidade),
+        "preco_unitario": str(material.preco_unitario),
+    })
     db.commit()
+    detalhe_cache.invalidate((get_tenant(), manutencao_id))
     db.refresh(db_obj)
+    eventos.publicar(
+        "manutencao.material_adicionado",
+        manutencao_id,
+        {"consumo_id": db_obj.id, "material_id": db_obj.material_id, "quantidade": float(db_obj.quantidade)},
+    )
     return db_obj
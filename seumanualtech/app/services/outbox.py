@@ -0,0 +1,164 @@
+"""
+Outbox transacional para integração com sistemas externos (ex.: ERP).
+
+`registrar` adiciona o evento à sessão sem fazer commit, então ele é gravado
+na mesma transação da alteração de negócio. O dispatcher (`app.outbox_worker`)
+lê os pendentes em lotes e entrega ao sink configurado, com retentativas e
+backoff exponencial; nenhuma I/O externa acontece no caminho da requisição.
+
+Um evento que já falhou é reenviado sozinho, então um evento rejeitado pelo
+sink não atrasa os demais; depois de `OUTBOX_MAX_TENTATIVAS` ele é descartado
+(`descartado_em`) e fica no banco para análise.
+"""
+import json
+import logging
+import math
+import urllib.request
+from datetime import datetime, timedelta, timezone
+from itertools import takewhile
+from pathlib import Path
+from typing import Any, Protocol
+
+from sqlalchemy import or_, select
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.models.outbox import OutboxEvento
+
+logger = logging.getLogger(__name__)
+
+
+class Sink(Protocol):
+    def send(self, eventos: list[dict]) -> None:
+        """Entrega um lote; deve levantar exceção se o lote não foi aceito."""
+
+
+class FileSink:
+    """Acrescenta os eventos em um arquivo JSON Lines"""
+
+    def __init__(self, caminho: str):
+        self.caminho = Path(caminho)
+
+    def send(self, eventos: list[dict]) -> None:
+        with self.caminho.open("a", encoding="utf-8") as arquivo:
+            for evento in eventos:
+                arquivo.write(json.dumps(evento, ensure_ascii=False) + "\n")
+
+
+class HttpSink:
+    """Envia o lote como um array JSON em um único POST"""
+
+    def __init__(self, url: str, timeout: float):
+        self.url = url
+        self.timeout = timeout
+
+    def send(self, eventos: list[dict]) -> None:
+        request = urllib.request.Request(
+            self.url,
+            data=json.dumps(eventos).encode(),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            if response.status >= 300:
+                raise RuntimeError(f"HTTP {response.status}")
+
+
+class MemorySink:
+    """Fila em memória, usada em testes e como stand-in local"""
+
+    def __init__(self):
+        self.entregues: list[dict] = []
+
+    def send(self, eventos: list[dict]) -> None:
+        self.entregues.extend(eventos)
+
+
+def get_sink() -> Sink:
+    settings = get_settings()
+    if settings.OUTBOX_SINK == "http":
+        return HttpSink(settings.OUTBOX_HTTP_URL, settings.OUTBOX_HTTP_TIMEOUT)
+    if settings.OUTBOX_SINK == "memory":
+        return MemorySink()
+    return FileSink(settings.OUTBOX_ARQUIVO)
+
+
+def registrar(db: Session, tipo: str, payload: dict[str, Any]) -> OutboxEvento:
+    """Adiciona um evento à transação corrente (o commit fica a cargo do chamador)."""
+    evento = OutboxEvento(tipo=tipo, payload=payload)
+    db.add(evento)
+    return evento
+
+
+def _backoff(tentativas: int) -> timedelta:
+    settings = get_settings()
+    base, maximo = settings.OUTBOX_BACKOFF_BASE, settings.OUTBOX_BACKOFF_MAX
+    # compara pelos logaritmos: base ** tentativas estoura o float com muitas tentativas
+    if base > 1 and tentativas * math.log(base) >= math.log(maximo):
+        return timedelta(seconds=maximo)
+    return timedelta(seconds=min(base ** tentativas, maximo))
+
+
+def dispatch_lote(db: Session, sink: Sink, tamanho: int | None = None) -> int:
+    """
+    Entrega um lote de eventos pendentes.
+
+    Em Postgres as linhas são travadas com `SKIP LOCKED`, permitindo vários
+    dispatchers em paralelo. O lote reúne eventos que ainda não falharam; se o
+    sink falhar, eles são reagendados e, na próxima tentativa, vão um a um. Um
+    evento que falha sozinho `OUTBOX_MAX_TENTATIVAS` vezes é descartado.
+
+    Returns:
+        Quantidade de eventos entregues
+    """
+    agora = datetime.now(timezone.utc)
+    query = (
+        select(OutboxEvento)
+        .where(OutboxEvento.entregue_em.is_(None), OutboxEvento.descartado_em.is_(None))
+        .where(or_(OutboxEvento.proxima_tentativa_em.is_(None), OutboxEvento.proxima_tentativa_em <= agora))
+        .order_by(OutboxEvento.id)
+        .limit(tamanho or get_settings().OUTBOX_LOTE)
+        .with_for_update(skip_locked=True)
+        .execution_options(todos_tenants=True)
+    )
+    pendentes = list(db.scalars(query).all())
+    if not pendentes:
+        db.rollback()
+        return 0
+    if pendentes[0].tentativas:
+        pendentes = pendentes[:1]
+    else:
+        pendentes = list(takewhile(lambda evento: not evento.tentativas, pendentes))
+
+    lote = [
+        {
+            "id": evento.id,
+            "tenant_id": evento.tenant_id,
+            "tipo": evento.tipo,
+            "payload": evento.payload,
+            "criado_em": evento.criado_em.isoformat(),
+        }
+        for evento in pendentes
+    ]
+    try:
+        sink.send(lote)
+    except Exception as e:
+        max_tentativas = get_settings().OUTBOX_MAX_TENTATIVAS
+        for evento in pendentes:
+            evento.tentativas += 1
+            evento.proxima_tentativa_em = agora + _backoff(evento.tentativas)
+            evento.ultimo_erro = f"{e.__class__.__name__}: {e}"[:1000]
+            if len(pendentes) == 1 and evento.tentativas >= max_tentativas:
+                evento.descartado_em = agora
+                logger.error(
+                    "Outbox: evento %s (%s) descartado após %s tentativas: %s",
+                    evento.id, evento.tipo, evento.tentativas, evento.ultimo_erro,
+                )
+        db.commit()
+        return 0
+
+    for evento in pendentes:
+        evento.entregue_em = agora
+        evento.ultimo_erro = None
+    db.commit()
+    return len(pendentes)
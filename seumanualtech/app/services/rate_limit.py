@@ -0,0 +1,192 @@
+"""
+Controle de admissão: token bucket e limite de requisições simultâneas por
+cliente e rota.
+
+O cliente é identificado pela API key (não pelo tenant) quando ela é válida e, caso
+contrário, pelo IP: headers não autenticados não viram chave do limitador,
+senão um valor novo a cada requisição escaparia do limite. Os limites padrão e as sobrescritas por rota
+(`"METODO /caminho"`, com ids numéricos como `{id}`) vêm de `Settings`. O backend `memory` vale por worker;
+o `redis` compartilha os contadores entre workers e instâncias.
+"""
+import hashlib
+import math
+import re
+import threading
+import time
+from collections import OrderedDict
+
+from app.config import get_settings
+
+
+class Limite:
+    __slots__ = ("taxa", "rajada", "concorrencia")
+
+    def __init__(self, taxa: float, rajada: float, concorrencia: int):
+        self.taxa = taxa
+        self.rajada = rajada
+        self.concorrencia = concorrencia
+
+
+def limite_da_rota(rota: str) -> Limite:
+    settings = get_settings()
+    override = settings.RATE_LIMIT_ROTAS.get(rota, {})
+    return Limite(
+        taxa=override.get("taxa", settings.RATE_LIMIT_TAXA),
+        rajada=override.get("rajada", settings.RATE_LIMIT_RAJADA),
+        concorrencia=int(override.get("concorrencia", settings.RATE_LIMIT_CONCORRENCIA)),
+    )
+
+
+class MemoryBackend:
+    def __init__(self, max_chaves: int = 10_000):
+        self._lock = threading.Lock()
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+        self._em_andamento: dict[str, int] = {}
+        self._max_chaves = max_chaves
+
+    def consumir(self, chave: str, limite: Limite) -> float:
+        """
+        Retira um token do bucket.
+
+        Returns:
+            0 se a requisição foi admitida, senão os segundos até haver token
+        """
+        agora = time.monotonic()
+        with self._lock:
+            tokens, ultimo = self._buckets.pop(chave, (limite.rajada, agora))
+            tokens = min(limite.rajada, tokens + (agora - ultimo) * limite.taxa)
+            espera = 0.0
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                espera = (1 - tokens) / limite.taxa if limite.taxa > 0 else math.inf
+            self._buckets[chave] = (tokens, agora)
+            while len(self._buckets) > self._max_chaves:
+                self._buckets.popitem(last=False)
+            return espera
+
+    def entrar(self, chave: str, limite: Limite) -> bool:
+        with self._lock:
+            atual = self._em_andamento.get(chave, 0)
+            if atual >= limite.concorrencia:
+                return False
+            self._em_andamento[chave] = atual + 1
+            return True
+
+    def sair(self, chave: str) -> None:
+        with self._lock:
+            atual = self._em_andamento.get(chave, 0) - 1
+            if atual > 0:
+                self._em_andamento[chave] = atual
+            else:
+                self._em_andamento.pop(chave, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._buckets.clear()
+            self._em_andamento.clear()
+
+
+_TOKEN_BUCKET_LUA = """
+local taxa = tonumber(ARGV[1])
+local rajada = tonumber(ARGV[2])
+local agora = tonumber(ARGV[3])
+local estado = redis.call('HMGET', KEYS[1], 'tokens', 'ultimo')
+local tokens = tonumber(estado[1]) or rajada
+local ultimo = tonumber(estado[2]) or agora
+tokens = math.min(rajada, tokens + (agora - ultimo) * taxa)
+local espera = 0
+if tokens >= 1 then
+  tokens = tokens - 1
+else
+  espera = (1 - tokens) / taxa
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ultimo', agora)
+redis.call('EXPIRE', KEYS[1], math.ceil(rajada / taxa) + 1)
+return tostring(espera)
+"""
+
+
+class RedisBackend:
+    """Backend compartilhado entre workers. Requer o extra `redis` (`pip install .[redis]`)."""
+
+    PREFIXO = "rl:"
+
+    def __init__(self, url: str | None = None, ttl_concorrencia: int = 300, cliente=None):
+        """
+        Args:
+            url: URL do Redis (ignorada se `cliente` for informado)
+            ttl_concorrencia: Segundos até um contador de concorrência abandonado expirar
+            cliente: Cliente `redis.Redis` já construído (ex.: nos testes)
+        """
+        if cliente is None:
+            try:
+                import redis
+            except ImportError as e:
+                raise RuntimeError("RATE_LIMIT_BACKEND=redis requer o pacote 'redis' instalado") from e
+            cliente = redis.Redis.from_url(url)
+        self._redis = cliente
+        self._token_bucket = self._redis.register_script(_TOKEN_BUCKET_LUA)
+        self._ttl_concorrencia = ttl_concorrencia
+
+    def consumir(self, chave: str, limite: Limite) -> float:
+        if limite.taxa <= 0:
+            return math.inf
+        return float(self._token_bucket(
+            keys=[f"{self.PREFIXO}tb:{chave}"], args=[limite.taxa, limite.rajada, time.time()]
+        ))
+
+    def entrar(self, chave: str, limite: Limite) -> bool:
+        chave_redis = f"{self.PREFIXO}cc:{chave}"
+        atual = self._redis.incr(chave_redis)
+        # TTL evita que um worker encerrado deixe o contador preso
+        self._redis.expire(chave_redis, self._ttl_concorrencia)
+        if atual > limite.concorrencia:
+            self._redis.decr(chave_redis)
+            return False
+        return True
+
+    def sair(self, chave: str) -> None:
+        self._redis.decr(f"{self.PREFIXO}cc:{chave}")
+
+    def clear(self) -> None:
+        """Remove todos os contadores do limitador (compartilhados entre workers)."""
+        chaves = list(self._redis.scan_iter(match=f"{self.PREFIXO}*"))
+        if chaves:
+            self._redis.delete(*chaves)
+
+
+_backend: MemoryBackend | RedisBackend | None = None
+
+
+def get_backend() -> MemoryBackend | RedisBackend:
+    global _backend
+    if _backend is None:
+        settings = get_settings()
+        if settings.RATE_LIMIT_BACKEND == "redis":
+            _backend = RedisBackend(settings.RATE_LIMIT_REDIS_URL)
+        else:
+            _backend = MemoryBackend()
+    return _backend
+
+
+def normalizar_caminho(caminho: str) -> str:
+    """Troca ids numéricos por `{id}` para agrupar a rota: /manutencao/7/materiais -> /manutencao/{id}/materiais"""
+    return re.sub(r"/\d+(?=/|$)", "/{id}", caminho)
+
+
+def chave_cliente(headers, tenant_id: int | None, client_host: str | None) -> str:
+    """
+    Chave do cliente no limitador: a API key (prefixo do sha256), se for válida, senão o IP.
+
+    Cada chave tem seu próprio bucket, mesmo entre chaves do mesmo tenant.
+
+    Args:
+        headers: Headers da requisição
+        tenant_id: Tenant da API key da requisição (None se ausente ou inválida)
+        client_host: IP do cliente (`request.client.host`)
+    """
+    if tenant_id is not None:
+        digest = hashlib.sha256(headers[get_settings().API_KEY_HEADER].encode()).hexdigest()
+        return f"chave:{digest[:16]}"
+    return f"ip:{client_host or 'anonimo'}"
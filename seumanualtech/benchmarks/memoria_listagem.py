@@ -0,0 +1,89 @@
+"""
+Benchmark de memória da listagem de manutenções.
+
+Compara o pico de alocação (tracemalloc) para montar uma página com objetos
+ORM (`selectinload` + `_manutencao_to_schema`) e com o caminho somente leitura
+de `list_all`.
+
+Uso:
+    python -m benchmarks.memoria_listagem [--manutencoes 2000] [--materiais 200] [--por-manutencao 5] [--pagina 500]
+"""
+import argparse
+import random
+import tracemalloc
+
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy.pool import StaticPool
+
+from app.database.core import Base
+from app.models.manutencao import Manutencao
+from app.models.manutencao_material import ManutencaoMaterial
+from app.models.material import Material
+from app.services import manutencao as service
+
+
+def popular(session: Session, manutencoes: int, materiais: int, por_manutencao: int) -> None:
+    rng = random.Random(42)
+    session.execute(insert(Material), [
+        {"nome": f"Material {i}", "preco_unitario": round(rng.uniform(1, 500), 2)} for i in range(materiais)
+    ])
+    session.execute(insert(Manutencao), [{"resumo": f"Manutenção {i}"} for i in range(manutencoes)])
+    session.execute(insert(ManutencaoMaterial), [
+        {"manutencao_id": m, "material_id": rng.randint(1, materiais), "quantidade": rng.randint(1, 20)}
+        for m in range(1, manutencoes + 1)
+        for _ in range(por_manutencao)
+    ])
+    session.commit()
+
+
+def pagina_orm(session: Session, limite: int) -> list:
+    query = (
+        select(Manutencao)
+        .options(selectinload(Manutencao.materiais_consumidos).selectinload(ManutencaoMaterial.material))
+        .order_by(Manutencao.criado_em.desc(), Manutencao.id.desc())
+        .limit(limite)
+    )
+    return [service._manutencao_to_schema(manutencao) for manutencao in session.scalars(query).all()]
+
+
+def pagina_compacta(session: Session, limite: int) -> list:
+    return service.list_all(session, limit=limite)
+
+
+def medir(engine, funcao, limite: int) -> int:
+    """Pico de bytes alocados para montar uma página em uma sessão nova."""
+    with Session(engine) as session:
+        tracemalloc.start()
+        funcao(session, limite)
+        _, pico = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return pico
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark de memória da listagem de manutenções")
+    parser.add_argument("--manutencoes", type=int, default=2000)
+    parser.add_argument("--materiais", type=int, default=200)
+    parser.add_argument("--por-manutencao", type=int, default=5)
+    parser.add_argument("--pagina", type=int, default=500)
+    args = parser.parse_args(argv)
+
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        popular(session, args.manutencoes, args.materiais, args.por_manutencao)
+
+    # aquece caches de compilação para medir só a montagem da página
+    medir(engine, pagina_orm, 1)
+    medir(engine, pagina_compacta, 1)
+
+    orm = medir(engine, pagina_orm, args.pagina)
+    compacta = medir(engine, pagina_compacta, args.pagina)
+    print(f"página de {args.pagina} manutenções x {args.por_manutencao} materiais")
+    print(f"  ORM:      {orm / 1024:10.1f} KiB")
+    print(f"  compacta: {compacta / 1024:10.1f} KiB ({compacta / orm:.0%} do ORM)")
+
+
+if __name__ == "__main__":
+    main()
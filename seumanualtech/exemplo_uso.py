@@ -3,12 +3,14 @@
 Script de exemplo para demonstrar o uso da API de rastreamento de materiais.
 
 Execute este script com o servidor rodando:
-    uv run uvicorn app.main:app --reload
+    TENANT_API_KEYS='{"chave-exemplo": 1}' uv run uvicorn --factory app.main:create_app --reload
 
 Em outro terminal:
     uv run python exemplo_uso.py
 """
 
+import os
+
 import requests
 import json
 from typing import Any
@@ -16,6 +18,9 @@ from app.models.enums import StatusManutencao
 
 BASE_URL = "http://127.0.0.1:8000"
 
+http = requests.Session()
+http.headers["X-API-Key"] = os.environ.get("API_KEY", "chave-exemplo")
+
 
 def print_json(data: Any, title: str = ""):
     """Helper para imprimir JSON formatado"""
@@ -36,7 +41,7 @@ def main():
         "resumo": "Reparar parede norte do prédio A",
         "status": StatusManutencao.ABERTO.value
     }
-    response = requests.post(f"{BASE_URL}/manutencao/", json=manutencao_data)
+    response = http.post(f"{BASE_URL}/manutencao/", json=manutencao_data)
     manutencao = response.json()
     print_json(manutencao, "Manutenção criada")
     manutencao_id = manutencao["id"]
@@ -53,14 +58,14 @@ def main():
     
     materiais = []
     for material_data in materiais_data:
-        response = requests.post(f"{BASE_URL}/materiais/", json=material_data)
+        response = http.post(f"{BASE_URL}/materiais/", json=material_data)
         material = response.json()
         materiais.append(material)
         print(f"  ✓ {material['nome']} - R$ {material['precoUnitario']:.2f}")
     
     # 3. Listar todos os materiais
     print("\n📋 3. Listando todos os materiais do catálogo...")
-    response = requests.get(f"{BASE_URL}/materiais/")
+    response = http.get(f"{BASE_URL}/materiais/")
     all_materiais = response.json()
     print_json(all_materiais, "Catálogo de Materiais")
     
@@ -75,7 +80,7 @@ def main():
     ]
     
     for consumo in consumos:
-        response = requests.post(
+        response = http.post(
             f"{BASE_URL}/manutencao/{manutencao_id}/materiais",
             json=consumo
         )
@@ -86,7 +91,7 @@ def main():
     
     # 5. Consultar manutenção com custos calculados
     print("\n💰 5. Consultando manutenção com custos calculados...")
-    response = requests.get(f"{BASE_URL}/manutencao/{manutencao_id}")
+    response = http.get(f"{BASE_URL}/manutencao/{manutencao_id}")
     manutencao_final = response.json()
     print_json(manutencao_final, "Manutenção com Materiais e Custos")
     
@@ -107,14 +112,14 @@ def main():
     print("\n❌ 7. Testando proteção contra adição de materiais em manutenção finalizada...")
     
     # Criar manutenção finalizada
-    response = requests.post(
+    response = http.post(
         f"{BASE_URL}/manutencao/",
         json={"resumo": "Manutenção já concluída", "status": StatusManutencao.FINALIZADO.value}
     )
     manutencao_finalizada = response.json()
     
     # Tentar adicionar material
-    response = requests.post(
+    response = http.post(
         f"{BASE_URL}/manutencao/{manutencao_finalizada['id']}/materiais",
         json={"materialId": materiais[0]["id"], "quantidade": 1}
     )
@@ -134,6 +139,6 @@ if __name__ == "__main__":
     except requests.exceptions.ConnectionError:
         print("\n❌ Erro: Não foi possível conectar ao servidor.")
         print("   Certifique-se de que o servidor está rodando:")
-        print("   uv run uvicorn app.main:app --reload")
+        print("   uv run uvicorn --factory app.main:create_app --reload")
     except Exception as e:
         print(f"\n❌ Erro: {e}")
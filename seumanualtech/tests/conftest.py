@@ -1,43 +1,128 @@
+"""
+Fixtures de banco dos testes.
+
+O schema é criado uma vez por sessão do pytest; cada teste roda dentro de
+uma transação que é desfeita no final, e os `commit()` do código testado
+viram SAVEPOINTs dentro dela.
+
+Por padrão usa SQLite em memória. Com `TEST_DATABASE_URL` os mesmos testes
+rodam contra outro banco (ex.: o Postgres descrito no README); com
+pytest-xdist (`-n auto`) cada worker usa o seu próprio banco.
+"""
+import os
+from pathlib import Path
+
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import URL, create_engine, event, make_url, text
 from sqlalchemy.pool import StaticPool
 
+from app.config import settings
 from app.database.core import Base, get_db
 from app.main import app
+from app.services import rate_limit
+from app.services.eventos import broadcaster
+from app.services.manutencao import detalhe_cache
+from tests.util import API_KEYS, T1, sessao_transacional
 
 
-SQLALCHEMY_DATABASE_URL = "sqlite:///:memory:"
+SQLALCHEMY_DATABASE_URL = os.environ.get("TEST_DATABASE_URL", "sqlite:///:memory:")
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL,
-    connect_args={"check_same_thread": False},
-    poolclass=StaticPool,
-)
-TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+def _url_do_worker(url: URL, worker: str | None) -> URL:
+    """Banco exclusivo do worker do xdist (o SQLite em memória já é por processo)."""
+    if not worker or url.database in (None, "", ":memory:"):
+        return url
+    if url.get_backend_name() == "sqlite":
+        caminho = Path(url.database)
+        return url.set(database=str(caminho.with_stem(f"{caminho.stem}_{worker}")))
+    return url.set(database=f"{url.database}_{worker}")
 
-@pytest.fixture(scope="function")
-def db_session():
+
+def _criar_banco_postgres(url: URL) -> None:
+    admin = create_engine(url.set(database="postgres"), isolation_level="AUTOCOMMIT")
+    with admin.connect() as conn:
+        conn.execute(text(f'DROP DATABASE IF EXISTS "{url.database}"'))
+        conn.execute(text(f'CREATE DATABASE "{url.database}"'))
+    admin.dispose()
+
+
+def _remover_banco_postgres(url: URL) -> None:
+    admin = create_engine(url.set(database="postgres"), isolation_level="AUTOCOMMIT")
+    with admin.connect() as conn:
+        conn.execute(text(f'DROP DATABASE IF EXISTS "{url.database}" WITH (FORCE)'))
+    admin.dispose()
+
+
+def _criar_engine(url: URL):
+    if url.get_backend_name() != "sqlite":
+        return create_engine(url)
+
+    engine = create_engine(url, connect_args={"check_same_thread": False}, poolclass=StaticPool)
+
+    # o pysqlite abre e fecha transações por conta própria, o que quebra
+    # SAVEPOINTs; o controle passa para o SQLAlchemy (receita da documentação)
+    @event.listens_for(engine, "connect")
+    def _sem_transacao_implicita(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine, "begin")
+    def _begin(conn):
+        conn.exec_driver_sql("BEGIN")
+
+    return engine
+
+
+@pytest.fixture(scope="session")
+def engine():
+    base = make_url(SQLALCHEMY_DATABASE_URL)
+    url = _url_do_worker(base, os.environ.get("PYTEST_XDIST_WORKER"))
+    banco_proprio = url.get_backend_name() == "postgresql" and url.database != base.database
+    if banco_proprio:
+        _criar_banco_postgres(url)
+
+    engine = _criar_engine(url)
     Base.metadata.create_all(bind=engine)
-    session = TestingSessionLocal()
     try:
-        yield session
+        yield engine
     finally:
-        session.close()
         Base.metadata.drop_all(bind=engine)
+        engine.dispose()
+        if banco_proprio:
+            _remover_banco_postgres(url)
+
+
+@pytest.fixture(autouse=True)
+def _somente_dialeto(request):
+    """Pula testes marcados com `@pytest.mark.dialeto("sqlite")` em outros bancos."""
+    marcador = request.node.get_closest_marker("dialeto")
+    if marcador:
+        atual = make_url(SQLALCHEMY_DATABASE_URL).get_backend_name()
+        if atual not in marcador.args:
+            pytest.skip(f"específico de {', '.join(marcador.args)} (banco atual: {atual})")
+
+
+@pytest.fixture(scope="function")
+def db_session(engine):
+    with sessao_transacional(engine) as session:
+        yield session
 
 
 @pytest.fixture(scope="function")
-def client(db_session):
+def client(db_session, monkeypatch):
     def override_get_db():
         try:
             yield db_session
         finally:
             pass
 
+    monkeypatch.setattr(settings, "TENANT_API_KEYS", API_KEYS)
     app.dependency_overrides[get_db] = override_get_db
-    with TestClient(app) as c:
+    detalhe_cache.clear()
+    broadcaster.clear()
+    rate_limit.get_backend().clear()
+    # requisições sem header de autenticação explícito são do tenant 1
+    with TestClient(app, headers=T1) as c:
         yield c
     app.dependency_overrides.clear()
+    detalhe_cache.clear()
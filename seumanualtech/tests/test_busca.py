@@ -0,0 +1,74 @@
+from fastapi.testclient import TestClient
+
+from app.services.busca import consulta_fts5
+from tests.util import T1, T2
+
+
+def _criar(client: TestClient, resumo: str, status: str = "aberto", headers: dict = T1) -> int:
+    return client.post(
+        "/manutencao/", json={"resumo": resumo, "status": status}, headers=headers
+    ).json()["id"]
+
+
+def test_consulta_fts5_sem_acentos_e_por_radical():
+    """Testa a normalização dos termos e o escape de sintaxe FTS5"""
+    assert consulta_fts5("Paredes NORTE") == '"pared"* "nort"*'
+    assert consulta_fts5("manutenções") == consulta_fts5("manutenção")
+    assert consulta_fts5('" OR * -') == '"or"*'
+    assert consulta_fts5('"* -') == ""
+
+
+def test_busca_ranqueada_com_filtros(client: TestClient):
+    """Testa relevância, plurais/acentos e combinação com status"""
+    forte = _criar(client, "Reparo na parede norte: parede com infiltração na face norte")
+    fraca = _criar(client, "Pintura das paredes do bloco norte e troca de lâmpadas do corredor central")
+    _criar(client, "Troca de torneira da cozinha")
+    finalizada = _criar(client, "Parede norte rebocada", status="finalizado")
+
+    response = client.get("/manutencao/busca", params={"q": "parede norte"})
+    assert response.status_code == 200
+    ids = [item["id"] for item in response.json()["itens"]]
+    assert set(ids) == {forte, fraca, finalizada}
+    assert ids.index(forte) < ids.index(fraca)
+
+    response = client.get("/manutencao/busca", params={"q": "PAREDÊS", "status": "finalizado"})
+    assert [item["id"] for item in response.json()["itens"]] == [finalizada]
+
+    response = client.get("/manutencao/busca", params={"q": "parede", "ate": "2000-01-01T00:00:00"})
+    assert response.json()["itens"] == []
+
+
+def test_busca_paginada_por_cursor(client: TestClient):
+    """Testa que as páginas por cursor cobrem todos os resultados sem repetir"""
+    ids = {_criar(client, f"Vazamento no banheiro {i}") for i in range(7)}
+
+    vistos = []
+    cursor = None
+    while True:
+        params = {"q": "vazamento", "limit": 3}
+        if cursor:
+            params["cursor"] = cursor
+        data = client.get("/manutencao/busca", params=params).json()
+        vistos += [item["id"] for item in data["itens"]]
+        cursor = data["proximoCursor"]
+        if not cursor:
+            break
+    assert sorted(vistos) == sorted(ids)
+
+    assert client.get("/manutencao/busca", params={"q": "x", "cursor": "!!"}).status_code == 400
+
+
+def test_busca_sem_termos(client: TestClient):
+    """Testa que texto sem termos pesquisáveis é rejeitado em qualquer banco"""
+    response = client.get("/manutencao/busca", params={"q": '"* -'})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Informe ao menos um termo para a busca"
+
+
+def test_busca_isolada_por_tenant(client: TestClient):
+    """Testa que a busca não retorna manutenções de outro tenant"""
+    _criar(client, "Parede norte", headers=T1)
+    outro = _criar(client, "Parede norte", headers=T2)
+
+    response = client.get("/manutencao/busca", params={"q": "parede"}, headers=T2)
+    assert [item["id"] for item in response.json()["itens"]] == [outro]
@@ -0,0 +1,112 @@
+import threading
+import time
+
+from fastapi.testclient import TestClient
+
+from app.services.cache import SingleFlightCache
+
+
+def test_single_flight_coalesce_leituras_simultaneas():
+    """Testa que chamadas simultâneas para a mesma chave executam o loader uma vez"""
+    cache = SingleFlightCache(ttl=0)
+    chamadas = []
+    liberar = threading.Event()
+
+    def loader():
+        chamadas.append(1)
+        liberar.wait(timeout=2)
+        return "valor"
+
+    resultados = []
+    threads = [
+        threading.Thread(target=lambda: resultados.append(cache.get_or_load(1, loader)))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.05)
+    liberar.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(chamadas) == 1
+    assert resultados == ["valor"] * 8
+
+
+def test_cache_ttl_e_invalidacao():
+    """Testa que o valor fica em cache até ser invalidado"""
+    cache = SingleFlightCache(ttl=60)
+    contador = iter(range(100))
+
+    assert cache.get_or_load("a", lambda: next(contador)) == 0
+    assert cache.get_or_load("a", lambda: next(contador)) == 0
+
+    cache.invalidate("a")
+    assert cache.get_or_load("a", lambda: next(contador)) == 1
+
+
+def test_cache_nao_armazena_none():
+    cache = SingleFlightCache(ttl=60)
+    assert cache.get_or_load(1, lambda: None) is None
+    assert cache.get_or_load(1, lambda: "novo") == "novo"
+
+
+def test_invalidacao_durante_load_nao_grava_valor_antigo():
+    """Testa que um load em andamento na invalidação não vai para o cache e não deixa estado para trás"""
+    cache = SingleFlightCache(ttl=60)
+    carregando = threading.Event()
+    liberar = threading.Event()
+
+    def loader_lento():
+        carregando.set()
+        liberar.wait(timeout=2)
+        return "antigo"
+
+    thread = threading.Thread(target=lambda: cache.get_or_load("a", loader_lento))
+    thread.start()
+    carregando.wait(timeout=2)
+    cache.invalidate("a")
+    assert cache.get_or_load("a", lambda: "novo") == "novo"
+    liberar.set()
+    thread.join()
+
+    assert cache.get_or_load("a", lambda: "outro") == "novo"
+    cache.invalidate("a")
+    cache.invalidate("nunca-lida")
+    assert len(cache) == 0
+    assert cache._flights == {}
+
+
+def test_cache_limitado():
+    cache = SingleFlightCache(ttl=60, max_chaves=3)
+    for chave in range(10):
+        cache.get_or_load(chave, lambda: "valor")
+
+    assert len(cache) == 3
+    assert cache.get_or_load(9, lambda: "recarregado") == "valor"
+    assert cache.get_or_load(0, lambda: "recarregado") == "recarregado"
+
+
+def test_detalhe_invalidado_ao_adicionar_material(client: TestClient):
+    """Testa que o detalhe em cache reflete o material adicionado"""
+    manutencao_id = client.post("/manutencao/", json={"resumo": "Pintura"}).json()["id"]
+    material_id = client.post("/materiais/", json={"nome": "Tinta", "precoUnitario": 30.0}).json()["id"]
+
+    assert client.get(f"/manutencao/{manutencao_id}").json()["materiais"] == []
+
+    client.post(f"/manutencao/{manutencao_id}/materiais", json={"materialId": material_id, "quantidade": 2})
+
+    data = client.get(f"/manutencao/{manutencao_id}").json()
+    assert len(data["materiais"]) == 1
+    assert data["custoTotalMateriais"] == 60.0
+
+
+def test_detalhe_invalidado_ao_atualizar_e_deletar(client: TestClient):
+    manutencao_id = client.post("/manutencao/", json={"resumo": "Pintura"}).json()["id"]
+    client.get(f"/manutencao/{manutencao_id}")
+
+    client.put(f"/manutencao/{manutencao_id}", json={"resumo": "Pintura externa"})
+    assert client.get(f"/manutencao/{manutencao_id}").json()["resumo"] == "Pintura externa"
+
+    client.delete(f"/manutencao/{manutencao_id}")
+    assert client.get(f"/manutencao/{manutencao_id}").status_code == 404
@@ -0,0 +1,67 @@
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+
+def _popular(client: TestClient) -> int:
+    manutencao_id = client.post("/manutencao/", json={"resumo": "Reparar parede"}).json()["id"]
+    material_id = client.post("/materiais/", json={"nome": "Cimento", "precoUnitario": 50.0}).json()["id"]
+    client.post(f"/manutencao/{manutencao_id}/materiais", json={"materialId": material_id, "quantidade": 2})
+    client.post(f"/manutencao/{manutencao_id}/materiais", json={"materialId": material_id, "quantidade": 1.5})
+    return manutencao_id
+
+
+def _capturar_sql(client: TestClient, db_session, url: str) -> tuple[list[str], object]:
+    statements = []
+    engine = db_session.get_bind()
+
+    def before_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_execute)
+    try:
+        response = client.get(url)
+    finally:
+        event.remove(engine, "before_cursor_execute", before_execute)
+    return statements, response
+
+
+def test_fields_lista_sem_materiais(client: TestClient, db_session):
+    """Testa que sem 'materiais' a consulta de consumos não é feita e o custo vem do banco"""
+    manutencao_id = _popular(client)
+
+    statements, response = _capturar_sql(client, db_session, "/manutencao/?fields=id,resumo,custoTotalMateriais")
+
+    assert response.status_code == 200
+    assert response.json() == [{"id": manutencao_id, "resumo": "Reparar parede", "custoTotalMateriais": 175.0}]
+    # só quantidade e preço para o custo; as linhas de consumo não são carregadas
+    assert not any("manutencao_materiais.id" in s for s in statements)
+    assert any("FROM manutencao_materiais" in s for s in statements)
+
+
+def test_fields_detalhe(client: TestClient):
+    manutencao_id = _popular(client)
+
+    response = client.get(f"/manutencao/{manutencao_id}?fields=id,status")
+    assert response.json() == {"id": manutencao_id, "status": "aberto"}
+
+    response = client.get(f"/manutencao/{manutencao_id}?fields=id,materiais")
+    assert len(response.json()["materiais"]) == 2
+
+
+def test_fields_invalido(client: TestClient):
+    response = client.get("/manutencao/?fields=id,inexistente")
+    assert response.status_code == 400
+    assert "inexistente" in response.json()["detail"]
+
+
+def test_resposta_grande_comprimida(client: TestClient):
+    """Testa compressão de respostas acima do limite configurado"""
+    for i in range(30):
+        client.post("/manutencao/", json={"resumo": f"Manutenção preventiva do bloco {i}"})
+
+    response = client.get("/manutencao/", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert len(response.json()) == 30
+
+    pequena = client.get("/health/live", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in pequena.headers
@@ -0,0 +1,35 @@
+from decimal import Decimal
+
+from fastapi.testclient import TestClient
+
+from app.models.dinheiro import custo_linha
+from app.models.enums import StatusManutencao
+from app.services import custos
+
+
+def test_custo_linha_arredonda_sem_float():
+    """Testa que o custo por linha é exato em centavos (0.1 * 0.7 não vira 0.06999...)"""
+    assert custo_linha(Decimal("0.1"), Decimal("0.70")) == Decimal("0.07")
+    assert custo_linha(Decimal("3"), Decimal("0.115")) == Decimal("0.35")
+    assert custos.totais_por_manutencao([
+        (1, Decimal("0.1"), Decimal("0.70")),
+        (1, Decimal("0.2"), Decimal("0.70")),
+        (2, Decimal("1"), Decimal("19.99")),
+    ]) == {1: Decimal("0.21"), 2: Decimal("19.99")}
+
+
+def test_total_da_listagem_bate_com_detalhe(client: TestClient):
+    """Testa que o total na listagem é a soma exata dos custos do detalhe"""
+    manutencao_id = client.post(
+        "/manutencao/", json={"resumo": "Pintura", "status": StatusManutencao.ABERTO.value}
+    ).json()["id"]
+    for nome, preco, quantidade in [("Tinta", 0.1, 3), ("Rolo", 0.2, 3), ("Fita", 0.7, 0.1)]:
+        material_id = client.post("/materiais/", json={"nome": nome, "precoUnitario": preco}).json()["id"]
+        client.post(f"/manutencao/{manutencao_id}/materiais", json={"materialId": material_id, "quantidade": quantidade})
+
+    detalhe = client.get(f"/manutencao/{manutencao_id}").json()
+    assert [m["custo"] for m in detalhe["materiais"]] == [0.3, 0.6, 0.07]
+    assert detalhe["custoTotalMateriais"] == 0.97
+
+    listagem = client.get("/manutencao/").json()
+    assert listagem[0]["custoTotalMateriais"] == 0.97
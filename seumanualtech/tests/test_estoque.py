@@ -0,0 +1,63 @@
+from fastapi.testclient import TestClient
+
+
+def _criar(client: TestClient, nome: str, estoque: float | None = None) -> int:
+    payload = {"nome": nome, "precoUnitario": 10.0}
+    if estoque is not None:
+        payload["estoque"] = estoque
+    return client.post("/materiais/", json=payload).json()["id"]
+
+
+def test_consumo_baixa_estoque(client: TestClient):
+    """Testa que o consumo decrementa o estoque do material"""
+    manutencao_id = client.post("/manutencao/", json={"resumo": "Reparo"}).json()["id"]
+    material_id = _criar(client, "Cimento", estoque=10)
+
+    response = client.post(f"/manutencao/{manutencao_id}/materiais", json={"materialId": material_id, "quantidade": 4})
+    assert response.status_code == 200
+    assert client.get(f"/materiais/{material_id}").json()["estoque"] == 6.0
+
+
+def test_consumo_sem_estoque_suficiente(client: TestClient):
+    """Testa que não é possível consumir mais do que há em estoque"""
+    manutencao_id = client.post("/manutencao/", json={"resumo": "Reparo"}).json()["id"]
+    material_id = _criar(client, "Cimento", estoque=3)
+
+    response = client.post(f"/manutencao/{manutencao_id}/materiais", json={"materialId": material_id, "quantidade": 4})
+    assert response.status_code == 400
+    assert "Estoque insuficiente" in response.json()["detail"]
+    assert client.get(f"/materiais/{material_id}").json()["estoque"] == 3.0
+    assert client.get(f"/manutencao/{manutencao_id}").json()["materiais"] == []
+
+
+def test_material_sem_controle_de_estoque(client: TestClient):
+    """Testa que materiais sem estoque informado não são limitados"""
+    manutencao_id = client.post("/manutencao/", json={"resumo": "Reparo"}).json()["id"]
+    material_id = _criar(client, "Areia")
+
+    response = client.post(f"/manutencao/{manutencao_id}/materiais", json={"materialId": material_id, "quantidade": 1000})
+    assert response.status_code == 200
+    assert client.get(f"/materiais/{material_id}").json()["estoque"] is None
+
+
+def test_listar_estoque_baixo(client: TestClient):
+    _criar(client, "Cimento", estoque=2)
+    _criar(client, "Tijolo", estoque=500)
+    _criar(client, "Areia")
+    _criar(client, "Cal", estoque=0)
+
+    response = client.get("/materiais/estoque-baixo?limite=5")
+    assert response.status_code == 200
+    assert [material["nome"] for material in response.json()] == ["Cal", "Cimento"]
+
+
+def test_update_sem_estoque_mantem_estoque(client: TestClient):
+    """Testa que um PUT sem 'estoque' não desliga o controle de estoque"""
+    material = {"nome": "Cimento", "precoUnitario": 50.0}
+    material_id = client.post("/materiais/", json={**material, "estoque": 10}).json()["id"]
+
+    response = client.put(f"/materiais/{material_id}", json={**material, "precoUnitario": 55.0})
+    assert response.json()["estoque"] == 10.0
+
+    response = client.put(f"/materiais/{material_id}", json={**material, "estoque": 4})
+    assert response.json()["estoque"] == 4.0
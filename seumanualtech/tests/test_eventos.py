@@ -0,0 +1,146 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+from fastapi.testclient import TestClient
+
+from app.database import core
+from app.routes.eventos import stream_eventos
+from app.services.eventos import Broadcaster, PostgresNotifyBackend, broadcaster, publicar
+
+
+def test_eventos_publicados_pelos_services(client: TestClient):
+    """Testa que criações, atualizações e consumos geram eventos"""
+    manutencao_id = client.post("/manutencao/", json={"resumo": "Reparar telhado"}).json()["id"]
+    material_id = client.post("/materiais/", json={"nome": "Telha", "precoUnitario": 12.0}).json()["id"]
+    client.post(f"/manutencao/{manutencao_id}/materiais", json={"materialId": material_id, "quantidade": 10})
+    client.put(f"/manutencao/{manutencao_id}", json={"resumo": "Reparar telhado", "status": "finalizado"})
+
+    eventos = broadcaster.desde(0)
+    assert [evento["tipo"] for evento in eventos] == [
+        "manutencao.criada",
+        "material.criado",
+        "manutencao.material_adicionado",
+        "manutencao.atualizada",
+    ]
+    assert eventos[2]["entidade_id"] == manutencao_id
+    assert eventos[2]["dados"]["material_id"] == material_id
+    assert eventos[3]["dados"]["status"] == "finalizado"
+    assert [evento["id"] for evento in eventos] == sorted(evento["id"] for evento in eventos)
+
+
+def test_websocket_retoma_a_partir_do_id(client: TestClient):
+    """Testa a retomada do feed a partir de um id de evento"""
+    primeiro = client.post("/manutencao/", json={"resumo": "A"}).json()["id"]
+    client.post("/manutencao/", json={"resumo": "B"})
+    id_primeiro_evento = broadcaster.desde(0)[0]["id"]
+
+    with client.websocket_connect(f"/eventos/ws?desde={id_primeiro_evento}") as websocket:
+        evento = websocket.receive_json()
+
+    assert evento["tipo"] == "manutencao.criada"
+    assert evento["entidade_id"] == primeiro + 1
+
+
+def test_stream_sse_replay_e_novos_eventos(client: TestClient):
+    """Testa o gerador SSE com eventos pendentes e um evento publicado depois"""
+    broadcaster.clear()
+    anterior = publicar("material.criado", 1)
+
+    class FakeRequest:
+        def __init__(self):
+            self.chamadas = 0
+
+        async def is_disconnected(self):
+            self.chamadas += 1
+            return self.chamadas > 1
+
+    async def consumir():
+        gerador = stream_eventos(FakeRequest(), desde=0, tenant_id=1)
+        recebidos = [await gerador.__anext__()]
+        publicar("material.removido", 1)
+        recebidos.append(await gerador.__anext__())
+        await gerador.aclose()
+        return recebidos
+
+    mensagens = asyncio.run(consumir())
+    assert mensagens[0].startswith(f"id: {anterior['id']}\nevent: material.criado\n")
+    payload = json.loads(mensagens[1].split("data: ", 1)[1])
+    assert payload["tipo"] == "material.removido"
+
+
+def test_stream_entrega_evento_atrasado_de_outro_worker(client: TestClient):
+    """Testa que um evento com id menor, vindo de outro worker depois, não é descartado"""
+    broadcaster.clear()
+
+    class FakeRequest:
+        async def is_disconnected(self):
+            return False
+
+    async def consumir():
+        gerador = stream_eventos(FakeRequest(), desde=None, tenant_id=1)
+        proximo = asyncio.ensure_future(gerador.__anext__())
+        await asyncio.sleep(0)
+        local = publicar("material.criado", 1)
+        recebidos = [await proximo]
+        atrasado = {**local, "id": local["id"] - 50, "tipo": "material.removido"}
+        broadcaster.dispatch(atrasado)
+        broadcaster.dispatch(atrasado)  # entregue de novo (ex.: replay + NOTIFY)
+        publicar("material.atualizado", 1)
+        recebidos += [await gerador.__anext__(), await gerador.__anext__()]
+        await gerador.aclose()
+        return [json.loads(m.split("data: ", 1)[1])["tipo"] for m in recebidos]
+
+    assert asyncio.run(consumir()) == ["material.criado", "material.removido", "material.atualizado"]
+
+    # a retomada pelo último id recebido segue a ordem de chegada, não a dos ids
+    primeiro = broadcaster.desde(0)[0]
+    assert "material.removido" in [e["tipo"] for e in broadcaster.desde(primeiro["id"])]
+
+
+def test_ids_exatos_em_javascript():
+    """Testa que os ids cabem em 2**53 (Number.MAX_SAFE_INTEGER) e são crescentes"""
+    ids = [publicar("material.criado", 1)["id"] for _ in range(1000)]
+
+    assert ids == sorted(set(ids))
+    assert ids[-1] < 2 ** 53
+
+
+class _ConexaoPsycopg3:
+    """Conexão psycopg 3 falsa: entrega as notificações e encerra o listener."""
+
+    def __init__(self, backend: PostgresNotifyBackend, payloads: list[dict]):
+        self.backend = backend
+        self.payloads = payloads
+        self.autocommit = False
+        self.comandos = []
+
+    def cursor(self):
+        return SimpleNamespace(execute=self.comandos.append, close=lambda: None)
+
+    def notifies(self, timeout):
+        for payload in self.payloads:
+            yield SimpleNamespace(payload=json.dumps(payload))
+        self.backend.stop()
+
+
+def test_listener_postgres_reconecta(monkeypatch, caplog):
+    """Testa que o listener registra a falha de conexão, reconecta e repassa as notificações"""
+    destino = Broadcaster(buffer_size=10)
+    backend = PostgresNotifyBackend(destino, "eventos")
+    backend.ESPERA_INICIAL = 0.01
+    conexao = _ConexaoPsycopg3(backend, [{"id": 7, "tenant_id": 1, "tipo": "material.criado"}])
+    tentativas = iter([ConnectionError("banco indisponível"), SimpleNamespace(driver_connection=conexao, close=lambda: None)])
+
+    def raw_connection():
+        resultado = next(tentativas)
+        if isinstance(resultado, Exception):
+            raise resultado
+        return resultado
+
+    monkeypatch.setattr(core, "init_engine", lambda: SimpleNamespace(raw_connection=raw_connection))
+    backend._escutar()
+
+    assert "Falha ao conectar o listener de eventos" in caplog.text
+    assert conexao.comandos == ['LISTEN "eventos"']
+    assert [evento["id"] for evento in destino.desde(0)] == [7]
@@ -0,0 +1,103 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event, update
+
+from app.models.manutencao import Manutencao
+from app.services import manutencao as service
+
+
+def _plano(db_session, **filtros) -> str:
+    """EXPLAIN QUERY PLAN da consulta principal de `list_all`, com os parâmetros reais (inclusive tenant)."""
+    capturadas = []
+    engine = db_session.get_bind()
+
+    def capturar(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            capturadas.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", capturar)
+    try:
+        service.list_all(db_session, campos={"id"}, **filtros)
+    finally:
+        event.remove(engine, "before_cursor_execute", capturar)
+    statement, parameters = capturadas[0]
+    linhas = db_session.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+    return "\n".join(linha[-1] for linha in linhas)
+
+
+def _criar(client: TestClient, resumo: str, status: str = "aberto") -> int:
+    return client.post("/manutencao/", json={"resumo": resumo, "status": status}).json()["id"]
+
+
+def _consumir(client: TestClient, manutencao_id: int, material_id: int, quantidade: float) -> None:
+    client.post(f"/manutencao/{manutencao_id}/materiais", json={"materialId": material_id, "quantidade": quantidade})
+
+
+def test_filtros_combinados(client: TestClient, db_session):
+    """Testa 'abertas desta semana que usaram o material X' e a faixa de custo"""
+    cimento = client.post("/materiais/", json={"nome": "Cimento", "precoUnitario": 50.0}).json()["id"]
+    areia = client.post("/materiais/", json={"nome": "Areia", "precoUnitario": 10.0}).json()["id"]
+    com_cimento = _criar(client, "Parede")
+    _consumir(client, com_cimento, cimento, 2)
+    com_areia = _criar(client, "Piso")
+    _consumir(client, com_areia, areia, 1)
+    fechada = _criar(client, "Muro", status="finalizado")
+    antiga = _criar(client, "Antiga")
+
+    semana = datetime.now(timezone.utc) - timedelta(days=7)
+    db_session.execute(
+        update(Manutencao).where(Manutencao.id == antiga).values(criado_em=semana - timedelta(days=30))
+    )
+    db_session.commit()
+
+    def ids(**params) -> set[int]:
+        response = client.get("/manutencao/", params={"fields": "id", **params})
+        assert response.status_code == 200
+        return {item["id"] for item in response.json()}
+
+    assert ids(criado_desde=semana.isoformat()) == {com_cimento, com_areia, fechada}
+    assert ids(criado_ate=semana.isoformat()) == {antiga}
+    assert ids(status="aberto", criado_desde=semana.isoformat(), material_ids=str(cimento)) == {com_cimento}
+    assert ids(material_ids=f"{cimento},{areia}") == {com_cimento, com_areia}
+    assert ids(custo_min=10, custo_max=10) == {com_areia}
+    assert ids(custo_max=0) == {fechada, antiga}
+    assert client.get("/manutencao/", params={"material_ids": "a,b"}).status_code == 400
+
+
+def test_filtro_atualizado_desde(client: TestClient, db_session):
+    """Testa que o filtro por atualização inclui as manutenções criadas e ainda não alteradas"""
+    nova = _criar(client, "Sem alteração")
+    alterada = _criar(client, "Alterada")
+    antiga = _criar(client, "Antiga, sem alteração")
+    alterada_antes = _criar(client, "Alterada há tempo")
+    ontem = datetime.now(timezone.utc) - timedelta(days=1)
+    db_session.execute(update(Manutencao).where(Manutencao.id == antiga).values(criado_em=ontem, atualizado_em=None))
+    db_session.execute(
+        update(Manutencao).where(Manutencao.id == alterada_antes).values(criado_em=ontem, atualizado_em=ontem)
+    )
+    db_session.commit()
+    client.put(f"/manutencao/{alterada}", json={"resumo": "Alterada de novo", "status": "aberto"})
+
+    response = client.get("/manutencao/", params={
+        "fields": "id", "atualizado_desde": (datetime.now(timezone.utc) - timedelta(minutes=5)).isoformat(),
+    })
+    assert {item["id"] for item in response.json()} == {nova, alterada}
+
+
+@pytest.mark.dialeto("sqlite")
+def test_planos_usam_indices(db_session):
+    """Testa via EXPLAIN que cada filtro é atendido pelo índice composto correspondente"""
+    agora = datetime.now(timezone.utc)
+
+    assert "ix_manutencoes_tenant_criado_em" in _plano(db_session, criado_desde=agora, criado_ate=agora)
+    assert "ix_manutencoes_tenant_status_criado_em" in _plano(db_session, status="aberto", criado_desde=agora)
+    assert "ix_manutencoes_tenant_alterado_em" in _plano(db_session, atualizado_desde=agora)
+
+    plano = _plano(db_session, material_ids=[1, 2])
+    assert "COVERING INDEX ix_manutencao_materiais_tenant_manutencao_material" in plano
+
+    plano = _plano(db_session, custo_min=10)
+    assert "COVERING INDEX ix_manutencao_materiais_tenant_manutencao_material" in plano
+    assert "SCAN manutencao_materiais" not in plano
@@ -0,0 +1,76 @@
+import os
+
+from fastapi.testclient import TestClient
+
+from app import server
+from app.config import settings
+from app.services import health as health_service
+from app.services.health import request_latency
+
+
+def test_health(client: TestClient):
+    """Testa o health check básico"""
+    response = client.get("/")
+    assert response.status_code == 200
+    assert response.json() == {"status": "ok"}
+
+
+def test_health_worker(client: TestClient):
+    """Testa que o health do worker informa o processo atual"""
+    response = client.get("/health/worker")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["pid"] == os.getpid()
+    assert data["uptime_segundos"] >= 0
+
+
+def test_default_workers_usa_configuracao(monkeypatch):
+    """Testa que SERVER_WORKERS tem prioridade sobre a contagem de CPUs"""
+    monkeypatch.setattr(settings, "SERVER_WORKERS", 3)
+    assert server.default_workers() == 3
+
+    monkeypatch.setattr(settings, "SERVER_WORKERS", 0)
+    assert server.default_workers() >= 1
+
+
+def test_liveness(client: TestClient):
+    """Testa que o liveness não depende do banco"""
+    response = client.get("/health/live")
+    assert response.status_code == 200
+    assert response.json() == {"status": "ok"}
+
+
+def test_readiness_ok(client: TestClient):
+    """Testa readiness com banco respondendo dentro dos limites"""
+    request_latency.clear()
+    response = client.get("/health/ready")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["status"] == "ok"
+    assert data["db_latencia_ms"] is not None
+    assert data["falhas"] == []
+
+
+def test_readiness_falha_com_p99_alto(client: TestClient, monkeypatch):
+    """Testa que readiness retorna 503 quando o p99 recente excede o limite"""
+    request_latency.clear()
+    monkeypatch.setattr(settings, "READINESS_MAX_P99_MS", 10.0)
+    for _ in range(10):
+        request_latency.record(50.0)
+
+    response = client.get("/health/ready")
+    assert response.status_code == 503
+    assert "p99 de latência acima do limite" in response.json()["falhas"]
+    request_latency.clear()
+
+
+def test_readiness_falha_com_pool_saturado(client: TestClient, monkeypatch):
+    """Testa que readiness retorna 503 quando o pool está saturado"""
+    monkeypatch.setattr(
+        health_service,
+        "pool_status",
+        lambda db: {"tipo": "QueuePool", "checked_out": 15, "overflow": 10, "capacidade": 15, "uso": 1.0},
+    )
+    response = client.get("/health/ready")
+    assert response.status_code == 503
+    assert "pool de conexões saturado" in response.json()["falhas"]
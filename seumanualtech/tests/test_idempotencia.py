@@ -0,0 +1,157 @@
+import threading
+from contextlib import nullcontext
+from datetime import datetime, timedelta, timezone
+
+from fastapi.testclient import TestClient
+from sqlalchemy import delete, select
+
+from app import outbox_worker
+from app.config import settings
+from app.models.idempotencia import IdempotenciaChave
+from app.schemas.manutencao import ManutencaoCreate
+from app.services import idempotencia, outbox
+
+
+def test_post_manutencao_com_mesma_chave_nao_duplica(client: TestClient):
+    """Testa que a retentativa devolve a resposta original sem criar outra manutenção"""
+    headers = {"Idempotency-Key": "abc-123"}
+    primeira = client.post("/manutencao/", json={"resumo": "Trocar lâmpada"}, headers=headers)
+    segunda = client.post("/manutencao/", json={"resumo": "Trocar lâmpada"}, headers=headers)
+
+    assert primeira.status_code == segunda.status_code == 201
+    assert primeira.json() == segunda.json()
+    assert segunda.headers["Idempotent-Replayed"] == "true"
+    assert len(client.get("/manutencao/").json()) == 1
+
+
+def test_consumo_com_mesma_chave_nao_duplica(client: TestClient):
+    """Testa que retentativas de consumo não geram linhas duplicadas"""
+    manutencao_id = client.post("/manutencao/", json={"resumo": "Reparo"}).json()["id"]
+    material_id = client.post("/materiais/", json={"nome": "Cimento", "precoUnitario": 50.0}).json()["id"]
+
+    for _ in range(3):
+        response = client.post(
+            f"/manutencao/{manutencao_id}/materiais",
+            json={"materialId": material_id, "quantidade": 2},
+            headers={"Idempotency-Key": "consumo-1"},
+        )
+        assert response.status_code == 200
+
+    data = client.get(f"/manutencao/{manutencao_id}").json()
+    assert len(data["materiais"]) == 1
+    assert data["custoTotalMateriais"] == 100.0
+
+
+def test_chave_reutilizada_com_outro_corpo(client: TestClient):
+    headers = {"Idempotency-Key": "abc-123"}
+    client.post("/manutencao/", json={"resumo": "Trocar lâmpada"}, headers=headers)
+    response = client.post("/manutencao/", json={"resumo": "Outra coisa"}, headers=headers)
+
+    assert response.status_code == 422
+
+
+def test_falha_libera_a_chave(client: TestClient):
+    """Testa que erros não são armazenados e a chave pode ser usada novamente"""
+    manutencao_id = client.post("/manutencao/", json={"resumo": "Reparo"}).json()["id"]
+    headers = {"Idempotency-Key": "consumo-2"}
+
+    response = client.post(
+        f"/manutencao/{manutencao_id}/materiais", json={"materialId": 999, "quantidade": 1}, headers=headers
+    )
+    assert response.status_code == 400
+
+    material_id = client.post("/materiais/", json={"nome": "Cimento", "precoUnitario": 50.0}).json()["id"]
+    response = client.post(
+        f"/manutencao/{manutencao_id}/materiais", json={"materialId": material_id, "quantidade": 1}, headers=headers
+    )
+    assert response.status_code == 200
+    assert len(response.json()["materiais"]) == 1
+
+
+def test_bulk_materiais_com_chave(client: TestClient):
+    payload = [{"nome": "Areia", "precoUnitario": 10.0}, {"nome": "Brita", "precoUnitario": 20.0}]
+    headers = {"Idempotency-Key": "bulk-1"}
+    primeira = client.post("/materiais/bulk", json=payload, headers=headers)
+    segunda = client.post("/materiais/bulk", json=payload, headers=headers)
+
+    assert primeira.status_code == segunda.status_code == 201
+    assert [m["nome"] for m in segunda.json()] == ["Areia", "Brita"]
+    assert len(client.get("/materiais/").json()) == 2
+
+
+def test_reserva_abandonada_expira(client: TestClient, db_session):
+    """Testa que uma reserva sem resposta (processo morreu) é assumida depois de expirar"""
+    headers = {"Idempotency-Key": "abandonada"}
+    corpo = ManutencaoCreate(resumo="Trocar lâmpada").model_dump_json()
+    fingerprint = idempotencia._fingerprint("POST /manutencao/", corpo)
+    registro = IdempotenciaChave(chave="abandonada", fingerprint=fingerprint, expira_em=datetime.now(timezone.utc))
+    db_session.add(registro)
+    db_session.commit()
+
+    registro.expira_em = datetime.now(timezone.utc) + timedelta(seconds=30)
+    db_session.commit()
+    assert client.post("/manutencao/", json={"resumo": "Trocar lâmpada"}, headers=headers).status_code == 409
+
+    registro.expira_em = datetime.now(timezone.utc) - timedelta(seconds=1)
+    db_session.commit()
+    # a requisição divide a sessão com o teste; a linha removida não pode ficar no identity map
+    db_session.expunge(registro)
+    response = client.post("/manutencao/", json={"resumo": "Trocar lâmpada"}, headers=headers)
+    assert response.status_code == 201
+    assert client.post("/manutencao/", json={"resumo": "Trocar lâmpada"}, headers=headers).json() == response.json()
+
+
+def test_reserva_repete_insert_se_a_chave_em_conflito_sumiu(db_session, monkeypatch):
+    """Testa que, se a linha em conflito some antes do SELECT, a reserva é refeita em vez de assumida"""
+    db_session.add(IdempotenciaChave(chave="k", fingerprint="outra", expira_em=datetime.now(timezone.utc)))
+    db_session.commit()
+    rollback = db_session.rollback
+    removida = []
+
+    def rollback_e_remover():
+        rollback()
+        if not removida:
+            db_session.execute(delete(IdempotenciaChave).where(IdempotenciaChave.chave == "k"))
+            db_session.commit()
+            removida.append(True)
+
+    monkeypatch.setattr(db_session, "rollback", rollback_e_remover)
+    # a linha ainda não expirou para o DELETE da reserva, só some depois do conflito
+    db_session.execute(
+        IdempotenciaChave.__table__.update().values(expira_em=datetime.now(timezone.utc) + timedelta(minutes=1))
+    )
+    db_session.commit()
+
+    assert idempotencia._reservar(db_session, "k", "fp") is None
+    assert db_session.scalar(select(IdempotenciaChave.fingerprint).where(IdempotenciaChave.chave == "k")) == "fp"
+
+
+class _UmaVolta(threading.Event):
+    """Deixa o loop do worker rodar uma única iteração"""
+
+    def __init__(self):
+        super().__init__()
+        self.voltas = 0
+
+    def is_set(self) -> bool:
+        self.voltas += 1
+        return self.voltas > 1
+
+
+def test_worker_remove_chaves_expiradas(db_session, monkeypatch):
+    """Testa que o dispatcher do outbox remove as chaves expiradas de todos os tenants"""
+    agora = datetime.now(timezone.utc)
+    db_session.add_all([
+        IdempotenciaChave(chave="velha", fingerprint="x", expira_em=agora - timedelta(hours=1)),
+        IdempotenciaChave(chave="velha-t2", fingerprint="x", expira_em=agora - timedelta(hours=1), tenant_id=2),
+        IdempotenciaChave(chave="valida", fingerprint="x", expira_em=agora + timedelta(hours=1)),
+    ])
+    db_session.commit()
+    monkeypatch.setattr(settings, "OUTBOX_INTERVALO", 0)
+    monkeypatch.setattr(outbox_worker, "init_engine", lambda: None)
+    monkeypatch.setattr(outbox_worker, "SessionLocal", lambda: nullcontext(db_session))
+
+    outbox_worker.run(_UmaVolta(), sink=outbox.MemorySink())
+
+    chaves = db_session.scalars(select(IdempotenciaChave.chave).execution_options(todos_tenants=True)).all()
+    assert chaves == ["valida"]
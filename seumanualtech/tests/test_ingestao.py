@@ -0,0 +1,158 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import func, select
+from sqlalchemy.exc import IntegrityError
+
+from app.config import settings
+from app.models.manutencao_material import ManutencaoMaterial
+from app.schemas.material import MaterialConsumoCreate
+from app.services import ingestao
+from app.services.ingestao import BufferCheio, Ingestao
+
+
+def _manutencao(client: TestClient, status: str = "aberto") -> int:
+    return client.post("/manutencao/", json={"resumo": "Dispenser", "status": status}).json()["id"]
+
+
+def _material(client: TestClient, nome: str, estoque: float | None = None) -> int:
+    return client.post(
+        "/materiais/", json={"nome": nome, "precoUnitario": 2.5, "estoque": estoque}
+    ).json()["id"]
+
+
+def _consumos(db_session) -> int:
+    return db_session.scalar(select(func.count()).select_from(ManutencaoMaterial))
+
+
+def test_ingestao_pela_rota_grava_em_lote(client: TestClient, db_session, monkeypatch, tmp_path):
+    """Testa ack 202 antes da gravação e o lote gravado no flush"""
+    monkeypatch.setattr(settings, "INGESTAO_ENABLED", True)
+    monkeypatch.setattr(settings, "INGESTAO_DIRETORIO", str(tmp_path))
+    manutencao_id = _manutencao(client)
+    material_id = _material(client, "Graxa")
+    try:
+        for _ in range(3):
+            response = client.post(
+                f"/manutencao/{manutencao_id}/materiais/ingestao", json={"materialId": material_id, "quantidade": 2}
+            )
+            assert response.status_code == 202
+        assert response.json() == {"sequencia": 3, "pendentes": 3}
+        assert _consumos(db_session) == 0
+
+        assert ingestao.get_ingestao().flush(db_session) == 3
+    finally:
+        ingestao.stop_ingestao()
+
+    data = client.get(f"/manutencao/{manutencao_id}").json()
+    assert len(data["materiais"]) == 3
+    assert data["custoTotalMateriais"] == 15.0
+    assert list(tmp_path.glob("lote-*")) == []
+
+
+def test_ingestao_rejeita_manutencao_finalizada(client: TestClient, monkeypatch, tmp_path):
+    """Testa que a regra de manutenção finalizada vale já no aceite"""
+    monkeypatch.setattr(settings, "INGESTAO_ENABLED", True)
+    monkeypatch.setattr(settings, "INGESTAO_DIRETORIO", str(tmp_path))
+    manutencao_id = _manutencao(client, "finalizado")
+    material_id = _material(client, "Graxa")
+    try:
+        response = client.post(
+            f"/manutencao/{manutencao_id}/materiais/ingestao", json={"materialId": material_id, "quantidade": 1}
+        )
+    finally:
+        ingestao.stop_ingestao()
+    assert response.status_code == 400
+    assert "finalizada" in response.json()["detail"]
+
+
+def test_flush_descarta_finalizadas_e_sem_estoque(client: TestClient, db_session, tmp_path):
+    """Testa a revalidação no flush: manutenção finalizada depois do aceite e estoque esgotado"""
+    fila = Ingestao(str(tmp_path), buffer_max=100, lote=100, intervalo_ms=50)
+    aberta = _manutencao(client)
+    fechada = _manutencao(client)
+    material_id = _material(client, "Óleo", estoque=5)
+
+    for manutencao_id, quantidade in [(aberta, 2), (fechada, 1), (aberta, 2), (aberta, 2)]:
+        fila.aceitar(db_session, manutencao_id, MaterialConsumoCreate(material_id=material_id, quantidade=quantidade))
+    client.put(f"/manutencao/{fechada}", json={"resumo": "Dispenser", "status": "finalizado"})
+
+    assert fila.flush(db_session) == 2
+    assert fila.rejeitados == 2
+    assert client.get(f"/materiais/{material_id}").json()["estoque"] == 1.0
+    fila.stop()
+
+
+def test_buffer_limitado(client: TestClient, db_session, tmp_path):
+    """Testa que o buffer cheio recusa novos consumos"""
+    fila = Ingestao(str(tmp_path), buffer_max=2, lote=100, intervalo_ms=50)
+    manutencao_id = _manutencao(client)
+    consumo = MaterialConsumoCreate(material_id=_material(client, "Graxa"), quantidade=1)
+    fila.aceitar(db_session, manutencao_id, consumo)
+    fila.aceitar(db_session, manutencao_id, consumo)
+    with pytest.raises(BufferCheio):
+        fila.aceitar(db_session, manutencao_id, consumo)
+    fila.stop()
+
+
+def test_recupera_wal_orfao_sem_duplicar(client: TestClient, db_session, tmp_path):
+    """Testa a reaplicação de um WAL de processo morto e de um lote já gravado"""
+    manutencao_id = _manutencao(client)
+    material_id = _material(client, "Graxa")
+    item = {"tenant_id": 1, "manutencao_id": manutencao_id, "material_id": material_id, "quantidade": "1.0"}
+    (tmp_path / "wal-999999.jsonl").write_text(json.dumps(item) + "\n" + json.dumps(item)[:10])
+
+    fila = Ingestao(str(tmp_path), buffer_max=100, lote=100, intervalo_ms=50)
+    assert fila.recuperar(db_session) == 1
+
+    # crash entre o commit e a remoção do segmento: o lote não é reaplicado
+    fila.aceitar(db_session, manutencao_id, MaterialConsumoCreate(material_id=material_id, quantidade=1))
+    fila._rotacionar()
+    lote_id, _ = fila._pendentes[0]
+    segmento = tmp_path / f"lote-{lote_id}.jsonl"
+    conteudo = segmento.read_bytes()
+    fila.flush(db_session)
+    segmento.write_bytes(conteudo)
+
+    assert fila.recuperar(db_session) == 0
+    assert _consumos(db_session) == 2
+    assert not segmento.exists()
+    fila.stop()
+
+
+def test_lote_envenenado_vai_para_arquivo_morto(client: TestClient, db_session, tmp_path):
+    """Testa que um lote que o banco recusa não bloqueia os seguintes"""
+    manutencao_id = _manutencao(client)
+    material_id = _material(client, "Graxa")
+    ruim = {"tenant_id": 1, "manutencao_id": manutencao_id, "material_id": material_id, "quantidade": "abc"}
+    (tmp_path / "lote-0ruim.jsonl").write_text(json.dumps(ruim) + "\n")
+
+    fila = Ingestao(str(tmp_path), buffer_max=100, lote=100, intervalo_ms=50, max_tentativas=2)
+    assert fila.recuperar(db_session) == 0
+    fila.aceitar(db_session, manutencao_id, MaterialConsumoCreate(material_id=material_id, quantidade=1))
+
+    assert fila.flush(db_session) == 1
+    assert fila.pendentes == 0
+    assert (tmp_path / "morto-0ruim.jsonl").exists()
+    assert not (tmp_path / "lote-0ruim.jsonl").exists()
+    assert _consumos(db_session) == 1
+    fila.stop()
+
+
+def test_integrity_error_sem_marcador_mantem_segmento(client: TestClient, db_session, tmp_path, monkeypatch):
+    """Testa que um IntegrityError de outra origem não apaga consumos já confirmados"""
+    manutencao_id = _manutencao(client)
+    material_id = _material(client, "Graxa")
+    fila = Ingestao(str(tmp_path), buffer_max=100, lote=100, intervalo_ms=50)
+    fila.aceitar(db_session, manutencao_id, MaterialConsumoCreate(material_id=material_id, quantidade=1))
+
+    def violar(db, itens):
+        raise IntegrityError("INSERT", {}, Exception("CHECK constraint failed"))
+
+    monkeypatch.setattr(fila, "_gravar_itens", violar)
+    with pytest.raises(IntegrityError):
+        fila.flush(db_session)
+    assert fila.pendentes == 1
+    assert len(list(tmp_path.glob("lote-*.jsonl"))) == 1
+    fila.stop()
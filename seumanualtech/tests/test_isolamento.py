@@ -0,0 +1,17 @@
+from sqlalchemy import func, select
+
+from app.models.material import Material
+from tests.util import sessao_transacional
+
+
+def test_commit_do_teste_e_desfeito(engine):
+    """Testa que commits e rollbacks dentro do teste não vazam para o próximo"""
+    with sessao_transacional(engine) as session:
+        session.add(Material(nome="Cimento", preco_unitario=50.0))
+        session.commit()
+        session.add(Material(nome="Areia", preco_unitario=10.0))
+        session.rollback()
+        assert session.scalar(select(func.count()).select_from(Material)) == 1
+
+    with engine.connect() as conn:
+        assert conn.scalar(select(func.count()).select_from(Material.__table__)) == 0
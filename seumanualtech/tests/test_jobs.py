@@ -0,0 +1,116 @@
+from fastapi.testclient import TestClient
+from sqlalchemy import event, update
+
+from app.config import settings
+from app.models.job import Job
+from app.services import jobs
+from app.services.eventos import broadcaster
+from tests.util import T2
+
+
+def test_bulk_async_de_materiais(client: TestClient, db_session, monkeypatch):
+    """Testa enfileirar, executar em blocos e consultar o progresso"""
+    monkeypatch.setattr(settings, "JOBS_BLOCO", 2)
+    client.post("/materiais/", json={"nome": "Material 1", "precoUnitario": 1.0})
+    payload = [{"nome": f"Material {i}", "precoUnitario": 1.0 + i} for i in range(5)]
+
+    response = client.post("/materiais/bulk/async", json=payload)
+    assert response.status_code == 202
+    job = response.json()
+    assert job["status"] == "pendente"
+    assert job["total"] == 5
+
+    assert jobs.executar_proximo(db_session).id == job["id"]
+
+    data = client.get(f"/jobs/{job['id']}").json()
+    assert data["status"] == "concluido"
+    assert data["progresso"] == 5
+    assert data["resultado"] == {"criados": 4, "ignorados": 1}
+    assert len(client.get("/materiais/").json()) == 5
+
+
+def test_job_retoma_do_ultimo_bloco(client: TestClient, db_session, monkeypatch):
+    """Testa que um job interrompido continua a partir do progresso gravado"""
+    monkeypatch.setattr(settings, "JOBS_BLOCO", 2)
+    payload = [{"resumo": f"Manutenção {i}"} for i in range(5)]
+    job_id = client.post("/manutencao/bulk/async", json=payload).json()["id"]
+
+    job = jobs.reservar(db_session)
+    job.progresso = 2
+    db_session.commit()
+    jobs.executar(db_session, job)
+
+    assert client.get(f"/jobs/{job_id}").json()["progresso"] == 5
+    assert sorted(m["resumo"] for m in client.get("/manutencao/").json()) == [f"Manutenção {i}" for i in range(2, 5)]
+
+
+def test_job_nao_rele_parametros_a_cada_bloco(client: TestClient, db_session, monkeypatch):
+    """Testa que os commits por bloco não recarregam o job (e o JSON de parâmetros)"""
+    monkeypatch.setattr(settings, "JOBS_BLOCO", 10)
+    client.post("/manutencao/bulk/async", json=[{"resumo": f"Manutenção {i}"} for i in range(100)])
+    job = jobs.reservar(db_session)
+    leituras = []
+
+    def capturar(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT") and "jobs.parametros" in statement:
+            leituras.append(statement)
+
+    engine = db_session.get_bind()
+    event.listen(engine, "before_cursor_execute", capturar)
+    try:
+        jobs.executar(db_session, job)
+    finally:
+        event.remove(engine, "before_cursor_execute", capturar)
+
+    assert leituras == []
+    assert db_session.get(Job, job.id).progresso == 100
+
+
+def test_job_inexistente(client: TestClient, db_session):
+    assert client.get("/jobs/999").status_code == 404
+    assert jobs.executar_proximo(db_session) is None
+
+
+def test_job_de_outro_tenant_nao_visivel(client: TestClient, db_session):
+    job_id = client.post("/manutencao/bulk/async", json=[{"resumo": "A"}], headers=T2).json()["id"]
+    assert client.get(f"/jobs/{job_id}").status_code == 404
+
+    jobs.executar_proximo(db_session)
+    assert client.get("/manutencao/", headers=T2).json()[0]["resumo"] == "A"
+
+
+def test_reserva_disputada_fica_com_um_worker(client: TestClient, db_session, monkeypatch):
+    """Testa que dois workers que leram o mesmo job pendente não executam os dois"""
+    client.post("/manutencao/bulk/async", json=[{"resumo": "A"}])
+    visto = jobs._candidato(db_session)
+    db_session.rollback()
+    assert jobs.reservar(db_session).id == visto.id
+
+    # o segundo worker leu o job antes da reserva do primeiro
+    candidatos = iter([visto, None])
+    monkeypatch.setattr(jobs, "_candidato", lambda db: next(candidatos))
+    assert jobs.reservar(db_session) is None
+
+
+def test_worker_que_perdeu_a_reserva_descarta_o_bloco(client: TestClient, db_session, monkeypatch):
+    """Testa que, após outro worker assumir o job, o bloco em andamento não é gravado"""
+    job_id = client.post("/manutencao/bulk/async", json=[{"resumo": "A"}]).json()["id"]
+    job = jobs.reservar(db_session)
+    handler = jobs._handlers["manutencoes.create_bulk"]
+
+    def assumido_durante_o_bloco(db, job, bloco):
+        # heartbeat expirou e outro worker reservou o job no meio do bloco
+        db.execute(update(Job).where(Job.id == job_id).values(tentativas=Job.tentativas + 1))
+        return handler(db, job, bloco)
+
+    monkeypatch.setitem(jobs._handlers, "manutencoes.create_bulk", assumido_durante_o_bloco)
+    jobs.executar(db_session, job)
+
+    assert client.get("/manutencao/").json() == []
+    assert client.get(f"/jobs/{job_id}").json()["status"] == "executando"
+
+
+def test_bulk_async_publica_eventos(client: TestClient, db_session):
+    client.post("/materiais/bulk/async", json=[{"nome": "Cimento", "precoUnitario": 1.0}])
+    jobs.executar_proximo(db_session)
+    assert [e["tipo"] for e in broadcaster.desde(0)] == ["material.criado"]
@@ -0,0 +1,28 @@
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from app.database.core import Base
+from benchmarks.memoria_listagem import medir, pagina_compacta, pagina_orm, popular
+
+
+def _normalizar(pagina):
+    # o relacionamento ORM não define ordem para os consumos
+    return [
+        (m.id, m.custo_total_materiais, sorted((c.id, c.quantidade, c.custo) for c in m.materiais))
+        for m in pagina
+    ]
+
+
+def test_listagem_compacta_igual_ao_orm_e_aloca_menos():
+    """Testa que o caminho somente leitura gera a mesma página com menos memória"""
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        popular(session, manutencoes=200, materiais=20, por_manutencao=4)
+
+    with Session(engine) as session:
+        assert _normalizar(pagina_compacta(session, 200)) == _normalizar(pagina_orm(session, 200))
+
+    assert medir(engine, pagina_compacta, 200) < medir(engine, pagina_orm, 200)
+    engine.dispose()
@@ -1,5 +1,10 @@
+from types import SimpleNamespace
+
 import pytest
 from fastapi.testclient import TestClient
+from sqlalchemy.exc import IntegrityError
+
+from app.services import material as material_service
 
 
 def test_create_material(client: TestClient):
@@ -29,6 +34,47 @@ def test_create_material_duplicate_name(client: TestClient):
     assert "Já existe um material" in response.json()["detail"]
 
 
+@pytest.mark.parametrize("variante", ["cimento", "  CIMENTO ", "Cimênto", "Ci\u0301mento"])
+def test_create_material_nome_normalizado_duplicado(client: TestClient, variante: str):
+    """Testa que acentos, maiúsculas e espaços não driblam a unicidade do nome"""
+    client.post("/materiais/", json={"nome": "Címento", "precoUnitario": 50.0})
+
+    response = client.post("/materiais/", json={"nome": variante, "precoUnitario": 60.0})
+    assert response.status_code == 400
+    assert client.get("/materiais/").json()[0]["precoUnitario"] == 50.0
+
+
+def test_update_material_para_nome_existente(client: TestClient):
+    """Testa que renomear para um nome já usado retorna 400 e mantém a sessão utilizável"""
+    client.post("/materiais/", json={"nome": "Areia Fina", "precoUnitario": 10.0})
+    brita = client.post("/materiais/", json={"nome": "Brita", "precoUnitario": 20.0}).json()
+
+    response = client.put(f"/materiais/{brita['id']}", json={"nome": "areia  fina", "precoUnitario": 20.0})
+    assert response.status_code == 400
+    assert "Já existe outro material" in response.json()["detail"]
+
+    response = client.put(f"/materiais/{brita['id']}", json={"nome": "BRITA", "precoUnitario": 21.0})
+    assert response.status_code == 200
+    assert response.json()["nome"] == "BRITA"
+
+
+def test_nome_duplicado_so_para_o_indice_de_nome():
+    """Testa que só a violação do índice único de nome vira 'Já existe um material'"""
+    def erro(orig):
+        return IntegrityError("INSERT ...", {}, orig)
+
+    sqlite = Exception("UNIQUE constraint failed: materiais.tenant_id, materiais.nome_normalizado")
+    postgres = Exception("duplicate key value")
+    postgres.diag = SimpleNamespace(constraint_name="ux_materiais_tenant_nome_normalizado")
+    outra = Exception("violates foreign key constraint")
+    outra.diag = SimpleNamespace(constraint_name="materiais_tenant_id_fkey")
+
+    assert material_service.nome_duplicado(erro(sqlite))
+    assert material_service.nome_duplicado(erro(postgres))
+    assert not material_service.nome_duplicado(erro(outra))
+    assert not material_service.nome_duplicado(erro(Exception("NOT NULL constraint failed: materiais.nome")))
+
+
 def test_create_material_invalid_price(client: TestClient):
     """Testa validação de preço negativo ou zero"""
     response = client.post(
@@ -75,3 +121,27 @@ def test_get_material_not_found(client: TestClient):
     """Testa busca de material inexistente"""
     response = client.get("/materiais/999")
     assert response.status_code == 404
+
+
+def test_buscar_materiais_por_ids(client: TestClient):
+    """Testa a busca em lote por ids preservando a ordem e reportando faltantes"""
+    ids = [
+        client.post("/materiais/", json={"nome": nome, "precoUnitario": 10.0}).json()["id"]
+        for nome in ["Cimento", "Areia", "Brita"]
+    ]
+
+    response = client.get(f"/materiais/?ids={ids[2]},999,{ids[0]}")
+    assert response.status_code == 200
+    assert [m["nome"] for m in response.json()] == ["Brita", "Cimento"]
+    assert response.headers["X-Ids-Nao-Encontrados"] == "999"
+
+    response = client.post("/materiais/busca", json={"ids": [ids[1], 998, ids[1], ids[0]]})
+    assert response.status_code == 200
+    data = response.json()
+    assert [m["nome"] for m in data["materiais"]] == ["Areia", "Cimento"]
+    assert data["naoEncontrados"] == [998]
+
+
+def test_buscar_materiais_ids_invalidos(client: TestClient):
+    response = client.get("/materiais/?ids=1,abc")
+    assert response.status_code == 400
@@ -0,0 +1,102 @@
+import io
+import logging
+
+import pytest
+import sqlalchemy as sa
+from alembic.migration import MigrationContext
+from alembic.operations import Operations
+from sqlalchemy.pool import StaticPool
+
+from app.database.core import Base
+from app.database.migracoes import alterar_tabela, backfill, criar_indice, exigir_not_null
+from app.models.material import normalizar_nome
+
+itens = sa.Table(
+    "itens", sa.MetaData(),
+    sa.Column("id", sa.Integer, primary_key=True),
+    sa.Column("nome", sa.String(50)),
+    sa.Column("nome_normalizado", sa.String(50), nullable=True),
+)
+
+
+@pytest.fixture
+def migracao():
+    """Conexão SQLite com o `op` do alembic ativo, como dentro de uma migration."""
+    engine = sa.create_engine("sqlite://", poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    itens.metadata.create_all(engine)
+    with engine.connect() as conn:
+        with Operations.context(MigrationContext.configure(conn)):
+            yield conn
+    engine.dispose()
+
+
+def test_backfill_em_lotes_e_retomavel(migracao, caplog):
+    """Testa o backfill por lotes com commit por lote, progresso e retomada"""
+    migracao.execute(sa.insert(itens), [{"id": i, "nome": f"Material {i}"} for i in range(1, 26)])
+    migracao.commit()
+
+    with caplog.at_level(logging.INFO, logger="app.migracoes"):
+        atualizadas = backfill(
+            itens,
+            lambda linha: {"nome_normalizado": normalizar_nome(linha.nome)},
+            pendente=itens.c.nome_normalizado.is_(None),
+            lote=10,
+            colunas=[itens.c.nome],
+        )
+
+    assert atualizadas == 25
+    assert "backfill itens: 25/25 linhas" in caplog.text
+    assert migracao.scalar(sa.select(itens.c.nome_normalizado).where(itens.c.id == 7)) == "material 7"
+
+    # retomada: só o que ainda está pendente é processado
+    migracao.execute(itens.update().where(itens.c.id > 20).values(nome_normalizado=None))
+    migracao.commit()
+    assert backfill(
+        itens, {"nome_normalizado": sa.func.lower(itens.c.nome)},
+        pendente=itens.c.nome_normalizado.is_(None), lote=2,
+    ) == 5
+    assert backfill(
+        itens, {"nome_normalizado": "-"}, pendente=itens.c.nome_normalizado.is_(None)
+    ) == 0
+
+
+def test_alterar_tabela_preserva_triggers_da_busca(migracao):
+    """Testa que a recriação da tabela pelo batch do SQLite mantém os triggers do FTS"""
+    with alterar_tabela("manutencoes", recreate="always") as batch_op:
+        batch_op.add_column(sa.Column("observacao", sa.String(50), nullable=True))
+    criar_indice("ix_manutencoes_observacao", "manutencoes", ["observacao"])
+    criar_indice("ix_manutencoes_observacao", "manutencoes", ["observacao"])
+    exigir_not_null("manutencoes", "tenant_id", sa.Integer())
+
+    migracao.execute(
+        sa.text("INSERT INTO manutencoes (resumo, status, tenant_id) VALUES ('Trocar paredes', 'aberto', 1)")
+    )
+    encontradas = migracao.scalar(
+        sa.text("SELECT count(*) FROM manutencoes_fts WHERE manutencoes_fts MATCH 'paredes'")
+    )
+    assert encontradas == 1
+    indices = dict(migracao.execute(sa.text(
+        "SELECT name, sql FROM sqlite_master WHERE type = 'index' AND tbl_name = 'manutencoes'"
+    )).all())
+    assert "ix_manutencoes_observacao" in indices
+    # índice de expressão, que o batch não reflete
+    assert indices["ix_manutencoes_tenant_alterado_em"].endswith("(tenant_id, coalesce(atualizado_em, criado_em))")
+
+
+def test_exigir_not_null_postgres_sem_transacao_longa():
+    """Testa que, no Postgres, os passos do NOT NULL rodam fora da transação da migration"""
+    saida = io.StringIO()
+    contexto = MigrationContext.configure(
+        dialect_name="postgresql", opts={"as_sql": True, "output_buffer": saida, "transactional_ddl": True}
+    )
+    with Operations.context(contexto), contexto.begin_transaction():
+        exigir_not_null("itens", "nome", sa.String(50))
+
+    comandos = [c.strip() for c in saida.getvalue().split(";") if c.strip()]
+    inicio = comandos.index("COMMIT")
+    assert comandos[inicio + 1].endswith("NOT VALID")
+    assert comandos[inicio + 2].startswith('ALTER TABLE "itens" VALIDATE CONSTRAINT')
+    assert comandos[inicio + 3] == "ALTER TABLE itens ALTER COLUMN nome SET NOT NULL"
+    assert comandos[inicio + 4].startswith('ALTER TABLE "itens" DROP CONSTRAINT')
+    assert comandos[inicio + 5] == "BEGIN"
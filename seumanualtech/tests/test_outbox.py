@@ -0,0 +1,110 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import select, update
+
+from app.config import settings
+from app.models.outbox import OutboxEvento
+from app.services import outbox
+
+
+class FalhaSink:
+    def send(self, eventos):
+        raise ConnectionError("ERP fora do ar")
+
+
+class RejeitaSink(outbox.MemorySink):
+    """Rejeita o lote inteiro se ele contém o evento `rejeitado`"""
+
+    def __init__(self, rejeitado: int):
+        super().__init__()
+        self.rejeitado = rejeitado
+
+    def send(self, eventos):
+        if any(evento["id"] == self.rejeitado for evento in eventos):
+            raise ValueError("evento inválido")
+        super().send(eventos)
+
+
+def _adicionar_consumo(client: TestClient) -> int:
+    manutencao_id = client.post("/manutencao/", json={"resumo": "Reparar piso"}).json()["id"]
+    material_id = client.post("/materiais/", json={"nome": "Piso", "precoUnitario": 45.5}).json()["id"]
+    client.post(f"/manutencao/{manutencao_id}/materiais", json={"materialId": material_id, "quantidade": 3})
+    return manutencao_id
+
+
+def test_consumo_grava_evento_no_outbox(client: TestClient, db_session):
+    """Testa que o consumo grava o evento de outbox na mesma transação"""
+    manutencao_id = _adicionar_consumo(client)
+
+    eventos = list(db_session.scalars(select(OutboxEvento)).all())
+    assert len(eventos) == 1
+    assert eventos[0].tipo == "manutencao.material_adicionado"
+    assert eventos[0].payload["manutencao_id"] == manutencao_id
+    assert eventos[0].payload["preco_unitario"] == "45.50"
+    assert eventos[0].entregue_em is None
+
+
+def test_consumo_rejeitado_nao_grava_outbox(client: TestClient, db_session):
+    manutencao_id = client.post("/manutencao/", json={"resumo": "X", "status": "finalizado"}).json()["id"]
+    material_id = client.post("/materiais/", json={"nome": "Piso", "precoUnitario": 45.5}).json()["id"]
+    response = client.post(f"/manutencao/{manutencao_id}/materiais", json={"materialId": material_id, "quantidade": 1})
+
+    assert response.status_code == 400
+    assert db_session.scalars(select(OutboxEvento)).all() == []
+
+
+def test_dispatch_entrega_lote(client: TestClient, db_session):
+    """Testa que o dispatcher entrega e marca os eventos"""
+    _adicionar_consumo(client)
+    sink = outbox.MemorySink()
+
+    assert outbox.dispatch_lote(db_session, sink) == 1
+    assert sink.entregues[0]["tipo"] == "manutencao.material_adicionado"
+    assert outbox.dispatch_lote(db_session, sink) == 0
+    assert db_session.scalar(select(OutboxEvento)).entregue_em is not None
+
+
+def test_dispatch_reagenda_com_backoff(client: TestClient, db_session):
+    """Testa que falhas no sink reagendam o lote com backoff"""
+    _adicionar_consumo(client)
+
+    assert outbox.dispatch_lote(db_session, FalhaSink()) == 0
+
+    evento = db_session.scalar(select(OutboxEvento))
+    assert evento.tentativas == 1
+    assert evento.proxima_tentativa_em is not None
+    assert "ERP fora do ar" in evento.ultimo_erro
+    # Ainda dentro da janela de backoff
+    assert outbox.dispatch_lote(db_session, outbox.MemorySink()) == 0
+
+
+@pytest.mark.parametrize("tentativas,esperado", [(1, 2), (3, 8), (20, 300), (5000, 300)])
+def test_backoff_exponencial_limitado(tentativas, esperado):
+    assert outbox._backoff(tentativas).total_seconds() == esperado
+
+
+def test_evento_rejeitado_nao_trava_os_demais(db_session, monkeypatch):
+    """Testa que, depois de uma falha, os eventos vão um a um e o rejeitado é descartado no limite"""
+    monkeypatch.setattr(settings, "OUTBOX_MAX_TENTATIVAS", 2)
+    eventos = [outbox.registrar(db_session, "teste", {"n": n}) for n in range(3)]
+    db_session.commit()
+    ids = [evento.id for evento in eventos]
+    sink = RejeitaSink(rejeitado=ids[1])
+
+    def vencer_backoff():
+        db_session.execute(update(OutboxEvento).values(proxima_tentativa_em=None))
+        db_session.commit()
+
+    assert outbox.dispatch_lote(db_session, sink) == 0
+    vencer_backoff()
+    assert outbox.dispatch_lote(db_session, sink) == 1
+    assert outbox.dispatch_lote(db_session, sink) == 0
+    assert outbox.dispatch_lote(db_session, sink) == 1
+    vencer_backoff()
+    assert outbox.dispatch_lote(db_session, sink) == 0
+
+    assert [evento["id"] for evento in sink.entregues] == [ids[0], ids[2]]
+    rejeitado = db_session.get(OutboxEvento, ids[1])
+    assert rejeitado.tentativas == 2
+    assert rejeitado.descartado_em is not None
+    assert rejeitado.entregue_em is None
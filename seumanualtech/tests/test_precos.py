@@ -0,0 +1,85 @@
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+
+from app.models.material_preco_historico import MaterialPrecoHistorico
+from app.services.eventos import broadcaster
+
+
+def _criar(client: TestClient, nome: str, preco: float) -> int:
+    return client.post("/materiais/", json={"nome": nome, "precoUnitario": preco}).json()["id"]
+
+
+def test_atualizar_precos_por_tabela(client: TestClient, db_session):
+    """Testa a tabela de preços por id e por nome com registro de histórico"""
+    cimento = _criar(client, "Cimento CP-II", 40.0)
+    areia = _criar(client, "Areia", 10.0)
+    brita = _criar(client, "Brita", 20.0)
+
+    response = client.post("/materiais/precos", json={"itens": [
+        {"id": cimento, "precoUnitario": 42.5},
+        {"nome": "Areia", "precoUnitario": 11.0},
+        {"id": brita, "precoUnitario": 20.0},
+        {"id": 999, "precoUnitario": 1.0},
+        {"nome": "Inexistente", "precoUnitario": 1.0},
+    ]})
+
+    assert response.status_code == 200
+    assert response.json() == {"atualizados": 2, "naoEncontrados": [999, "Inexistente"]}
+    assert client.get(f"/materiais/{cimento}").json()["precoUnitario"] == 42.5
+    assert client.get(f"/materiais/{areia}").json()["precoUnitario"] == 11.0
+
+    historico = db_session.scalars(select(MaterialPrecoHistorico).order_by(MaterialPrecoHistorico.material_id)).all()
+    assert [(h.material_id, float(h.preco_anterior), float(h.preco_novo)) for h in historico] == [
+        (cimento, 40.0, 42.5),
+        (areia, 10.0, 11.0),
+    ]
+
+
+def test_reajuste_percentual_filtrado(client: TestClient):
+    """Testa reajuste de +7% apenas nos materiais filtrados por nome"""
+    cimento = _criar(client, "Cimento CP-II", 40.0)
+    cimento_branco = _criar(client, "Cimento Branco", 55.55)
+    areia = _criar(client, "Areia", 10.0)
+
+    response = client.post("/materiais/precos", json={"percentual": 7, "filtroNome": "cimento"})
+
+    assert response.json()["atualizados"] == 2
+    assert client.get(f"/materiais/{cimento}").json()["precoUnitario"] == 42.8
+    assert client.get(f"/materiais/{cimento_branco}").json()["precoUnitario"] == 59.44
+    assert client.get(f"/materiais/{areia}").json()["precoUnitario"] == 10.0
+
+
+def test_atualizacao_precos_invalida(client: TestClient):
+    assert client.post("/materiais/precos", json={}).status_code == 422
+    assert client.post("/materiais/precos", json={"itens": [{"precoUnitario": 1.0}]}).status_code == 422
+
+
+def test_tabela_por_nome_normalizado_publica_por_material(client: TestClient):
+    """Testa o casamento pelo nome normalizado e um evento por material alterado"""
+    cimento = _criar(client, "Cimento CP-II", 40.0)
+    areia = _criar(client, "Areia Média", 10.0)
+    broadcaster.clear()
+
+    response = client.post("/materiais/precos", json={"itens": [
+        {"nome": "  cimento   cp-ii", "precoUnitario": 42.5},
+        {"nome": "AREIA MEDIA", "precoUnitario": 10.0},
+        {"nome": "Areia Fina", "precoUnitario": 9.0},
+    ]})
+
+    assert response.json() == {"atualizados": 1, "naoEncontrados": ["Areia Fina"]}
+    assert [(e["tipo"], e["entidade_id"], e["dados"]) for e in broadcaster.desde(0)] == [
+        ("material.preco_atualizado", cimento, {"preco_unitario": "42.50"}),
+    ]
+    assert client.get(f"/materiais/{areia}").json()["precoUnitario"] == 10.0
+
+
+def test_reajuste_que_zeraria_preco_e_recusado(client: TestClient):
+    """Testa que um reajuste que arredonda algum preço para 0,00 não é aplicado"""
+    barato = _criar(client, "Prego", 0.01)
+    caro = _criar(client, "Martelo", 30.0)
+
+    response = client.post("/materiais/precos", json={"percentual": -99.9})
+
+    assert response.status_code == 400
+    assert client.get(f"/materiais/{barato}").json()["precoUnitario"] == 0.01
+    assert client.get(f"/materiais/{caro}").json()["precoUnitario"] == 30.0
@@ -0,0 +1,120 @@
+import threading
+import uuid
+
+import pytest
+
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.services import rate_limit
+from tests.util import T1, T2
+
+
+def test_normalizar_caminho():
+    assert rate_limit.normalizar_caminho("/manutencao/12/materiais") == "/manutencao/{id}/materiais"
+    assert rate_limit.normalizar_caminho("/materiais/bulk") == "/materiais/bulk"
+
+
+def test_token_bucket_retorna_429_com_retry_after(client: TestClient, monkeypatch):
+    """Testa que, esgotada a rajada, a rota responde 429 com Retry-After"""
+    monkeypatch.setattr(settings, "RATE_LIMIT_ROTAS", {"GET /materiais/": {"taxa": 0.5, "rajada": 2}})
+
+    assert client.get("/materiais/").status_code == 200
+    assert client.get("/materiais/").status_code == 200
+    response = client.get("/materiais/")
+
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "2"
+
+
+def test_limite_por_cliente(client: TestClient, monkeypatch):
+    """Testa que cada cliente tem seu próprio bucket"""
+    monkeypatch.setattr(settings, "RATE_LIMIT_ROTAS", {"GET /materiais/": {"taxa": 0.1, "rajada": 1}})
+
+    assert client.get("/materiais/", headers=T1).status_code == 200
+    assert client.get("/materiais/", headers=T1).status_code == 429
+    assert client.get("/materiais/", headers=T2).status_code == 200
+
+
+def test_limite_por_api_key_do_mesmo_tenant(client: TestClient, monkeypatch):
+    """Testa que duas API keys do mesmo tenant não dividem o bucket"""
+    monkeypatch.setattr(settings, "TENANT_API_KEYS", {**settings.TENANT_API_KEYS, "chave-tenant-1b": 1})
+    monkeypatch.setattr(settings, "RATE_LIMIT_ROTAS", {"GET /materiais/": {"taxa": 0.1, "rajada": 1}})
+    outra_chave = {"X-API-Key": "chave-tenant-1b"}
+
+    assert client.get("/materiais/", headers=T1).status_code == 200
+    assert client.get("/materiais/", headers=T1).status_code == 429
+    assert client.get("/materiais/", headers=outra_chave).status_code == 200
+    assert client.get("/materiais/", headers=outra_chave).status_code == 429
+
+
+def test_chave_nao_autenticada_nao_escapa_do_limite(client: TestClient, monkeypatch):
+    """Testa que uma API key inválida nova a cada requisição cai no bucket do IP"""
+    monkeypatch.setattr(settings, "RATE_LIMIT_ROTAS", {"GET /materiais/": {"taxa": 0.1, "rajada": 2}})
+
+    respostas = [
+        client.get("/materiais/", headers={"X-API-Key": uuid.uuid4().hex, "X-Client-Id": uuid.uuid4().hex})
+        for _ in range(3)
+    ]
+
+    assert [r.status_code for r in respostas] == [401, 401, 429]
+
+
+def test_health_isento(client: TestClient, monkeypatch):
+    monkeypatch.setattr(settings, "RATE_LIMIT_TAXA", 0.0)
+    monkeypatch.setattr(settings, "RATE_LIMIT_RAJADA", 0.0)
+    assert client.get("/health/live").status_code == 200
+    assert client.get("/materiais/").status_code == 429
+
+
+def test_limite_de_concorrencia():
+    """Testa que o backend em memória limita requisições simultâneas"""
+    backend = rate_limit.MemoryBackend()
+    limite = rate_limit.Limite(taxa=100, rajada=100, concorrencia=2)
+
+    assert backend.entrar("c", limite)
+    assert backend.entrar("c", limite)
+    assert not backend.entrar("c", limite)
+    backend.sair("c")
+    assert backend.entrar("c", limite)
+
+
+def test_token_bucket_thread_safe():
+    backend = rate_limit.MemoryBackend()
+    limite = rate_limit.Limite(taxa=0.001, rajada=50, concorrencia=1)
+    admitidas = []
+
+    def consumir():
+        for _ in range(20):
+            if backend.consumir("c", limite) == 0:
+                admitidas.append(1)
+
+    threads = [threading.Thread(target=consumir) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(admitidas) == 50
+
+
+def test_redis_backend():
+    """Testa o script Lua do token bucket e o contador de concorrência no Redis"""
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")
+    backend = rate_limit.RedisBackend(cliente=fakeredis.FakeRedis())
+    limite = rate_limit.Limite(taxa=0.01, rajada=2, concorrencia=1)
+
+    assert backend.consumir("c", limite) == 0
+    assert backend.consumir("c", limite) == 0
+    assert 90 < backend.consumir("c", limite) <= 100
+    assert backend.consumir("outro", limite) == 0
+
+    assert backend.entrar("c", limite)
+    assert not backend.entrar("c", limite)
+    backend.sair("c")
+    assert backend.entrar("c", limite)
+
+    backend.clear()
+    assert backend.consumir("c", limite) == 0
+    assert backend.entrar("c", limite)
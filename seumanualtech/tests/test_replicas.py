@@ -0,0 +1,70 @@
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from app.database.core import Base
+from app.database.replicas import ReplicaPool, RoutingSession
+from app.models.material import Material
+
+
+@pytest.fixture
+def bancos(tmp_path):
+    primario = create_engine(f"sqlite:///{tmp_path / 'primario.db'}")
+    replica = create_engine(f"sqlite:///{tmp_path / 'replica.db'}")
+    for engine, nome in ((primario, "Primario"), (replica, "Replica")):
+        Base.metadata.create_all(engine)
+        with sessionmaker(bind=engine)() as db:
+            db.add(Material(nome=nome, preco_unitario=1))
+            db.commit()
+    yield primario, replica
+    primario.dispose()
+    replica.dispose()
+
+
+def _nomes(db) -> list[str]:
+    return list(db.scalars(select(Material.nome).order_by(Material.id)))
+
+
+def test_leituras_vao_para_replica(bancos):
+    """Testa que sessões de leitura consultam a réplica"""
+    primario, replica = bancos
+    Sessao = sessionmaker(class_=RoutingSession, bind=primario, replicas=ReplicaPool([replica], 30))
+
+    with Sessao(usar_replica=True) as db:
+        assert _nomes(db) == ["Replica"]
+    with Sessao() as db:
+        assert _nomes(db) == ["Primario"]
+
+
+def test_leitura_apos_escrita_usa_primario(bancos):
+    """Testa que após uma escrita a sessão passa a ler do primário"""
+    primario, replica = bancos
+    Sessao = sessionmaker(class_=RoutingSession, bind=primario, replicas=ReplicaPool([replica], 30))
+
+    with Sessao(usar_replica=True) as db:
+        assert _nomes(db) == ["Replica"]
+        db.add(Material(nome="Novo", preco_unitario=2))
+        db.commit()
+        assert _nomes(db) == ["Primario", "Novo"]
+
+
+def test_replica_com_erro_e_ejetada(bancos, tmp_path):
+    """Testa a ejeção de réplicas com falha e o fallback para o primário"""
+    primario, replica = bancos
+    quebrada = create_engine(f"sqlite:///{tmp_path / 'inexistente' / 'replica.db'}")
+    pool = ReplicaPool([quebrada, replica], 30)
+    Sessao = sessionmaker(class_=RoutingSession, bind=primario, replicas=pool)
+
+    with Sessao(usar_replica=True) as db:
+        with pytest.raises(OperationalError):
+            _nomes(db)
+    assert pool.status()[0]["ejetada"]
+
+    for _ in range(3):
+        with Sessao(usar_replica=True) as db:
+            assert _nomes(db) == ["Replica"]
+
+    pool.ejetar(1)
+    with Sessao(usar_replica=True) as db:
+        assert _nomes(db) == ["Primario"]
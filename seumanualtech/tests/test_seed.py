@@ -0,0 +1,61 @@
+from datetime import datetime, timezone
+
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.pool import StaticPool
+
+from app.database.core import Base
+from app.models.enums import StatusManutencao
+from app.models.manutencao import Manutencao
+from app.models.manutencao_material import ManutencaoMaterial
+from app.models.material import Material
+from app.seed import popular
+
+AGORA = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def _carregar(seed: int, **kwargs):
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    contagem = popular(engine, materiais=200, manutencoes=3000, seed=seed, lote=1000, agora=AGORA, **kwargs)
+    return engine, contagem
+
+
+def test_popular_reprodutivel_e_distribuicoes():
+    """Testa contagens, reprodutibilidade por seed e as distribuições geradas"""
+    engine, contagem = _carregar(seed=7)
+    outro, _ = _carregar(seed=7)
+
+    with engine.connect() as conn, outro.connect() as conn_outro:
+        assert conn.scalar(select(func.count()).select_from(Manutencao)) == contagem["manutencoes"] == 3000
+        assert conn.scalar(select(func.count()).select_from(ManutencaoMaterial)) == contagem["consumos"]
+        assert 2.5 < contagem["consumos"] / 3000 < 3.5
+
+        consulta = select(Material.nome, Material.preco_unitario).order_by(Material.id)
+        assert conn.execute(consulta).all() == conn_outro.execute(consulta).all()
+
+        # lei de potência: o material mais usado aparece muito mais que a mediana
+        usos = conn.scalars(
+            select(func.count()).select_from(ManutencaoMaterial)
+            .group_by(ManutencaoMaterial.material_id).order_by(func.count().desc())
+        ).all()
+        assert usos[0] > 10 * usos[len(usos) // 2]
+
+        # manutenções antigas quase sempre finalizadas
+        abertas_antigas = conn.scalar(
+            select(func.count()).select_from(Manutencao)
+            .where(Manutencao.status == StatusManutencao.ABERTO, Manutencao.criado_em < datetime(2025, 6, 1))
+        )
+        assert abertas_antigas < 0.05 * contagem["manutencoes"]
+
+
+def test_popular_continua_ids_existentes():
+    """Testa que uma segunda carga não colide com os ids já existentes"""
+    engine, primeira = _carregar(seed=1)
+    segunda = popular(engine, materiais=50, manutencoes=100, seed=2, agora=AGORA)
+
+    with engine.connect() as conn:
+        assert conn.scalar(select(func.count()).select_from(Manutencao)) == 3100
+        assert conn.scalar(select(func.count()).select_from(Material)) == 250
+        assert conn.scalar(select(func.count()).select_from(ManutencaoMaterial)) == (
+            primeira["consumos"] + segunda["consumos"]
+        )
@@ -0,0 +1,66 @@
+import json
+import logging
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.database.slow_queries import get_recorder
+
+ADMIN = {"X-Admin-Token": "segredo"}
+
+
+@pytest.fixture
+def recorder(db_session, monkeypatch):
+    monkeypatch.setattr(settings, "SLOW_QUERY_ENABLED", True)
+    monkeypatch.setattr(settings, "SLOW_QUERY_LIMIAR_MS", 0.0)
+    monkeypatch.setattr(settings, "ADMIN_TOKEN", "segredo")
+    engine = db_session.get_bind()
+    recorder = get_recorder()
+    recorder.clear()
+    recorder.instalar(engine)
+    yield recorder
+    recorder.remover(engine)
+    recorder.clear()
+
+
+def test_registra_rota_plano_e_parametros_redigidos(client: TestClient, recorder, caplog):
+    """Testa o registro com rota de origem, EXPLAIN QUERY PLAN e parâmetros redigidos"""
+    client.post("/materiais/", json={"nome": "Cimento", "precoUnitario": 50.0})
+    recorder.clear()
+
+    with caplog.at_level(logging.WARNING, logger="app.slow_query"):
+        client.get("/materiais/", params={"nome": "Cim"})
+
+    response = client.get("/admin/slow-queries", headers=ADMIN)
+    assert response.status_code == 200
+    registro = next(r for r in response.json()["registros"] if "FROM materiais" in r["statement"])
+    assert registro["rota"] == "GET /materiais/"
+    assert registro["plano"] and any("materiais" in linha for linha in registro["plano"])
+    assert "%Cim%" not in json.dumps(registro["parametros"])
+    assert "<str>" in registro["parametros"]
+
+    logs = [json.loads(r.getMessage()) for r in caplog.records if r.name == "app.slow_query"]
+    assert any(log["evento"] == "slow_query" and log["rota"] == "GET /materiais/" for log in logs)
+
+
+def test_parametros_completos_e_limiar(client: TestClient, recorder, monkeypatch):
+    """Testa parâmetros sem redação e que consultas abaixo do limiar não são registradas"""
+    monkeypatch.setattr(settings, "SLOW_QUERY_REDIGIR_PARAMETROS", False)
+    client.get("/materiais/", params={"nome": "Areia"})
+    assert any("%Areia%" in json.dumps(r["parametros"]) for r in recorder.registros())
+
+    recorder.clear()
+    monkeypatch.setattr(settings, "SLOW_QUERY_LIMIAR_MS", 10_000.0)
+    client.get("/materiais/")
+    assert recorder.registros() == []
+
+
+def test_admin_exige_token(client: TestClient, recorder, monkeypatch):
+    """Testa que o endpoint administrativo exige o token configurado"""
+    assert client.get("/admin/slow-queries").status_code == 403
+    assert client.get("/admin/slow-queries", headers={"X-Admin-Token": "errado"}).status_code == 403
+    assert client.delete("/admin/slow-queries", headers=ADMIN).status_code == 204
+
+    monkeypatch.setattr(settings, "ADMIN_TOKEN", "")
+    assert client.get("/admin/slow-queries", headers={"X-Admin-Token": ""}).status_code == 403
@@ -0,0 +1,51 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+IMPORT_BUDGET_S = 5.0
+FIRST_RESPONSE_BUDGET_S = 2.0
+
+BENCHMARK = """
+import json, sys, time
+
+inicio = time.perf_counter()
+import app.main
+import_s = time.perf_counter() - inicio
+
+from app.config import get_settings
+from app.database import core
+adiado = core._engine is None and get_settings.cache_info().currsize == 0
+rotas_adiadas = "app.routes.manutencao" not in sys.modules
+
+from fastapi.testclient import TestClient
+inicio = time.perf_counter()
+with TestClient(app.main.app) as client:
+    status = client.get("/").status_code
+first_response_s = time.perf_counter() - inicio
+
+print(json.dumps({
+    "import_s": import_s, "first_response_s": first_response_s,
+    "adiado": adiado, "rotas_adiadas": rotas_adiadas, "status": status,
+}))
+"""
+
+
+def test_startup_benchmark(record_property):
+    """Mede em processo limpo o tempo de importação e até a primeira resposta"""
+    result = subprocess.run(
+        [sys.executable, "-c", BENCHMARK],
+        cwd=Path(__file__).resolve().parent.parent,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    data = json.loads(result.stdout.strip().splitlines()[-1])
+    record_property("import_s", round(data["import_s"], 4))
+    record_property("first_response_s", round(data["first_response_s"], 4))
+
+    assert data["adiado"], "Importar app.main não deve criar engine nem carregar Settings"
+    assert data["rotas_adiadas"], "Importar app.main não deve importar os routers"
+    assert data["status"] == 200
+    assert data["import_s"] < IMPORT_BUDGET_S
+    assert data["first_response_s"] < FIRST_RESPONSE_BUDGET_S
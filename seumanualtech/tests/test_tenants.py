@@ -0,0 +1,73 @@
+from fastapi.testclient import TestClient
+
+from app import main
+from app.main import app
+from tests.util import T1, T2
+
+
+def test_dados_isolados_por_tenant(client: TestClient):
+    """Testa que cada tenant enxerga apenas os próprios registros"""
+    manutencao_id = client.post("/manutencao/", json={"resumo": "Tenant 1"}, headers=T1).json()["id"]
+    client.post("/manutencao/", json={"resumo": "Tenant 2"}, headers=T2)
+
+    assert [m["resumo"] for m in client.get("/manutencao/", headers=T1).json()] == ["Tenant 1"]
+    assert [m["resumo"] for m in client.get("/manutencao/", headers=T2).json()] == ["Tenant 2"]
+    assert client.get(f"/manutencao/{manutencao_id}", headers=T2).status_code == 404
+    assert client.delete(f"/manutencao/{manutencao_id}", headers=T2).status_code == 404
+    assert client.get(f"/manutencao/{manutencao_id}", headers=T1).status_code == 200
+
+
+def test_nome_de_material_unico_por_tenant(client: TestClient):
+    """Testa que o mesmo nome pode existir em tenants diferentes"""
+    assert client.post("/materiais/", json={"nome": "Cimento", "precoUnitario": 50.0}, headers=T1).status_code == 201
+    assert client.post("/materiais/", json={"nome": "Cimento", "precoUnitario": 45.0}, headers=T2).status_code == 201
+    assert client.post("/materiais/", json={"nome": "Cimento", "precoUnitario": 1.0}, headers=T2).status_code == 400
+
+
+def test_consumo_nao_usa_material_de_outro_tenant(client: TestClient):
+    manutencao_id = client.post("/manutencao/", json={"resumo": "Reparo"}, headers=T2).json()["id"]
+    material_id = client.post("/materiais/", json={"nome": "Cimento", "precoUnitario": 50.0}, headers=T1).json()["id"]
+
+    response = client.post(
+        f"/manutencao/{manutencao_id}/materiais", json={"materialId": material_id, "quantidade": 1}, headers=T2
+    )
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Material não encontrado"
+
+
+def test_reajuste_de_precos_restrito_ao_tenant(client: TestClient):
+    id_t1 = client.post("/materiais/", json={"nome": "Cimento", "precoUnitario": 50.0}, headers=T1).json()["id"]
+    id_t2 = client.post("/materiais/", json={"nome": "Cimento", "precoUnitario": 50.0}, headers=T2).json()["id"]
+
+    response = client.post("/materiais/precos", json={"percentual": 10}, headers=T2)
+
+    assert response.json()["atualizados"] == 1
+    assert client.get(f"/materiais/{id_t1}", headers=T1).json()["precoUnitario"] == 50.0
+    assert client.get(f"/materiais/{id_t2}", headers=T2).json()["precoUnitario"] == 55.0
+
+
+def test_header_de_tenant_invalido(client: TestClient):
+    assert client.get("/manutencao/", headers={"X-Tenant-Id": "abc"}).status_code == 400
+
+
+def test_tenant_exige_api_key(client: TestClient):
+    """Testa que o tenant vem da API key e não de um header livre"""
+    assert TestClient(app).get("/manutencao/").status_code == 401
+    assert client.get("/manutencao/", headers={"X-API-Key": "desconhecida"}).status_code == 401
+    assert client.get("/manutencao/", headers={**T1, "X-Tenant-Id": "2"}).status_code == 403
+    assert client.get("/manutencao/", headers={**T2, "X-Tenant-Id": "2"}).status_code == 200
+    assert TestClient(app).get("/health/live").status_code == 200
+
+
+def test_api_key_resolvida_uma_vez_por_requisicao(client: TestClient, monkeypatch):
+    """Testa que o rate limit e o contexto de tenant compartilham a busca da API key"""
+    chamadas = []
+    original = main.tenant_da_chave
+
+    def contar(chave):
+        chamadas.append(chave)
+        return original(chave)
+
+    monkeypatch.setattr(main, "tenant_da_chave", contar)
+    assert client.get("/manutencao/").status_code == 200
+    assert len(chamadas) == 1
@@ -0,0 +1,25 @@
+"""Constantes e helpers compartilhados pelos testes (o conftest não deve ser importado)."""
+from contextlib import contextmanager
+
+from sqlalchemy.orm import Session
+
+API_KEYS = {"chave-tenant-1": 1, "chave-tenant-2": 2}
+
+T1 = {"X-API-Key": "chave-tenant-1"}
+T2 = {"X-API-Key": "chave-tenant-2"}
+
+
+@contextmanager
+def sessao_transacional(engine):
+    """Sessão cujos `commit()` viram SAVEPOINTs de uma transação desfeita na saída."""
+    connection = engine.connect()
+    transaction = connection.begin()
+    session = Session(
+        bind=connection, autoflush=False, join_transaction_mode="create_savepoint"
+    )
+    try:
+        yield session
+    finally:
+        session.close()
+        transaction.rollback()
+        connection.close()